@@ -0,0 +1,221 @@
+import argparse
+import logging
+import os
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import yaml
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:  # pyahocorasick이 없으면 정규식 하나로 같은 결과를 만듦
+    HAS_AHOCORASICK = False
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+
+# config.yaml에 ad_rules가 없을 때 사용하는 기본 규칙 (앞에 있을수록 우선)
+DEFAULT_IMAGE_DOMAINS = ('firebasestorage', 'dinnerqueen', 'revu', 'cloudfront')
+DEFAULT_DISCLOSURE_PHRASES = (
+    '소정의 원고료',
+    '원고료를 받고',
+    '원고료를 지원받',
+    '제공받아 작성',
+    '지원받아 작성',
+    '제품만을 제공받아',
+    '협찬을 받아',
+    '#협찬',
+    '유료 광고를 포함',
+)
+# 공백/줄바꿈과 함께 무시하는 보이지 않는 문자
+INVISIBLE_CHARS = ('\u200b', '\u200c', '\u200d', '\ufeff')
+SEPARATOR = '\n'  # 정규화한 값에는 남지 않으므로 이미지 src나 본문 경계를 넘어가는 일치가 생기지 않음
+
+
+def normalize(value: str) -> str:
+    """공백과 보이지 않는 문자를 지우고 소문자로 바꿉니다. ('소정의  원고료', 문단 경계에서 나뉜 문구도 일치)"""
+    value = ''.join(value.split()).lower()  # 정규식보다 훨씬 빠름 (본문은 수십 KB)
+    for char in INVISIBLE_CHARS:
+        if char in value:
+            value = value.replace(char, '')
+    return value
+
+
+class AdClassifier:
+    """
+    광고 이미지 도메인과 본문 고지 문구를 하나의 다중 패턴 오토마톤(Aho-Corasick)으로 묶어 한 번에 찾습니다.
+    규칙은 이미지 도메인, 고지 문구 순서로 번호를 매기고, 여러 규칙이 일치하면 번호가 작은 규칙을 기록합니다.
+    규칙 이름은 'image:<도메인>' 또는 'text:<문구>' 형식입니다.
+    """
+
+    def __init__(self, image_domains: Iterable[str] = DEFAULT_IMAGE_DOMAINS,
+                 disclosure_phrases: Iterable[str] = DEFAULT_DISCLOSURE_PHRASES) -> None:
+        self.rules: List[str] = []
+        self._patterns: Dict[str, List[int]] = {}  # 정규화한 패턴 -> 규칙 번호 (같은 패턴을 여러 규칙이 쓸 수 있음)
+        for kind, values in (('image', image_domains), ('text', disclosure_phrases)):
+            for value in values:
+                pattern, rule = normalize(str(value)), f"{kind}:{value}"
+                if not pattern or rule in self.rules:
+                    continue
+                self._patterns.setdefault(pattern, []).append(len(self.rules))
+                self.rules.append(rule)
+            if kind == 'image':
+                self.image_rule_count = len(self.rules)  # 이보다 작은 번호가 이미지 규칙
+
+        self._automaton = None
+        self._regex = None
+        if not self._patterns:
+            return
+        if HAS_AHOCORASICK:
+            self._automaton = ahocorasick.Automaton()
+            for pattern, indexes in self._patterns.items():
+                self._automaton.add_word(pattern, (len(pattern), indexes))
+            self._automaton.make_automaton()
+        else:
+            # 위치마다 가장 긴 패턴 하나만 잡히므로 그 패턴의 접두어인 짧은 패턴도 함께 일치로 처리
+            patterns = sorted(self._patterns, key=len, reverse=True)
+            self._regex = re.compile('(?=(' + '|'.join(map(re.escape, patterns)) + '))')
+            self._prefixes = {pattern: [other for other in patterns if pattern.startswith(other)]
+                              for pattern in patterns}
+
+    def _matches(self, haystack: str) -> Iterator[Tuple[int, List[int]]]:
+        """정규화한 haystack을 한 번 훑으며 (시작 위치, 규칙 번호 목록)을 내보냅니다."""
+        if self._automaton is not None:
+            for end, (length, indexes) in self._automaton.iter(haystack):
+                yield end - length + 1, indexes
+        elif self._regex is not None:
+            for match in self._regex.finditer(haystack):
+                for pattern in self._prefixes[match.group(1)]:
+                    yield match.start(), self._patterns[pattern]
+
+    def classify(self, image_srcs: Sequence[str], text: str = '') -> Tuple[List[str], Optional[str]]:
+        """
+        (광고 이미지 src 목록, 일치한 규칙 이름 또는 None)을 반환합니다.
+        광고 이미지는 예전과 같이 도메인 규칙 순서대로 묶이며, 이미지 규칙이 일치하면 본문 규칙보다 우선합니다.
+        """
+        # 모든 src와 본문을 구분자로 이어 붙여 한 번에 훑고, 시작 위치로 어느 src(또는 본문)인지 찾음
+        normalized = [normalize(src) for src in image_srcs]
+        starts, position = [], 0
+        for src in normalized:
+            starts.append(position)
+            position += len(src) + len(SEPARATOR)
+        text_start = position  # 이 위치부터는 본문
+        haystack = ''.join(src + SEPARATOR for src in normalized) + normalize(text or '')
+        first_rule: Dict[int, int] = {}  # src 번호 -> 일치한 이미지 규칙 중 가장 작은 번호
+        text_rule: Optional[int] = None
+        for start, indexes in self._matches(haystack):
+            if start >= text_start:
+                matched = [index for index in indexes if index >= self.image_rule_count]
+                if matched:
+                    text_rule = min(matched + ([text_rule] if text_rule is not None else []))
+                continue
+            index = min(indexes)
+            if index >= self.image_rule_count:
+                continue
+            src_index = bisect_right(starts, start) - 1
+            first_rule[src_index] = min(index, first_rule.get(src_index, index))
+        if first_rule:
+            ordered = sorted(first_rule, key=lambda src_index: (first_rule[src_index], src_index))
+            return [image_srcs[src_index] for src_index in ordered], self.rules[first_rule[ordered[0]]]
+        return [], self.rules[text_rule] if text_rule is not None else None
+
+
+def load_classifier(config: Optional[dict] = None) -> AdClassifier:
+    """config.yaml의 ad_rules(image_domains, disclosure_phrases)로 분류기를 만듭니다. 없는 항목은 기본 규칙을 사용합니다."""
+    rules = (config or {}).get('ad_rules') or {}
+    return AdClassifier(rules.get('image_domains', DEFAULT_IMAGE_DOMAINS),
+                        rules.get('disclosure_phrases', DEFAULT_DISCLOSURE_PHRASES))
+
+
+_classifier: Optional[AdClassifier] = None
+
+
+def get_classifier() -> AdClassifier:
+    """CONFIG_PATH(기본값 backend/config.yaml)의 규칙으로 만든 분류기를 프로세스마다 한 번만 만들어 재사용합니다."""
+    global _classifier
+    if _classifier is None:
+        config_path = os.environ.get('CONFIG_PATH', os.path.join(os.path.dirname(__file__), 'config.yaml'))
+        try:
+            with open(config_path, 'r', encoding='utf-8') as file:
+                config = yaml.safe_load(file)
+        except FileNotFoundError:
+            config = {}
+        _classifier = load_classifier(config)
+    return _classifier
+
+
+def reclassify(classifier: Optional[AdClassifier] = None, batch_size: int = 500, since_id: int = 0,
+               dry_run: bool = False) -> Dict[str, int]:
+    """
+    규칙이 바뀐 뒤 cr_data30의 기존 행을 id 순서로 batch_size행씩 다시 판별합니다. 배치마다 커밋합니다.
+    DB에는 전체 이미지 목록이 없으므로 저장된 본문과 광고 이미지만 다시 판별합니다.
+    새로 추가한 이미지 도메인까지 반영하려면 html_cache.py replay로 원본 HTML에서 다시 추출해야 합니다.
+    """
+    from database import bump_data_version, get_connection, recompute_restaurant_stats
+
+    classifier = classifier or get_classifier()
+    counts = {'rows': 0, 'changed': 0, 'became_ad': 0, 'became_not_ad': 0}
+    last_id = since_id
+    while True:
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT id, restaurant_name, content, ad_images, `광고`, ad_rule FROM cr_data30 "
+                "WHERE id > %s ORDER BY id LIMIT %s",
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            updates, names = [], set()
+            for row in rows:
+                srcs = [src.strip() for src in (row['ad_images'] or '').split(',') if src.strip()]
+                ad_images, rule = classifier.classify(srcs, row['content'] or '')
+                ad = 'O' if rule else 'X'
+                if (", ".join(ad_images), ad, rule) == (row['ad_images'] or '', row['광고'], row['ad_rule']):
+                    continue
+                updates.append((", ".join(ad_images), ad, rule, row['id']))
+                if ad != row['광고']:
+                    counts['became_ad' if ad == 'O' else 'became_not_ad'] += 1
+                    if row['restaurant_name'] is not None:
+                        names.add(row['restaurant_name'])
+            if updates and not dry_run:
+                # content_hash는 ad_rule을 포함하므로 비워 두면 다음 저장 때 변경 없이 해시만 다시 채움
+                cursor.executemany(
+                    "UPDATE cr_data30 SET ad_images = %s, `광고` = %s, ad_rule = %s, content_hash = NULL "
+                    "WHERE id = %s",
+                    updates,
+                )
+                recompute_restaurant_stats(cursor, sorted(names))
+                bump_data_version(cursor)
+                conn.commit()
+        counts['rows'] += len(rows)
+        counts['changed'] += len(updates)
+        last_id = rows[-1]['id']
+        logging.info(f"{counts['rows']}행 확인, {counts['changed']}행 변경 (마지막 id={last_id})")
+    logging.info(f"광고 재분류 {'(dry run) ' if dry_run else ''}완료: {counts}")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="config.yaml의 광고 판별 규칙(ad_rules) 확인 및 기존 행 재분류")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    reclassify_parser = subparsers.add_parser('reclassify', help="cr_data30의 기존 행을 현재 규칙으로 다시 판별")
+    reclassify_parser.add_argument('--batch-size', type=int, default=500, help="한 번에 읽고 커밋하는 행 수")
+    reclassify_parser.add_argument('--since-id', type=int, default=0, help="이 id보다 큰 행부터 시작")
+    reclassify_parser.add_argument('--dry-run', action='store_true', help="바뀔 행 수만 세고 저장하지 않음")
+    subparsers.add_parser('rules', help="현재 적용되는 규칙을 우선순위 순서로 출력")
+    args = parser.parse_args()
+
+    if args.command == 'rules':
+        print('\n'.join(get_classifier().rules))
+    else:
+        from database import wait_for_database
+        from migrations import apply_migrations
+
+        wait_for_database()
+        apply_migrations()
+        reclassify(batch_size=args.batch_size, since_id=args.since_id, dry_run=args.dry_run)
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from typing import Callable, List, Optional
+
+from database import save_to_db
+from metrics import DB_FLUSH_BATCH_SIZE, DB_FLUSH_SECONDS, ERRORS, RETRIES, ROWS_DROPPED, ROWS_WRITTEN
+
+
+class BatchWriter:
+    """
+    data_queue의 레코드를 모아 DB에 저장합니다.
+    max_batch_size개가 모이거나 첫 레코드를 받은 뒤 max_latency초가 지나면 저장하며,
+    취소되거나 종료될 때는 큐에 남은 레코드까지 모두 저장한 뒤 끝납니다.
+    """
+
+    def __init__(self, queue: asyncio.Queue, max_batch_size: int = 100, max_latency: float = 2.0,
+                 max_retries: int = 3, on_flushed: Optional[Callable[[List[dict]], None]] = None) -> None:
+        self.queue = queue
+        self.on_flushed = on_flushed  # 저장에 성공한 배치로 호출 (예: 작업 큐 완료 처리)
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.max_retries = max_retries
+        self._pending: List[dict] = []  # 큐에서 꺼냈지만 아직 저장하지 않은 레코드
+        self._in_flight: Optional[asyncio.Future] = None  # 저장 중인 배치 (취소돼도 끝까지 진행)
+        self.started_at = time.monotonic()
+        self.batches = 0
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.row_counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        self.last_batch_size = 0
+        self.last_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+
+    async def run(self) -> None:
+        logging.info("save 작업 시작")
+        try:
+            while True:
+                await self._collect()
+                await self.flush()
+        except asyncio.CancelledError:
+            await self.drain()
+            raise
+
+    async def _collect(self) -> None:
+        self._pending.append(await self.queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_latency
+        while len(self._pending) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                self._pending.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def flush(self) -> None:
+        await self._finish_in_flight()
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        self._in_flight = asyncio.ensure_future(self._save(batch))
+        await self._finish_in_flight()
+
+    async def _finish_in_flight(self) -> None:
+        """
+        저장 중인 배치를 기다립니다. 기다리던 쪽이 취소돼도 저장(재시도 포함)은 shield로 계속 진행되고,
+        이후 flush나 drain이 다시 기다리므로 종료할 때 배치를 잃지 않습니다.
+        """
+        if self._in_flight is not None:
+            await asyncio.shield(self._in_flight)
+            self._in_flight = None
+
+    async def _save(self, batch: List[dict]) -> None:
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, self.max_retries + 1):
+            started = time.monotonic()
+            try:
+                counts = await loop.run_in_executor(None, save_to_db, batch)
+            except Exception as e:
+                ERRORS.labels('db_flush', type(e).__name__).inc()
+                logging.error(f"데이터 저장 중 오류 발생 ({attempt}/{self.max_retries}): {e}")
+                if attempt < self.max_retries:
+                    RETRIES.labels('db_flush').inc()
+                    await asyncio.sleep(attempt)
+                continue
+            elapsed = time.monotonic() - started
+            self.batches += 1
+            self.rows_written += len(batch)
+            for status, count in counts.items():
+                self.row_counts[status] += count
+                ROWS_WRITTEN.labels(status).inc(count)
+            DB_FLUSH_SECONDS.observe(elapsed)
+            DB_FLUSH_BATCH_SIZE.set(len(batch))
+            self.last_batch_size = len(batch)
+            self.last_flush_seconds = elapsed
+            self.total_flush_seconds += elapsed
+            logging.info(f"{len(batch)}개의 데이터를 데이터베이스에 저장했습니다. ({elapsed * 1000:.0f}ms)")
+            logging.info(f"현재 큐에 {self.queue.qsize()}개가 있습니다.")
+            if self.on_flushed:
+                try:
+                    await loop.run_in_executor(None, self.on_flushed, batch)
+                except Exception as e:
+                    logging.error(f"저장 후 처리 중 오류 발생: {e}")
+            return
+        self.rows_failed += len(batch)
+        ROWS_DROPPED.inc(len(batch))
+        logging.error(f"재시도 후에도 저장하지 못해 {len(batch)}개의 데이터를 버립니다.")
+
+    async def drain(self) -> None:
+        """저장 중이던 배치를 마저 끝내고, 큐에 남은 레코드를 max_batch_size 단위로 모두 저장합니다."""
+        await self._finish_in_flight()
+        while True:
+            while len(self._pending) < self.max_batch_size:
+                try:
+                    self._pending.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            if not self._pending:
+                break
+            await self.flush()
+        logging.info("남은 데이터를 모두 저장했습니다.")
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            'queue_size': self.queue.qsize(),
+            'batches': self.batches,
+            'rows_written': self.rows_written,
+            'rows_failed': self.rows_failed,
+            **{f'rows_{status}': count for status, count in self.row_counts.items()},
+            'last_batch_size': self.last_batch_size,
+            'avg_batch_size': self.rows_written / self.batches if self.batches else 0,
+            'last_flush_seconds': self.last_flush_seconds,
+            'avg_flush_seconds': self.total_flush_seconds / self.batches if self.batches else 0,
+            'rows_per_sec': self.rows_written / elapsed if elapsed > 0 else 0,
+        }
@@ -1,36 +1,126 @@
 import re
-import time
+import asyncio
 import pandas as pd
-import urllib.request
-from bs4 import BeautifulSoup
-import json
+import urllib.parse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import yaml
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 import os
-from typing import List, Union, Callable
+from typing import List, Union, Callable, Optional, Tuple, Dict, Iterable, Iterator
 import logging  # 추가: 로깅 모듈 임포트
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
 from selenium.webdriver.firefox.service import Service as FirefoxService
 
+from driver_pool import DriverPool
+from search_client import NaverSearchClient
+from extractor import extract_post
+from sinks import records_to_dataframe
+from html_cache import create_cache
+from metrics import CONTENT_WAIT_SECONDS, ERRORS, IFRAME_WAIT_SECONDS, PAGE_LOAD_SECONDS, PARSE_SECONDS
+
+# 블로그 본문은 blog.naver.com/{blogId}/{logNo} 페이지의 mainFrame iframe 안에 있는 PostView 문서에 들어있음
+BLOG_POST_PATH_RE = re.compile(r'blog\.naver\.com/([^/?#]+)/(\d+)')
+# 부하 테스트에서는 환경 변수로 로컬 mock 서버(loadtest/mock_naver.py)를 가리키게 함
+NAVER_BLOG_BASE = os.environ.get('NAVER_BLOG_BASE', 'https://blog.naver.com')
+NAVER_API_BASE = os.environ.get('NAVER_API_BASE', 'https://apis.naver.com')
+POST_VIEW_URL = (NAVER_BLOG_BASE + "/PostView.naver?blogId={blog_id}&logNo={log_no}"
+                 "&redirect=Dlog&widgetTypeCall=true&directAccess=false")
+LIKE_API_URL = (NAVER_API_BASE + "/blogserver/like/v1/search/contents"
+                "?suppress_response_codes=true&pool=blogid&q=BLOG[{blog_id}_{log_no}]&isDuplication=false")
+# 브라우저 수집 시 본문이 준비되었다고 판단하는 선택자 (스마트에디터 ONE / 구 에디터)
+CONTENT_READY_SELECTOR = "div.se-main-container, div#postViewArea, div.se_component_wrap"
+# 추출에 필요 없는 리소스를 받지 않는 Firefox 설정. 광고 판별은 img의 src 속성만 보므로 이미지를 막아도 결과는 같음
+LEAN_FIREFOX_PREFS = {
+    'permissions.default.image': 2,  # 이미지 다운로드/디코딩 차단
+    'media.autoplay.default': 5,  # 동영상/오디오 자동 재생 차단
+    'media.mediasource.enabled': False,
+    'media.peerconnection.enabled': False,
+    'gfx.downloadable_fonts.enabled': False,  # 웹 폰트 차단
+    'browser.display.use_document_fonts': 0,
+    'privacy.trackingprotection.enabled': True,  # 추적/광고 스크립트 차단
+    'privacy.trackingprotection.socialtracking.enabled': True,
+    'privacy.trackingprotection.cryptomining.enabled': True,
+    'privacy.trackingprotection.fingerprinting.enabled': True,
+    'network.prefetch-next': False,
+    'network.dns.disablePrefetch': True,
+    'network.http.speculative-parallel-limit': 0,
+    'browser.cache.disk.enable': False,
+    'dom.webnotifications.enabled': False,
+    'geo.enabled': False,
+}
+HTTP_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"),
+    "Accept-Language": "ko-KR,ko;q=0.9",
+    "Referer": "https://blog.naver.com/",
+}
+
+
+def parse_blog_post_id(url: str) -> Optional[Tuple[str, str]]:
+    """블로그 URL에서 (blogId, logNo)를 추출합니다. 인식할 수 없는 형식이면 None을 반환합니다."""
+    parsed = urllib.parse.urlparse(url)
+    params = urllib.parse.parse_qs(parsed.query)
+    if 'blogId' in params and 'logNo' in params:
+        return params['blogId'][0], params['logNo'][0]
+    match = BLOG_POST_PATH_RE.search(url)
+    if match:
+        return match.group(1), match.group(2)
+    return None
+
+
 class Crawler:
     def __init__(self) -> None:
         # config.yaml 파일에서 기본 설정 읽기
-        config_path = os.path.join(os.path.dirname(__file__), 'config.yaml')  # 변경: config.yaml 경로 수정
+        config_path = os.environ.get('CONFIG_PATH', os.path.join(os.path.dirname(__file__), 'config.yaml'))  # 변경: config.yaml 경로 수정
         with open(config_path, 'r', encoding='utf-8') as file:
             config = yaml.safe_load(file)
 
         self.default_queries: List[str] = config['query']  # 기존 Union[str, List[str]]에서 List[str]로 변경
         self.max_posts: int = config['max_posts']
+        self.fetch_mode: str = config.get('fetch_mode', 'http')  # 'http' 또는 'browser'
+        self.lean_browser: bool = config.get('lean_browser', True)
+        self.browser_wait_timeout: float = config.get('browser_wait_timeout', 20)
         self.client_id: str = 'yxVAM1FtMsLm6a3peK_0'
         self.client_secret: str = '_YEIleXvQ9'
-        self.driver = self.create_driver()  # 브라우저 인스턴스 생성
-        logging.info("브라우저 인스턴스가 생성되었습니다.")
+        self.search_config: dict = config.get('search_api', {})
+        self.session = self.create_session(pool_size=max(10, config.get('num_crawlers', 1)))
+        # 브라우저는 HTTP 수집이 실패했을 때 필요한 만큼만 풀에서 생성
+        self.driver_pool = DriverPool(
+            self.create_driver,
+            size=config.get('num_crawlers', 1),
+            max_pages=config.get('driver_max_pages', 100),
+            max_memory_mb=config.get('driver_max_memory_mb', 1024),
+        )
+        # 수집한 HTML을 보관해 두면 선택자가 바뀌어도 다시 크롤링하지 않고 html_cache.py replay로 재추출 가능
+        self.html_cache = create_cache(config)
 
     # def __del__(self):
     #     self.driver.quit()  # 클래스가 소멸될 때 브라우저 닫기
 
+    def create_session(self, pool_size: int = 10) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(HTTP_HEADERS)
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=["GET"])
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        self.driver_pool.close()
+        self.session.close()
+        if self.html_cache:
+            self.html_cache.close()
+
     def create_driver(self) -> webdriver.Firefox:
         options = webdriver.FirefoxOptions()
         options.add_argument("--headless")  # headless 모드 추가
@@ -38,6 +128,11 @@ class Crawler:
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--disable-gpu")  # 추가: GPU 비활성화
         # options.add_argument("--remote-debugging-port=9222")  # 제거: 지원되지 않는 인자
+        if self.lean_browser:
+            # DOMContentLoaded까지만 기다리고, 이미지/미디어/폰트/추적 스크립트는 받지 않음
+            options.page_load_strategy = 'eager'
+            for name, value in LEAN_FIREFOX_PREFS.items():
+                options.set_preference(name, value)
 
         # GeckoDriver의 경로를 환경 변수에서 가져오도록 수정
         geckodriver_path = os.environ.get('GECKODRIVER', '/usr/local/bin/geckodriver')
@@ -49,230 +144,155 @@ class Crawler:
             logging.error(f"Firefox WebDriver 생성 실패: {e}")
             raise e
         
-    def reset_driver(self):
-        logging.warning("WebDriver를 재생성합니다.")
-        if self.driver:
-            self.driver.quit()
-        self.driver = self.create_driver()
+    def fetch_post_html(self, url: str) -> Optional[str]:
+        """iframe 안쪽의 PostView 문서를 HTTP로 직접 요청합니다."""
+        post_id = parse_blog_post_id(url)
+        if post_id is None:
+            return None
+        blog_id, log_no = post_id
+        with PAGE_LOAD_SECONDS.labels('http').time():
+            response = self.session.get(POST_VIEW_URL.format(blog_id=blog_id, log_no=log_no), timeout=10)
+        response.raise_for_status()
+        return response.text
+
+    def fetch_sympathy(self, url: str) -> Optional[int]:
+        """공감 수는 브라우저에서 스크립트로 채워지므로 HTTP 모드에서는 좋아요 API에서 직접 가져옵니다."""
+        post_id = parse_blog_post_id(url)
+        if post_id is None:
+            return None
+        blog_id, log_no = post_id
+        try:
+            response = self.session.get(LIKE_API_URL.format(blog_id=blog_id, log_no=log_no), timeout=5)
+            response.raise_for_status()
+            contents = response.json().get('contents') or []
+            if not contents:
+                return None
+            return sum(int(reaction.get('count', 0)) for reaction in contents[0].get('reactions', []))
+        except Exception as e:
+            logging.debug(f"{url} 공감 수 조회 실패: {e}")
+            return None
+
+    def create_search_client(self) -> NaverSearchClient:
+        return NaverSearchClient(
+            self.client_id,
+            self.client_secret,
+            rate_per_sec=self.search_config.get('rate_per_sec', 10),
+            burst=self.search_config.get('burst', 10),
+            concurrency=self.search_config.get('concurrency', 10),
+            max_retries=self.search_config.get('max_retries', 5),
+        )
+
+    async def fetch_urls_for_queries(self, queries: List[str], max_posts: int = None) -> Dict[str, List[str]]:
+        async with self.create_search_client() as client:
+            return await client.fetch_many(queries, max_posts or self.max_posts)
 
     def fetch_urls_from_api(self, query: str, max_posts: int = None) -> List[str]:
+        # 이벤트 루프 밖에서 호출하는 동기 호출자용 래퍼
         print(f"\nAPI를 사용해 '{query}' 관련 게시물 URL을 수집합니다.")
-        naver_urls: List[str] = []
-        display: int = 10  # 한 번에 가져올 게시물 수
-        max_posts = max_posts or self.max_posts
-
-        for start in range(1, max_posts + 1, display):
-            url = (f"https://openapi.naver.com/v1/search/blog?query={urllib.parse.quote(query)}&start={start}"
-                   f"&display={display}&sort=sim")
-            request = urllib.request.Request(url)
-            request.add_header("X-Naver-Client-Id", self.client_id)
-            request.add_header("X-Naver-Client-Secret", self.client_secret)
-            response = urllib.request.urlopen(request)
-            if response.getcode() == 200:
-                data = json.loads(response.read().decode('utf-8'))['items']
-                for row in data:
-                    if 'blog.naver' in row['link'] and row['link'] not in naver_urls:
-                        naver_urls.append(row['link'])
-                    if len(naver_urls) >= max_posts:
-                        break
-            else:
-                print(f"Error fetching data: {response.getcode()}")
-            time.sleep(1)  # API 호출 간 대기
-        return naver_urls
+        return asyncio.run(self.fetch_urls_for_queries([query], max_posts))[query]
+
+    def iter_blog_contents(self, urls: Iterable[str], max_in_flight: Optional[int] = None,
+                           ordered: bool = False) -> Iterator[dict]:
+        """
+        URL마다 파싱이 끝나는 즉시 레코드 하나를 yield 합니다.
+        동시에 처리 중인 URL은 max_in_flight개로 제한되므로 URL 목록이 커져도 메모리 사용량은 일정합니다.
+        ordered=True이면 입력 순서대로 yield 합니다.
+        """
+        max_in_flight = max_in_flight or self.driver_pool.size
+        url_iter = iter(urls)
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            in_flight = deque()
+            for url in islice(url_iter, max_in_flight):
+                in_flight.append(executor.submit(self.crawl_blog_content, url))
+            while in_flight:
+                if ordered:
+                    done = [in_flight.popleft()]
+                else:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    done = [future for future in in_flight if future in finished]
+                    for future in done:
+                        in_flight.remove(future)
+                for future in done:
+                    next_url = next(url_iter, None)
+                    if next_url is not None:
+                        in_flight.append(executor.submit(self.crawl_blog_content, next_url))
+                    yield future.result()
 
     def crawl_blog_contents(self, urls: List[str]) -> pd.DataFrame:
-        driver = self.create_driver()
-        writers, post_dates, titles, contents, tags_list, sympathies, ad_images_list, ad_status = [], [], [], [], [], [], [], []
-
-        for url in urls:
-            driver.get(url)
-            time.sleep(2)
+        return records_to_dataframe(self.iter_blog_contents(urls, ordered=True))
 
+    def parse_blog_html(self, page_source: str, url: str) -> dict:
+        if self.html_cache:
             try:
-                # mainFrame iframe 대기 및 전환
-                iframe = WebDriverWait(driver, 20).until(
-                    EC.presence_of_element_located((By.ID, "mainFrame"))
-                )
-                driver.switch_to.frame(iframe)
-
-                # 페이지 소스 가져오기
-                html = BeautifulSoup(driver.page_source, "html.parser")
-
-                # 제목 크롤링
-                title_element = html.select_one("div.se-module.se-module-text.se-title-text > p > span")
-                titles.append(title_element.text.strip() if title_element else "unknown")
-
-                # 본문 내용 크롤링
-                main_content = html.select("div.se-main-container > div")
-
-                # 본문에서 동영상 콘텐츠 제거
-                for video_div in html.select("div.se-module.se-module-video.__se-component"):
-                    video_div.decompose()
-
-                # 본문에서 __se-hash-tag 태그 제거
-                for hash_tag_span in html.select("span.__se-hash-tag"):
-                    hash_tag_span.decompose()
-
-                # 텍스트만 추출하여 content에 저장
-                content = ' '.join(div.get_text(strip=True) for div in main_content)
-                contents.append(content)
-
-                # 게시물 작성 날짜
-                post_date_element = html.select_one("span.se_publishDate")
-                post_dates.append(post_date_element.text.strip() if post_date_element else "unknown")
-
-                # 작성자 정보
-                writer_element = html.select_one("span.nick > a.link")
-                writers.append(writer_element.text.strip() if writer_element else "unknown")
-
-                # 태그 크롤링
-                tag_elements = html.select("div.wrap_tag span.ell")
-                tags = [tag.text.strip() for tag in tag_elements]
-                tags_list.append(", ".join(tags))
-
-                # 공감 수 크롤링
-                sympathy_element = html.select_one("span.u_likeit_list_btn._button.btn_sympathy.pcol2.off > em.u_cnt._count")
-                sympathy_text = sympathy_element.text.strip() if sympathy_element else "0"
-                try:
-                    sympathy = int(sympathy_text)
-                except ValueError:
-                    sympathy = 0
-                sympathies.append(sympathy)
-
-                # 광고성 이미지 크롤링
-                ad_images = html.select("img[src*='firebasestorage']")
-                dinnerqueen_ad_images = html.select("img[src*='dinnerqueen']")
-                revu_ad_images = html.select("img[src*='revu']")
-                cloudfront_ad_images = html.select("img[src*='cloudfront']")
-
-                # 광고 이미지 URL 리스트 생성
-                if ad_images or dinnerqueen_ad_images or revu_ad_images or cloudfront_ad_images:
-                    ad_image_urls = [img.get("src") for img in ad_images if img.get("src")]
-                    dinnerqueen_ad_image_urls = [img.get("src") for img in dinnerqueen_ad_images if img.get("src")]
-                    revu_ad_image_urls = [img.get("src") for img in revu_ad_images if img.get("src")]
-                    cloudfront_ad_image_urls = [img.get("src") for img in cloudfront_ad_images if img.get("src")]
-                    all_ad_images = ad_image_urls + dinnerqueen_ad_image_urls + revu_ad_image_urls + cloudfront_ad_image_urls
-
-                    ad_images_list.append(", ".join(all_ad_images))
-                    ad_status.append("O")  # 광고가 있으면 'O'
-                else:
-                    ad_images_list.append("")
-                    ad_status.append("X")  # 광고가 없으면 'X'
-
-                # 메인 프레임으로 돌아가기
-                driver.switch_to.default_content()
-
+                self.html_cache.put(url, page_source)
             except Exception as e:
-                print(f"{url}에서 크롤링 중 오류 발생: {e}")
-                titles.append("error")
-                contents.append("error")
-                post_dates.append("unknown")
-                writers.append("unknown")
-                tags_list.append("unknown")
-                sympathies.append(0)
-                ad_images_list.append("")
-                ad_status.append("X")
+                logging.warning(f"HTML 캐시 저장 실패: {url}: {e}")
+        timings: Dict[str, float] = {}
+        with PARSE_SECONDS.time():
+            data = extract_post(page_source, url, timings)
+        logging.debug(f"{url} 파싱 시간: " + ", ".join(f"{field}={seconds * 1000:.1f}ms" for field, seconds in timings.items()))
+        return data
 
-        driver.quit()
+    def crawl_blog_content(self, url: str) -> dict:
+        data = None
+        if self.fetch_mode == 'http':
+            data = self.crawl_blog_content_http(url)
+        if data is None:
+            # HTTP 수집에 실패한 경우에만 브라우저 사용
+            data = self.crawl_blog_content_browser(url)
+        return data
 
-        # DataFrame 생성 및 반환
-        return pd.DataFrame({
-            'writer': writers,
-            'date': post_dates,
-            'title': titles,
-            'content': contents,
-            'tags': tags_list,
-            'sympathy': sympathies,
-            'post_url': urls,
-            'ad_images': ad_images_list,
-            '광고': ad_status
-        })
+    def crawl_blog_content_http(self, url: str) -> Optional[dict]:
+        try:
+            page_source = self.fetch_post_html(url)
+            if page_source is None:
+                logging.info(f"PostView 주소를 만들 수 없어 브라우저로 전환합니다: {url}")
+                return None
+            data = self.parse_blog_html(page_source, url)
+            if data['title'] == 'unknown' and not data['content']:
+                logging.warning(f"HTTP 응답에서 본문을 찾지 못해 브라우저로 전환합니다: {url}")
+                return None
+            if data['sympathy'] == 0:
+                sympathy = self.fetch_sympathy(url)
+                if sympathy is not None:
+                    data['sympathy'] = sympathy
+            logging.info(f"데이터 수집 성공(HTTP): {url}")
+            return data
+        except Exception as e:
+            ERRORS.labels('http', type(e).__name__).inc()
+            logging.warning(f"{url} HTTP 수집 실패, 브라우저로 전환합니다: {e}")
+            return None
 
-    def crawl_blog_content(self, url: str) -> dict:
+    def crawl_blog_content_browser(self, url: str) -> dict:
         data = {}
         try:
-            self.driver.get(url)
-            logging.info(f"URL 접근 중: {url}")
-            time.sleep(2)
-
-            # mainFrame iframe 대기 및 전환
-            iframe = WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.ID, "mainFrame"))
-            )
-            self.driver.switch_to.frame(iframe)
-
-            # 페이지 소스 가져오기
-            html = BeautifulSoup(self.driver.page_source, "html.parser")
-
-            # 데이터 수집 로직
-            # 제목 크롤링
-            title_element = html.select_one("div.se-module.se-module-text.se-title-text > p > span")
-            title = title_element.text.strip() if title_element else "unknown"
+            with self.driver_pool.lease() as driver:
+                with PAGE_LOAD_SECONDS.labels('browser').time():
+                    driver.get(url)
+                logging.info(f"URL 접근 중: {url}")
 
-            # 본문 내용 크롤링
-            main_content = html.select("div.se-main-container > div")
-            for video_div in html.select("div.se-module.se-module-video.__se-component"):
-                video_div.decompose()
-            for hash_tag_span in html.select("span.__se-hash-tag"):
-                hash_tag_span.decompose()
-            content = ' '.join(div.get_text(strip=True) for div in main_content)
+                # mainFrame iframe이 준비되면 바로 전환 (고정 대기 없이)
+                wait = WebDriverWait(driver, self.browser_wait_timeout, poll_frequency=0.1)
+                with IFRAME_WAIT_SECONDS.time():
+                    wait.until(EC.frame_to_be_available_and_switch_to_it((By.ID, "mainFrame")))
 
-            # 게시물 작성 날짜
-            post_date_element = html.select_one("span.se_publishDate")
-            post_date = post_date_element.text.strip() if post_date_element else "unknown"
+                # iframe 안의 본문 요소가 나타날 때까지 대기
+                with CONTENT_WAIT_SECONDS.time():
+                    try:
+                        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, CONTENT_READY_SELECTOR)))
+                    except TimeoutException:
+                        logging.warning(f"본문 요소를 찾지 못했지만 현재 문서로 추출을 시도합니다: {url}")
 
-            # 작성자 정보
-            writer_element = html.select_one("span.nick > a.link")
-            writer = writer_element.text.strip() if writer_element else "unknown"
+                # 페이지 소스에서 데이터 추출
+                data = self.parse_blog_html(driver.page_source, url)
 
-            # 태그 크롤링
-            tag_elements = html.select("div.wrap_tag span.ell")
-            tags = ", ".join([tag.text.strip() for tag in tag_elements])
+                logging.info(f"데이터 수집 성공: {url}")
 
-            # 공감 수 크롤링
-            sympathy_element = html.select_one("span.u_likeit_list_btn._button.btn_sympathy.pcol2.off > em.u_cnt._count")
-            sympathy_text = sympathy_element.text.strip() if sympathy_element else "0"
-            try:
-                sympathy = int(sympathy_text)
-            except ValueError:
-                sympathy = 0
-
-            # 광고성 이미지 크롤링
-            ad_images = html.select("img[src*='firebasestorage']")
-            dinnerqueen_ad_images = html.select("img[src*='dinnerqueen']")
-            revu_ad_images = html.select("img[src*='revu']")
-            cloudfront_ad_images = html.select("img[src*='cloudfront']")
-            if ad_images or dinnerqueen_ad_images or revu_ad_images or cloudfront_ad_images:
-                ad_image_urls = [img.get("src") for img in ad_images if img.get("src")]
-                dinnerqueen_ad_image_urls = [img.get("src") for img in dinnerqueen_ad_images if img.get("src")]
-                revu_ad_image_urls = [img.get("src") for img in revu_ad_images if img.get("src")]
-                cloudfront_ad_image_urls = [img.get("src") for img in cloudfront_ad_images if img.get("src")]
-                all_ad_images = ad_image_urls + dinnerqueen_ad_image_urls + revu_ad_image_urls + cloudfront_ad_image_urls
-                ad_images_str = ", ".join(all_ad_images)
-                ad_status = "O"
-            else:
-                ad_images_str = ""
-                ad_status = "X"
-
-            # 수집한 데이터를 data 딕셔너리에 저장
-            data = {
-                'writer': writer,
-                'date': post_date,
-                'title': title,
-                'content': content,
-                'tags': tags,
-                'sympathy': sympathy,
-                'post_url': url,
-                'ad_images': ad_images_str,
-                '광고': ad_status
-            }
-
-            logging.info(f"데이터 수집 성공: {url}")
-
-            # 메인 프레임으로 돌아가기
-            self.driver.switch_to.default_content()
+                # 메인 프레임으로 돌아가기
+                driver.switch_to.default_content()
 
         except Exception as e:
+            ERRORS.labels('browser', type(e).__name__).inc()
             logging.error(f"{url}에서 크롤링 중 오류 발생: {e}")
             data = {
                 'writer': 'unknown',
@@ -283,118 +303,16 @@ class Crawler:
                 'sympathy': 0,
                 'post_url': url,
                 'ad_images': '',
-                '광고': 'X'
+                '광고': 'X',
+                'ad_rule': None
             }
 
         return data
 
     def crawl_blog_contents_with_callback(self, urls: List[str], callback: Callable[[str], None]) -> pd.DataFrame:
-        driver = self.create_driver()
-        writers, post_dates, titles, contents, tags_list, sympathies, ad_images_list, ad_status = [], [], [], [], [], [], [], []
-
-        for url in urls:
-            driver.get(url)
-            time.sleep(2)
-
-            try:
-                # mainFrame iframe 대기 및 전환
-                iframe = WebDriverWait(driver, 20).until(
-                    EC.presence_of_element_located((By.ID, "mainFrame"))
-                )
-                driver.switch_to.frame(iframe)
-
-                # 페이지 소스 가져오기
-                html = BeautifulSoup(driver.page_source, "html.parser")
-
-                # 제목 크롤링
-                title_element = html.select_one("div.se-module.se-module-text.se-title-text > p > span")
-                titles.append(title_element.text.strip() if title_element else "unknown")
-
-                # 본문 내용 크롤링
-                main_content = html.select("div.se-main-container > div")
-
-                # 본문에서 동영상 콘텐츠 제거
-                for video_div in html.select("div.se-module.se-module-video.__se-component"):
-                    video_div.decompose()
-
-                # 본문에서 __se-hash-tag 태그 제거
-                for hash_tag_span in html.select("span.__se-hash-tag"):
-                    hash_tag_span.decompose()
-
-                # 텍스트만 추출하여 content에 저장
-                content = ' '.join(div.get_text(strip=True) for div in main_content)
-                contents.append(content)
-
-                # 실시간으로 크롤링된 콘텐츠 전송
-                callback(content)
-
-                # 게시물 작성 날짜
-                post_date_element = html.select_one("span.se_publishDate")
-                post_dates.append(post_date_element.text.strip() if post_date_element else "unknown")
-
-                # 작성자 정보
-                writer_element = html.select_one("span.nick > a.link")
-                writers.append(writer_element.text.strip() if writer_element else "unknown")
-
-                # 태그 크롤링
-                tag_elements = html.select("div.wrap_tag span.ell")
-                tags = [tag.text.strip() for tag in tag_elements]
-                tags_list.append(", ".join(tags))
-
-                # 공감 수 크롤링
-                sympathy_element = html.select_one("span.u_likeit_list_btn._button.btn_sympathy.pcol2.off > em.u_cnt._count")
-                sympathy_text = sympathy_element.text.strip() if sympathy_element else "0"
-                try:
-                    sympathy = int(sympathy_text)
-                except ValueError:
-                    sympathy = 0
-                sympathies.append(sympathy)
-
-                # 광고성 이미지 크롤링
-                ad_images = html.select("img[src*='firebasestorage']")
-                dinnerqueen_ad_images = html.select("img[src*='dinnerqueen']")
-                revu_ad_images = html.select("img[src*='revu']")
-                cloudfront_ad_images = html.select("img[src*='cloudfront']")
-
-                # 광고 이미지 URL 리스트 생성
-                if ad_images or dinnerqueen_ad_images or revu_ad_images or cloudfront_ad_images:
-                    ad_image_urls = [img.get("src") for img in ad_images if img.get("src")]
-                    dinnerqueen_ad_image_urls = [img.get("src") for img in dinnerqueen_ad_images if img.get("src")]
-                    revu_ad_image_urls = [img.get("src") for img in revu_ad_images if img.get("src")]
-                    cloudfront_ad_image_urls = [img.get("src") for img in cloudfront_ad_images if img.get("src")]
-                    all_ad_images = ad_image_urls + dinnerqueen_ad_image_urls + revu_ad_image_urls + cloudfront_ad_image_urls
-
-                    ad_images_list.append(", ".join(all_ad_images))
-                    ad_status.append("O")  # 광고가 있으면 'O'
-                else:
-                    ad_images_list.append("")
-                    ad_status.append("X")  # 광고가 없으면 'X'
-
-                # 메인 프레임으로 돌아가기
-                driver.switch_to.default_content()
-
-            except Exception as e:
-                print(f"{url}에서 크롤링 중 오류 발생: {e}")
-                titles.append("error")
-                contents.append("error")
-                post_dates.append("unknown")
-                writers.append("unknown")
-                tags_list.append("unknown")
-                sympathies.append(0)
-                ad_images_list.append("")
-                ad_status.append("X")
-
-        driver.quit()
-
-        # DataFrame 생성 및 반환
-        return pd.DataFrame({
-            'writer': writers,
-            'date': post_dates,
-            'title': titles,
-            'content': contents,
-            'tags': tags_list,
-            'sympathy': sympathies,
-            'post_url': urls,
-            'ad_images': ad_images_list,
-            '광고': ad_status
-        })
\ No newline at end of file
+        records = []
+        for record in self.iter_blog_contents(urls, ordered=True):
+            if record['title'] != 'error':
+                callback(record['content'])  # 실시간으로 크롤링된 콘텐츠 전송
+            records.append(record)
+        return records_to_dataframe(records)
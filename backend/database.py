@@ -1,7 +1,17 @@
 import os
+import asyncio
+import hashlib
+import html
+import queue
+import re
+import threading
 import pymysql
+import aiomysql
 import time
 import logging  # 추가: 로깅 모듈 임포트
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
 from pymysql.err import OperationalError
 
 # 로깅 설정 추가
@@ -11,32 +21,189 @@ logging.basicConfig(
 )
 
 # 데이터베이스 연결 설정
+def connection_kwargs() -> dict:
+    return dict(
+        host=os.environ.get('DB_HOST', 'db'),
+        port=int(os.environ.get('DB_PORT', 3306)),
+        user=os.environ.get('DB_USER', 'root'),
+        password=os.environ.get('DB_PASSWORD', '1234'),
+        database=os.environ.get('DB_NAME', 'crawling_db'),
+        charset='utf8mb4',
+    )
+
+
+class ConnectionPool:
+    """
+    스레드 간에 공유하는 PyMySQL 연결 풀입니다.
+    minsize개의 연결을 미리 열어두고 최대 maxsize개까지 늘리며,
+    check_interval초 이상 쉬었던 연결은 꺼낼 때 ping으로 확인해 끊어졌으면 다시 연결합니다.
+    """
+
+    def __init__(self, minsize: int = 1, maxsize: int = 10, acquire_timeout: float = 10,
+                 check_interval: float = 30, connect_retries: int = 3) -> None:
+        self.minsize = minsize
+        self.maxsize = maxsize
+        self.acquire_timeout = acquire_timeout
+        self.check_interval = check_interval
+        self.connect_retries = connect_retries
+        self._idle: "queue.LifoQueue[Tuple[pymysql.connections.Connection, float]]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(maxsize)
+
+    def _connect(self) -> pymysql.connections.Connection:
+        delay = 0.5
+        for attempt in range(self.connect_retries):
+            try:
+                return pymysql.connect(cursorclass=pymysql.cursors.DictCursor, connect_timeout=5,
+                                       **connection_kwargs())
+            except OperationalError as e:
+                if attempt == self.connect_retries - 1:
+                    logging.critical(f"데이터베이스에 연결할 수 없습니다: {e}")
+                    raise
+                logging.error(f"데이터베이스에 연결할 수 없습니다. {delay}초 후에 재시도합니다...")
+                time.sleep(delay)
+                delay *= 2
+
+    def fill(self) -> None:
+        while self._idle.qsize() < self.minsize:
+            self._idle.put((self._connect(), time.monotonic()))
+        logging.info(f"데이터베이스 연결 풀이 준비되었습니다. (min={self.minsize}, max={self.maxsize})")
+
+    def acquire(self) -> pymysql.connections.Connection:
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise OperationalError("데이터베이스 연결 풀에서 연결을 가져오지 못했습니다.")
+        try:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - last_used >= self.check_interval:
+                try:
+                    conn.ping(reconnect=True)  # 오래 쉬었던 연결은 살아있는지 확인하고 끊겼으면 재연결
+                except Exception:
+                    logging.warning("끊어진 데이터베이스 연결을 교체합니다.")
+                    self._close_quietly(conn)
+                    conn = self._connect()
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn: pymysql.connections.Connection, discard: bool = False) -> None:
+        try:
+            if not discard and conn.open:
+                try:
+                    # 조회만 하고 반환된 연결의 트랜잭션 스냅샷이 다음 사용자에게 남지 않도록 정리
+                    conn.rollback()
+                except Exception:
+                    discard = True
+            if discard or not conn.open:
+                self._close_quietly(conn)
+            else:
+                self._idle.put((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[pymysql.connections.Connection]:
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    @staticmethod
+    def _close_quietly(conn: pymysql.connections.Connection) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_quietly(conn)
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+_async_pool: Optional[aiomysql.Pool] = None
+_async_pool_lock: Optional[asyncio.Lock] = None  # 이벤트 루프 안에서 처음 사용할 때 생성
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                minsize=int(os.environ.get('DB_POOL_MIN', 1)),
+                maxsize=int(os.environ.get('DB_POOL_MAX', 10)),
+            )
+        return _pool
+
+
 def get_connection():
-    retries = 5
-    while retries > 0:
+    """풀에서 연결을 빌려오는 컨텍스트 매니저. with 블록이 끝나면 연결은 풀로 반환됩니다."""
+    return get_pool().connection()
+
+
+def wait_for_database(timeout: float = 30) -> None:
+    """서버 시작 시 DB 컨테이너가 준비될 때까지 기다린 뒤 풀을 채웁니다."""
+    deadline = time.monotonic() + timeout
+    while True:
         try:
-            connection = pymysql.connect(
-                host=os.environ.get('DB_HOST', 'db'),
-                port=int(os.environ.get('DB_PORT', 3306)),
-                user=os.environ.get('DB_USER', 'root'),
-                password=os.environ.get('DB_PASSWORD', '1234'),
-                database=os.environ.get('DB_NAME', 'crawling_db'),
-                charset='utf8mb4',
-                cursorclass=pymysql.cursors.DictCursor
+            get_pool().fill()
+            return
+        except OperationalError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(1)
+
+
+async def get_async_pool() -> aiomysql.Pool:
+    """FastAPI 엔드포인트용 aiomysql 풀. 이벤트 루프에서 스레드풀을 거치지 않고 쿼리합니다."""
+    global _async_pool, _async_pool_lock
+    if _async_pool_lock is None:
+        _async_pool_lock = asyncio.Lock()
+    async with _async_pool_lock:
+        if _async_pool is None:
+            kwargs = connection_kwargs()
+            kwargs['db'] = kwargs.pop('database')
+            _async_pool = await aiomysql.create_pool(
+                minsize=int(os.environ.get('DB_POOL_MIN', 1)),
+                maxsize=int(os.environ.get('DB_POOL_MAX', 10)),
+                pool_recycle=3600,
+                autocommit=True,
+                cursorclass=aiomysql.DictCursor,
+                **kwargs,
             )
-            logging.info("데이터베이스에 정상적으로 연결되었습니다.")
-            return connection
-        except OperationalError as e:
-            logging.error("데이터베이스에 연결할 수 없습니다. 5초 후에 재시도합니다...")
-            retries -= 1
-            time.sleep(5)
-    logging.critical("여러 번 재시도 후에도 데이터베이스에 연결할 수 없습니다.")
-    raise Exception("여러 번 재시도 후에도 데이터베이스에 연결할 수 없습니다.")
+        return _async_pool
+
+
+async def close_pools() -> None:
+    global _pool, _async_pool, _async_pool_lock
+    if _async_pool is not None:
+        _async_pool.close()
+        await _async_pool.wait_closed()
+        _async_pool = None
+    _async_pool_lock = None
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
 
 def create_table():
-    conn = get_connection()
     try:
-        with conn.cursor() as cursor:
+        with get_connection() as conn, conn.cursor() as cursor:
             create_table_query = '''
             CREATE TABLE IF NOT EXISTS cr_data30 (
                 restaurant_name VARCHAR(255),
@@ -54,72 +221,496 @@ def create_table():
             '''
             cursor.execute(create_table_query)
             logging.info("테이블이 생성되었거나 이미 존재합니다.")
-        conn.commit()
+            conn.commit()
     except Exception as e:
         logging.error(f"테이블 생성 중 오류 발생: {e}")
-    finally:
-        conn.close()
 
 
-def save_to_db(data_list, restaurant_name):
-    conn = get_connection()
-    MAX_TAG_LENGTH = 255  # 태그 최대 길이 제한
+MAX_TAG_LENGTH = 255  # 태그 최대 길이 제한
+# 변경 여부를 비교하는 컬럼 (content_hash는 이 순서로 계산)
+FINGERPRINT_COLUMNS = ('restaurant_name', 'writer', 'date', 'title', 'content', 'tags', 'sympathy', 'ad_images', '광고',
+                       'ad_rule')
+LARGE_COLUMNS = ('content', 'ad_images')  # 기존 값 대신 MD5만 읽어와 비교하는 TEXT 컬럼
+
+
+def normalize_record(item: dict, restaurant_name: Optional[str] = None) -> dict:
+    tags = item.get('tags') or ""
+    return {
+        'restaurant_name': item.get('restaurant_name') or restaurant_name,
+        'writer': item.get('writer', 'unknown'),
+        'date': item.get('date', 'unknown'),
+        'title': item.get('title', 'unknown'),
+        'content': item.get('content', 'unknown'),
+        'tags': tags[:MAX_TAG_LENGTH],
+        'sympathy': item.get('sympathy', 0),
+        'post_url': item.get('post_url', 'unknown'),
+        'ad_images': item.get('ad_images', ''),
+        '광고': item.get('광고', 'X'),
+        'ad_rule': item.get('ad_rule'),
+    }
+
+
+def content_fingerprint(row: dict) -> bytes:
+    payload = '\x1f'.join('' if row[column] is None else str(row[column]) for column in FINGERPRINT_COLUMNS)
+    return hashlib.md5(payload.encode('utf-8')).digest()
+
+
+def md5_hex(value: Optional[str]) -> Optional[str]:
+    return hashlib.md5(value.encode('utf-8')).hexdigest() if value is not None else None
+
+
+def changed_columns(row: dict, existing: dict) -> List[str]:
+    changed = []
+    for column in FINGERPRINT_COLUMNS:
+        if column in LARGE_COLUMNS:
+            if md5_hex(row[column]) != existing[f'{column}_md5']:
+                changed.append(column)
+        elif row[column] != existing[column]:
+            changed.append(column)
+    return changed
+
 
+def hash_placeholders(count: int) -> str:
+    return ', '.join(['UNHEX(MD5(%s))'] * count)
+
+
+# 식당별 집계(restaurant_stats)에 영향을 주는 컬럼
+STATS_COLUMNS = ('restaurant_name', 'date', 'sympathy', '광고')
+POST_DATE_FORMAT = '%Y. %m. %d. %H:%M'  # POST_DATE_EXPR와 같은 형식 ('2021. 5. 31. 12:50')
+
+
+def parse_post_date(value: Optional[str]) -> Optional[datetime]:
     try:
-        with conn.cursor() as cursor:
-            insert_query = '''
-            INSERT INTO cr_data30 (restaurant_name, writer, date, title, content, tags, sympathy, post_url, ad_images, 광고)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        return datetime.strptime(value.strip(), POST_DATE_FORMAT)
+    except (AttributeError, ValueError):
+        return None
+
+
+def add_stats_delta(deltas: Dict[str, list], row: dict, sign: int = 1) -> None:
+    """게시물 하나의 집계 기여분을 [게시물 수, 광고 수, 공감 합계, 최신 게시일] 형태로 더하거나(sign=1) 뺍니다(sign=-1)."""
+    name = row['restaurant_name']
+    if name is None:
+        return
+    delta = deltas.setdefault(name, [0, 0, 0, None])
+    delta[0] += sign
+    delta[1] += sign * (row['광고'] == 'O')
+    delta[2] += sign * int(row['sympathy'] or 0)
+    if sign > 0:
+        posted = parse_post_date(row['date'])
+        if posted is not None and (delta[3] is None or posted > delta[3]):
+            delta[3] = posted
+
+
+def recompute_restaurant_stats(cursor, names: Optional[List[str]] = None) -> None:
+    """cr_data30을 다시 집계해 restaurant_stats를 덮어씁니다. names가 없으면 전체 식당을 다시 만듭니다."""
+    if names is None:
+        where, params = "restaurant_name IS NOT NULL", []
+        cursor.execute("DELETE FROM restaurant_stats")
+    else:
+        if not names:
+            return
+        where = f"restaurant_name IN ({', '.join(['%s'] * len(names))})"
+        params = list(names)
+        # 게시물이 모두 다른 식당으로 옮겨졌으면 행이 남지 않도록 먼저 지움
+        cursor.execute(f"DELETE FROM restaurant_stats WHERE {where}", params)
+    cursor.execute(
+        f"""
+        INSERT INTO restaurant_stats (restaurant_name, post_count, ad_count, sympathy_sum, latest_post_at)
+        SELECT restaurant_name, COUNT(*), SUM(`광고` = 'O'), COALESCE(SUM(sympathy), 0), MAX({POST_DATE_EXPR})
+        FROM cr_data30 WHERE {where} GROUP BY restaurant_name
+        """,
+        params,
+    )
+
+
+def apply_restaurant_stats(cursor, deltas: Dict[str, list], recompute: Set[str]) -> None:
+    """save_to_db와 같은 트랜잭션에서 식당별 집계를 증분 갱신하고, 증분으로 맞출 수 없는 식당은 다시 집계합니다."""
+    # 여러 writer가 같은 식당 행을 잠글 때 교착 상태가 생기지 않도록 이름 순서로 갱신
+    names = sorted(name for name in deltas if name not in recompute)
+    if names:
+        cursor.executemany(
+            """
+            INSERT INTO restaurant_stats (restaurant_name, post_count, ad_count, sympathy_sum, latest_post_at)
+            VALUES (%s, %s, %s, %s, %s)
             ON DUPLICATE KEY UPDATE
-                restaurant_name = VALUES(restaurant_name),
-                writer = VALUES(writer),
-                date = VALUES(date),
-                title = VALUES(title),
-                content = VALUES(content),
-                tags = VALUES(tags),
-                sympathy = VALUES(sympathy),
-                ad_images = VALUES(ad_images),
-                광고 = VALUES(광고);
-            '''
+                post_count = post_count + VALUES(post_count),
+                ad_count = ad_count + VALUES(ad_count),
+                sympathy_sum = sympathy_sum + VALUES(sympathy_sum),
+                latest_post_at = GREATEST(COALESCE(latest_post_at, VALUES(latest_post_at)),
+                                          COALESCE(VALUES(latest_post_at), latest_post_at))
+            """,
+            [(name, *deltas[name]) for name in names],
+        )
+    recompute_restaurant_stats(cursor, sorted(recompute))
+
 
-            # 태그 길이 제한 및 데이터 확인
-            data_values = [
-                (
-                    restaurant_name,
-                    item.get('writer', 'unknown'),
-                    item.get('date', 'unknown'),
-                    item.get('title', 'unknown'),
-                    item.get('content', 'unknown'),
-                    item.get('tags')[:MAX_TAG_LENGTH] if item.get('tags') and len(item['tags']) > MAX_TAG_LENGTH else (item.get('tags') or ""),
-                    item.get('sympathy', 0),
-                    item.get('post_url', 'unknown'),
-                    item.get('ad_images', ''),
-                    item.get('광고', 'X')
+def bump_data_version(cursor) -> None:
+    """조회 응답 캐시가 비교하는 데이터 버전을 올립니다. 저장과 같은 트랜잭션에서 호출합니다."""
+    cursor.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+
+
+def save_to_db(data_list, restaurant_name=None) -> Dict[str, int]:
+    """
+    레코드 목록을 증분 upsert 합니다. restaurant_name은 각 레코드의 값을 우선 사용하고,
+    레코드에 없을 때만 인자로 받은 값을 사용합니다.
+    inserted/updated/unchanged 건수를 반환하며, 실패하면 예외를 다시 발생시킵니다.
+    """
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    for status in save_records(data_list, restaurant_name).values():
+        counts[status] += 1
+    return counts
+
+
+def save_records(data_list, restaurant_name=None) -> Dict[str, str]:
+    """
+    save_to_db와 같지만 post_url별 결과(inserted/updated/unchanged)를 반환합니다.
+    content_hash가 같은 게시물은 last_crawled_at만 갱신하고, 달라진 게시물은 바뀐 컬럼만 UPDATE 합니다.
+    같은 트랜잭션에서 restaurant_stats의 식당별 집계도 증분 갱신하고, 추가/변경된 행이 있으면 데이터 버전을 올립니다.
+    """
+    # 같은 배치 안에서 중복된 post_url은 마지막 레코드만 사용
+    rows = {}
+    for item in data_list:
+        row = normalize_record(item, restaurant_name)
+        row['content_hash'] = content_fingerprint(row)
+        rows[row['post_url']] = row
+    statuses: Dict[str, str] = {}
+    if not rows:
+        return statuses
+
+    try:
+        with get_connection() as conn, conn.cursor() as cursor:
+            urls = list(rows)
+            cursor.execute(
+                f"""
+                SELECT post_url, content_hash, restaurant_name, writer, date, title, tags, sympathy, 광고, ad_rule,
+                       MD5(content) AS content_md5, MD5(ad_images) AS ad_images_md5
+                FROM cr_data30
+                WHERE post_url_hash IN ({hash_placeholders(len(urls))})
+                """,
+                urls,
+            )
+            existing_rows = {row['post_url']: row for row in cursor.fetchall()}
+
+            inserts, touch_urls, updates = [], [], {}
+            stats_deltas: Dict[str, list] = {}
+            stats_recompute: Set[str] = set()
+            for url, row in rows.items():
+                existing = existing_rows.get(url)
+                if existing is None:
+                    inserts.append(row)
+                    statuses[url] = 'inserted'
+                    add_stats_delta(stats_deltas, row)
+                elif existing['content_hash'] == row['content_hash']:
+                    touch_urls.append(url)
+                    statuses[url] = 'unchanged'
+                else:
+                    columns = tuple(changed_columns(row, existing))
+                    # 예전 행이라 content_hash가 비어 있으면 값이 같아도 해시만 채움
+                    updates.setdefault(columns, []).append(row)
+                    statuses[url] = 'updated' if columns else 'unchanged'
+                    if any(column in STATS_COLUMNS for column in columns):
+                        add_stats_delta(stats_deltas, existing, sign=-1)
+                        add_stats_delta(stats_deltas, row)
+                        if 'restaurant_name' in columns or 'date' in columns:
+                            # 최신 게시일은 빼는 방식으로 되돌릴 수 없으므로 예전 식당은 다시 집계
+                            if existing['restaurant_name'] is not None:
+                                stats_recompute.add(existing['restaurant_name'])
+            changed = sum(status != 'unchanged' for status in statuses.values())
+
+            if inserts:
+                # SELECT 이후 다른 writer가 먼저 넣었을 수 있으므로 중복 키면 전체 컬럼을 갱신
+                insert_query = '''
+                INSERT INTO cr_data30 (restaurant_name, writer, date, title, content, tags, sympathy, post_url, ad_images, 광고, ad_rule, content_hash, last_crawled_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+                ON DUPLICATE KEY UPDATE
+                    last_crawled_at = NOW(),
+                    content_hash = VALUES(content_hash),
+                    restaurant_name = VALUES(restaurant_name),
+                    writer = VALUES(writer),
+                    date = VALUES(date),
+                    title = VALUES(title),
+                    content = VALUES(content),
+                    tags = VALUES(tags),
+                    sympathy = VALUES(sympathy),
+                    ad_images = VALUES(ad_images),
+                    광고 = VALUES(광고),
+                    ad_rule = VALUES(ad_rule);
+                '''
+                cursor.executemany(insert_query, [
+                    (row['restaurant_name'], row['writer'], row['date'], row['title'], row['content'], row['tags'],
+                     row['sympathy'], row['post_url'], row['ad_images'], row['광고'], row['ad_rule'], row['content_hash'])
+                    for row in inserts
+                ])
+                # 새 행은 1, 중복 키로 갱신된 행은 2(값이 같으면 0)로 세므로 다르면 다른 writer와 겹친 것
+                if cursor.rowcount != len(inserts):
+                    stats_recompute.update(row['restaurant_name'] for row in inserts
+                                           if row['restaurant_name'] is not None)
+
+            if touch_urls:
+                cursor.execute(
+                    f"UPDATE cr_data30 SET last_crawled_at = NOW() "
+                    f"WHERE post_url_hash IN ({hash_placeholders(len(touch_urls))})",
+                    touch_urls,
                 )
-                for item in data_list
-            ]
 
-            logging.info(f"Data to be saved: {data_values}")
-            cursor.executemany(insert_query, data_values)
+            for columns, changed_rows in updates.items():
+                assignments = ''.join(f"`{column}` = %s, " for column in columns)
+                cursor.executemany(
+                    f"UPDATE cr_data30 SET {assignments}content_hash = %s, last_crawled_at = NOW() "
+                    f"WHERE post_url_hash = UNHEX(MD5(%s))",
+                    [
+                        tuple(row[column] for column in columns) + (row['content_hash'], row['post_url'])
+                        for row in changed_rows
+                    ],
+                )
 
-        conn.commit()
-        logging.info(f"{len(data_values)} rows inserted/updated in the database.")
+            apply_restaurant_stats(cursor, stats_deltas, stats_recompute)
+            if changed:
+                bump_data_version(cursor)
+            conn.commit()
+        logging.info(f"{len(rows)} rows saved: inserted={len(inserts)}, "
+                     f"updated={changed - len(inserts)}, unchanged={len(rows) - changed}")
+        return statuses
     except Exception as e:
         logging.error(f"데이터베이스 저장 중 오류 발생: {e}")
-    finally:
-        conn.close()
+        raise
 
 
+# 이미 수집된 URL 조회 (ttl_hours가 있으면 그 시간 안에 수집된 것만)
+def fetch_crawled_urls(urls: List[str], ttl_hours: Optional[float] = None, chunk_size: int = 500) -> Set[str]:
+    crawled: Set[str] = set()
+    with get_connection() as conn, conn.cursor() as cursor:
+        for start in range(0, len(urls), chunk_size):
+            chunk = urls[start:start + chunk_size]
+            query = (f"SELECT post_url FROM cr_data30 "
+                     f"WHERE post_url_hash IN ({hash_placeholders(len(chunk))})")
+            params = list(chunk)
+            if ttl_hours is not None:
+                query += " AND last_crawled_at >= NOW() - INTERVAL %s SECOND"
+                params.append(int(ttl_hours * 3600))
+            cursor.execute(query, params)
+            crawled.update(row['post_url'] for row in cursor.fetchall())
+    return crawled
 
 
-# 데이터베이스에서 모든 데이터 조회 함수
-def fetch_all_data():
-    conn = get_connection()
-    try:
-        with conn.cursor() as cursor:
-            select_query = 'SELECT * FROM cr_data30;'
-            cursor.execute(select_query)
-            results = cursor.fetchall()
-        return results
-    finally:
-        conn.close()
\ No newline at end of file
+def fetch_existing_posts(urls: List[str], columns: Tuple[str, ...] = ('restaurant_name', 'sympathy'),
+                         chunk_size: int = 500) -> Dict[str, dict]:
+    """저장된 게시물의 일부 컬럼을 post_url 기준으로 조회합니다."""
+    existing: Dict[str, dict] = {}
+    select_columns = ', '.join(f"`{column}`" for column in ('post_url',) + tuple(columns))
+    with get_connection() as conn, conn.cursor() as cursor:
+        for start in range(0, len(urls), chunk_size):
+            chunk = urls[start:start + chunk_size]
+            cursor.execute(
+                f"SELECT {select_columns} FROM cr_data30 WHERE post_url_hash IN ({hash_placeholders(len(chunk))})",
+                chunk,
+            )
+            existing.update((row['post_url'], row) for row in cursor.fetchall())
+    return existing
+
+
+PLACE_COLUMNS = ('restaurant_name', 'googlemap_name', 'rating', 'review_count', 'price', 'category', 'image', 'status')
+
+
+def fetch_enriched_places(names: List[str], ttl_hours: Optional[float] = None) -> Set[str]:
+    """구글 지도 정보가 이미 저장된 식당 이름을 반환합니다. ttl_hours를 지정하면 그 시간 안에 수집한 것만 포함합니다."""
+    if not names:
+        return set()
+    query = f"SELECT restaurant_name FROM google_maps_places WHERE restaurant_name IN ({', '.join(['%s'] * len(names))})"
+    params = list(names)
+    if ttl_hours is not None:
+        query += " AND enriched_at >= NOW() - INTERVAL %s SECOND"
+        params.append(int(ttl_hours * 3600))
+    with get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(query, params)
+        return {row['restaurant_name'] for row in cursor.fetchall()}
+
+
+def upsert_places(places: List[dict]) -> int:
+    """구글 지도 정보를 restaurant_name 기준으로 저장하거나 갱신합니다."""
+    if not places:
+        return 0
+    columns = ', '.join(PLACE_COLUMNS)
+    updates = ', '.join(f"{column} = VALUES({column})" for column in PLACE_COLUMNS[1:])
+    with get_connection() as conn, conn.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO google_maps_places ({columns}, enriched_at) VALUES ({', '.join(['%s'] * len(PLACE_COLUMNS))}, NOW()) "
+            f"ON DUPLICATE KEY UPDATE {updates}, enriched_at = NOW()",
+            [tuple(place.get(column) for column in PLACE_COLUMNS) for place in places],
+        )
+        conn.commit()
+    return len(places)
+
+
+DATA_COLUMNS = ('id', 'restaurant_name', 'writer', 'date', 'title', 'content', 'tags', 'sympathy',
+                'post_url', 'ad_images', '광고', 'ad_rule')
+# date 컬럼은 '2021. 5. 31. 12:50' 형식의 문자열이므로 기간 필터는 변환한 값으로 비교
+POST_DATE_EXPR = "STR_TO_DATE(date, '%%Y. %%c. %%e. %%H:%%i')"
+
+
+def build_data_query(after_id: Optional[int] = None, limit: Optional[int] = 100, restaurant_name: Optional[str] = None,
+                     ad: Optional[str] = None, date_from: Optional[date] = None, date_to: Optional[date] = None,
+                     fields: Optional[List[str]] = None) -> Tuple[str, list]:
+    """id 기준 keyset 페이지 조회 쿼리를 만듭니다. fields가 없으면 모든 컬럼을, limit이 None이면 끝까지 조회합니다."""
+    columns = list(fields) if fields else list(DATA_COLUMNS)
+    if 'id' not in columns:
+        columns.insert(0, 'id')  # 다음 페이지 커서로 쓰이므로 id는 항상 포함
+    conditions, params = [], []
+    if after_id is not None:
+        conditions.append("id > %s")
+        params.append(after_id)
+    if restaurant_name is not None:
+        conditions.append("restaurant_name = %s")
+        params.append(restaurant_name)
+    if ad is not None:
+        conditions.append("`광고` = %s")
+        params.append(ad)
+    if date_from is not None:
+        conditions.append(f"{POST_DATE_EXPR} >= %s")
+        params.append(date_from)
+    if date_to is not None:
+        conditions.append(f"{POST_DATE_EXPR} < %s + INTERVAL 1 DAY")
+        params.append(date_to)
+    query = f"SELECT {', '.join(f'`{column}`' for column in columns)} FROM cr_data30"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY id"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    return query, params
+
+
+async def stream_data_async(chunk_size: int = 200, **filters) -> AsyncIterator[dict]:
+    """서버 측 커서로 조회 결과를 chunk_size개씩 받아 한 행씩 내보냅니다."""
+    query, params = build_data_query(**filters)
+    pool = await get_async_pool()
+    async with pool.acquire() as conn, conn.cursor(aiomysql.SSDictCursor) as cursor:
+        await cursor.execute(query, params)
+        while True:
+            rows = await cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row
+
+
+
+RESTAURANT_STATS_SELECT = (
+    "SELECT restaurant_name, post_count, ad_count, ad_count / post_count AS ad_ratio, sympathy_sum, "
+    "sympathy_sum / post_count AS sympathy_avg, latest_post_at, updated_at FROM restaurant_stats"
+)
+RESTAURANT_STATS_ORDER = {
+    'post_count': 'post_count',
+    'ad_ratio': 'ad_ratio',
+    'sympathy_avg': 'sympathy_avg',
+    'sympathy_sum': 'sympathy_sum',
+    'latest_post_at': 'latest_post_at',
+    'restaurant_name': 'restaurant_name',
+}
+
+
+def format_restaurant_stats(row: dict) -> dict:
+    row['ad_ratio'] = round(float(row['ad_ratio'] or 0), 4)
+    row['sympathy_avg'] = round(float(row['sympathy_avg'] or 0), 2)
+    return row
+
+
+async def fetch_restaurant_stats_async(restaurant_name: str) -> Optional[dict]:
+    pool = await get_async_pool()
+    async with pool.acquire() as conn, conn.cursor() as cursor:
+        await cursor.execute(RESTAURANT_STATS_SELECT + " WHERE restaurant_name = %s", (restaurant_name,))
+        row = await cursor.fetchone()
+    return format_restaurant_stats(row) if row else None
+
+
+async def list_restaurant_stats_async(order_by: str = 'post_count', descending: bool = True, min_posts: int = 1,
+                                      limit: int = 100, offset: int = 0) -> List[dict]:
+    """식당별 집계를 정렬해 반환합니다. 식당당 한 행인 restaurant_stats만 읽으므로 게시물 수와 관계없이 빠릅니다."""
+    query = (f"{RESTAURANT_STATS_SELECT} WHERE post_count >= %s "
+             f"ORDER BY {RESTAURANT_STATS_ORDER[order_by]} {'DESC' if descending else 'ASC'}, restaurant_name "
+             f"LIMIT %s OFFSET %s")
+    pool = await get_async_pool()
+    async with pool.acquire() as conn, conn.cursor() as cursor:
+        await cursor.execute(query, (max(min_posts, 1), limit, offset))
+        rows = await cursor.fetchall()
+    return [format_restaurant_stats(row) for row in rows]
+
+
+
+SEARCH_MATCH_EXPR = "MATCH(title, content, tags) AGAINST (%s IN BOOLEAN MODE)"
+SEARCH_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+MIN_SEARCH_TERM_LENGTH = 2  # ngram_token_size 기본값보다 짧은 검색어는 인덱스로 찾을 수 없음
+
+
+def search_terms(q: str) -> List[str]:
+    """검색어를 공백으로 나누고 BOOLEAN MODE 연산자를 제거합니다."""
+    terms = [SEARCH_BOOLEAN_OPERATORS.sub(' ', term).strip() for term in q.split()]
+    return [term for term in dict.fromkeys(terms) if len(term) >= MIN_SEARCH_TERM_LENGTH]
+
+
+def build_search_query(terms: List[str], match_all: bool = True, restaurant_name: Optional[str] = None,
+                       ad: Optional[str] = None, limit: int = 20, offset: int = 0,
+                       snippet_length: int = 160) -> Tuple[str, list]:
+    """
+    FULLTEXT(ngram) 인덱스로 검색하는 쿼리를 만듭니다. 관련도(score) 순으로 정렬하며,
+    본문 전체 대신 첫 번째 검색어 주변의 snippet_length 글자만 잘라서 반환합니다.
+    """
+    against = ' '.join(('+' if match_all else '') + f'"{term}"' for term in terms)
+    query = (
+        f"SELECT id, restaurant_name, title, date, sympathy, post_url, `광고`, "
+        f"{SEARCH_MATCH_EXPR} AS score, "
+        f"SUBSTRING(content, GREATEST(1, LOCATE(%s, content) - %s), %s) AS snippet "
+        f"FROM cr_data30 WHERE {SEARCH_MATCH_EXPR}"
+    )
+    params: list = [against, terms[0], snippet_length // 4, snippet_length, against]
+    if restaurant_name is not None:
+        query += " AND restaurant_name = %s"
+        params.append(restaurant_name)
+    if ad is not None:
+        query += " AND `광고` = %s"
+        params.append(ad)
+    query += " ORDER BY score DESC, id DESC LIMIT %s OFFSET %s"
+    params.extend([limit, offset])
+    return query, params
+
+
+def highlight(text: Optional[str], terms: List[str]) -> Optional[str]:
+    """
+    검색어를 네이버 검색 API와 같은 <b> 태그로 감쌉니다.
+    크롤링한 본문에 들어 있는 태그가 결과에 그대로 섞이지 않도록 나머지 텍스트는 모두 HTML 이스케이프합니다.
+    """
+    if not text:
+        return text
+    pattern = re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    parts, last = [], 0
+    for match in pattern.finditer(text):
+        parts.append(html.escape(text[last:match.start()]))
+        parts.append(f"<b>{html.escape(match.group(0))}</b>")
+        last = match.end()
+    parts.append(html.escape(text[last:]))
+    return ''.join(parts)
+
+
+async def search_posts_async(q: str, match_all: bool = True, highlight_terms: bool = True, **filters) -> List[dict]:
+    terms = search_terms(q)
+    if not terms:
+        raise ValueError(f"검색어는 {MIN_SEARCH_TERM_LENGTH}글자 이상이어야 합니다.")
+    query, params = build_search_query(terms, match_all, **filters)
+    pool = await get_async_pool()
+    async with pool.acquire() as conn, conn.cursor() as cursor:
+        await cursor.execute(query, params)
+        rows = await cursor.fetchall()
+    for row in rows:
+        row['score'] = float(row['score'])
+        if highlight_terms:
+            row['title'] = highlight(row['title'], terms)
+            row['snippet'] = highlight(row['snippet'], terms)
+    return rows
+
+async def fetch_data_version_async() -> int:
+    pool = await get_async_pool()
+    async with pool.acquire() as conn, conn.cursor() as cursor:
+        await cursor.execute("SELECT version FROM data_version WHERE id = 1")
+        row = await cursor.fetchone()
+    return row['version'] if row else 0
\ No newline at end of file
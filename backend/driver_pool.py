@@ -0,0 +1,148 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from selenium import webdriver
+
+from metrics import DRIVER_RESTARTS
+
+
+def read_rss_mb(driver: webdriver.Firefox) -> Optional[float]:
+    """브라우저 프로세스의 RSS(MB)를 /proc에서 읽습니다. 확인할 수 없으면 None을 반환합니다."""
+    pid = driver.capabilities.get('moz:processID')
+    if not pid:
+        return None
+    try:
+        with open(f"/proc/{pid}/status", "r") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+class DriverPool:
+    """
+    WebDriver 인스턴스를 스레드 간에 빌려주고 돌려받는 풀입니다.
+    드라이버는 필요할 때 최대 size개까지 생성되며, 한 번에 한 스레드만 사용합니다.
+    max_pages 페이지를 처리했거나 메모리가 max_memory_mb 이상 늘어난 드라이버는 재생성하고,
+    응답하지 않는 드라이버는 다른 작업자에 영향을 주지 않고 교체합니다.
+    """
+
+    def __init__(self, factory: Callable[[], webdriver.Firefox], size: int,
+                 max_pages: int = 100, max_memory_mb: int = 1024) -> None:
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.restarts = 0
+        self._idle: "queue.LifoQueue[webdriver.Firefox]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._pages: Dict[int, int] = {}
+        self._baseline_rss: Dict[int, Optional[float]] = {}
+        self._closed = False
+
+    def _create(self) -> webdriver.Firefox:
+        driver = self.factory()
+        with self._lock:
+            self._pages[id(driver)] = 0
+            self._baseline_rss[id(driver)] = read_rss_mb(driver)
+        return driver
+
+    def _discard(self, driver: webdriver.Firefox, reason: str) -> None:
+        logging.info(f"WebDriver를 폐기합니다: {reason}")
+        with self._lock:
+            self._pages.pop(id(driver), None)
+            self._baseline_rss.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.error(f"WebDriver 종료 중 오류 발생: {e}")
+
+    def is_healthy(self, driver: webdriver.Firefox) -> bool:
+        try:
+            driver.window_handles  # 세션이 살아있는지 확인하는 가벼운 명령
+            return True
+        except Exception:
+            return False
+
+    def _needs_recycle(self, driver: webdriver.Firefox) -> Optional[str]:
+        pages = self._pages.get(id(driver), 0)
+        if self.max_pages and pages >= self.max_pages:
+            return f"{pages}페이지 처리 후 재생성"
+        baseline = self._baseline_rss.get(id(driver))
+        current = read_rss_mb(driver)
+        if self.max_memory_mb and baseline is not None and current is not None \
+                and current - baseline >= self.max_memory_mb:
+            return f"메모리 {current - baseline:.0f}MB 증가"
+        return None
+
+    def acquire(self, timeout: Optional[float] = None) -> webdriver.Firefox:
+        if self._closed:
+            raise RuntimeError("DriverPool이 이미 종료되었습니다.")
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("사용 가능한 WebDriver가 없습니다.")
+        try:
+            while True:
+                try:
+                    driver = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._create()
+                if self.is_healthy(driver):
+                    return driver
+                logging.warning("응답하지 않는 WebDriver를 교체합니다.")
+                self._discard(driver, "상태 확인 실패")
+                self.restarts += 1
+                DRIVER_RESTARTS.labels('unhealthy').inc()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver: webdriver.Firefox, failed: bool = False) -> None:
+        try:
+            with self._lock:
+                if id(driver) in self._pages:
+                    self._pages[id(driver)] += 1
+            if self._closed:
+                self._discard(driver, "풀 종료")
+            elif failed and not self.is_healthy(driver):
+                logging.warning("작업 중 고장난 WebDriver를 교체합니다.")
+                self._discard(driver, "작업 중 드라이버 오류")
+                self.restarts += 1
+                DRIVER_RESTARTS.labels('crashed').inc()
+            else:
+                reason = self._needs_recycle(driver)
+                if reason:
+                    self._discard(driver, reason)
+                    self.restarts += 1
+                    DRIVER_RESTARTS.labels('recycled').inc()
+                else:
+                    self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        driver = self.acquire(timeout)
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(driver, failed=failed)
+
+    def close(self) -> None:
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver, "풀 종료")
+        logging.info("WebDriver 풀이 종료되었습니다.")
@@ -0,0 +1,235 @@
+import argparse
+import csv
+import io
+import json
+import logging
+import os
+import time
+from datetime import date
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+import aiomysql
+import pymysql
+
+from database import build_data_query, connection_kwargs
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+
+# 예전 save_to_csv.py(SELECT *)로 만든 cr_data30.csv와 같은 컬럼 순서 (이후 추가된 ad_rule은 맨 뒤)
+EXPORT_COLUMNS = ('restaurant_name', 'id', 'writer', 'date', 'title', 'content', 'tags', 'sympathy', 'post_url',
+                  'ad_images', '광고', 'ad_rule')
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', '.csv'),
+    'jsonl': ('application/x-ndjson', '.jsonl'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+}
+# 느린 클라이언트에 스트리밍하는 동안 서버가 연결을 끊지 않도록 (초)
+NET_WRITE_TIMEOUT = 3600
+
+
+class CsvEncoder:
+    def header(self) -> bytes:
+        return '\ufeff'.encode('utf-8') + self.encode_rows([dict(zip(EXPORT_COLUMNS, EXPORT_COLUMNS))])  # utf-8-sig
+
+    def encode_rows(self, rows: List[dict]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')  # pandas to_csv와 같은 줄바꿈
+        writer.writerows([row.get(column) for column in EXPORT_COLUMNS] for row in rows)
+        return buffer.getvalue().encode('utf-8')
+
+    def close(self) -> bytes:
+        return b''
+
+
+class JsonlEncoder:
+    def header(self) -> bytes:
+        return b''
+
+    def encode_rows(self, rows: List[dict]) -> bytes:
+        return ''.join(json.dumps(row, ensure_ascii=False, default=str) + '\n' for row in rows).encode('utf-8')
+
+    def close(self) -> bytes:
+        return b''
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter가 쓴 바이트를 모아두었다가 drain()으로 꺼내는 파일 객체 (위치는 누적해서 기록)."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b''.join(self._chunks), []
+        return data
+
+
+class ParquetEncoder:
+    """청크마다 row group 하나를 써서 전체 결과를 메모리에 올리지 않고 Parquet 파일을 만듭니다."""
+
+    def __init__(self) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet 내보내기에는 pyarrow가 필요합니다. (pip install pyarrow)")
+        self._pa = pa
+        self.schema = pa.schema([
+            (column, pa.int64() if column in ('id', 'sympathy') else pa.string()) for column in EXPORT_COLUMNS
+        ])
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self.schema, compression='zstd')
+
+    def header(self) -> bytes:
+        return self._sink.drain()
+
+    def encode_rows(self, rows: List[dict]) -> bytes:
+        table = self._pa.Table.from_pylist(
+            [{column: row.get(column) for column in EXPORT_COLUMNS} for row in rows], schema=self.schema)
+        self._writer.write_table(table)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+ENCODERS = {'csv': CsvEncoder, 'jsonl': JsonlEncoder, 'parquet': ParquetEncoder}
+
+
+def create_encoder(fmt: str):
+    if fmt not in ENCODERS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} (가능한 형식: {', '.join(ENCODERS)})")
+    return ENCODERS[fmt]()
+
+
+def iter_rows(chunk_size: int = 1000, since_id: Optional[int] = None, **filters) -> Iterator[List[dict]]:
+    """
+    서버 측 커서(SSDictCursor)로 id 순서대로 chunk_size행씩 읽습니다.
+    중간에 멈추면 남은 행을 읽어 버리지 않도록 풀이 아닌 전용 연결을 사용하고 닫습니다.
+    """
+    query, params = build_data_query(after_id=since_id, limit=None, fields=list(EXPORT_COLUMNS), **filters)
+    conn = pymysql.connect(cursorclass=pymysql.cursors.SSDictCursor, connect_timeout=5, **connection_kwargs())
+    try:
+        # cursor.close()는 남은 결과를 끝까지 읽으므로 닫지 않고 연결을 바로 닫음
+        cursor = conn.cursor()
+        cursor.execute("SET SESSION net_write_timeout = %s", (NET_WRITE_TIMEOUT,))
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+async def iter_rows_async(chunk_size: int = 1000, since_id: Optional[int] = None, **filters) -> AsyncIterator[List[dict]]:
+    """iter_rows의 aiomysql 버전입니다. 클라이언트가 연결을 끊으면 전용 연결을 바로 닫습니다."""
+    query, params = build_data_query(after_id=since_id, limit=None, fields=list(EXPORT_COLUMNS), **filters)
+    kwargs = connection_kwargs()
+    kwargs['db'] = kwargs.pop('database')
+    conn = await aiomysql.connect(cursorclass=aiomysql.SSDictCursor, connect_timeout=5, **kwargs)
+    try:
+        cursor = await conn.cursor()
+        await cursor.execute("SET SESSION net_write_timeout = %s", (NET_WRITE_TIMEOUT,))
+        await cursor.execute(query, params)
+        while True:
+            rows = await cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+async def stream_export_async(encoder, chunk_size: int = 1000, **filters) -> AsyncIterator[bytes]:
+    """HTTP 응답으로 흘려보낼 내보내기 본문을 청크 단위로 만듭니다."""
+    yield encoder.header()
+    async for rows in iter_rows_async(chunk_size, **filters):
+        yield encoder.encode_rows(rows)
+    yield encoder.close()
+
+
+def load_state(path: str) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def export_to_file(output: str, fmt: Optional[str] = None, chunk_size: int = 1000, since_id: Optional[int] = None,
+                   state_path: Optional[str] = None, **filters) -> Dict[str, object]:
+    """
+    cr_data30을 output 파일로 내보냅니다. fmt가 없으면 확장자로 형식을 정합니다.
+    state_path를 지정하면 지난번에 내보낸 마지막 id 이후의 행만 내보내고, 성공한 뒤 마지막 id를 기록합니다.
+    임시 파일에 쓴 뒤 이름을 바꾸므로 중간에 실패해도 이전 파일과 상태는 그대로 남습니다.
+    """
+    fmt = fmt or next((name for name, (_, extension) in FORMATS.items() if output.endswith(extension)), 'csv')
+    state = load_state(state_path) if state_path else {}
+    if since_id is None:
+        since_id = state.get('last_id')
+
+    encoder = create_encoder(fmt)
+    started = time.monotonic()
+    rows_written, chunks, last_id = 0, 0, since_id
+    temp_path = f"{output}.tmp"
+    try:
+        with open(temp_path, 'wb') as file:
+            file.write(encoder.header())
+            for rows in iter_rows(chunk_size, since_id=since_id, **filters):
+                file.write(encoder.encode_rows(rows))
+                rows_written += len(rows)
+                last_id = rows[-1]['id']
+                chunks += 1
+                if chunks % 100 == 0:
+                    logging.info(f"{rows_written}행을 내보냈습니다. (마지막 id={last_id})")
+            file.write(encoder.close())
+        os.replace(temp_path, output)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    result = {'output': output, 'format': fmt, 'since_id': since_id, 'last_id': last_id, 'rows': rows_written,
+              'elapsed_s': round(time.monotonic() - started, 1)}
+    if state_path:
+        with open(state_path, 'w', encoding='utf-8') as file:
+            json.dump({'last_id': last_id, 'output': output, 'rows': rows_written,
+                       'exported_at': time.strftime('%Y-%m-%d %H:%M:%S')}, file, ensure_ascii=False, indent=2)
+    logging.info(f"{rows_written}행을 '{output}'({fmt})로 내보냈습니다. (id {since_id} 이후, 마지막 id={last_id})")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="cr_data30을 서버 측 커서로 나눠 읽어 CSV/JSONL/Parquet 파일로 내보내기")
+    parser.add_argument('output', help="저장할 파일 (확장자로 형식 결정: .csv, .jsonl, .parquet)")
+    parser.add_argument('--format', choices=list(FORMATS), default=None)
+    parser.add_argument('--chunk-size', type=int, default=1000, help="한 번에 읽고 쓰는 행 수")
+    parser.add_argument('--since-id', type=int, default=None, help="이 id보다 큰 행만 내보냄")
+    parser.add_argument('--state', default=None, help="증분 내보내기 상태 파일 (마지막으로 내보낸 id를 기록)")
+    parser.add_argument('--restaurant-name', default=None)
+    parser.add_argument('--ad', choices=['O', 'X'], default=None, help="광고 여부")
+    parser.add_argument('--date-from', type=date.fromisoformat, default=None)
+    parser.add_argument('--date-to', type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    print(export_to_file(args.output, args.format, chunk_size=args.chunk_size, since_id=args.since_id,
+                         state_path=args.state, restaurant_name=args.restaurant_name, ad=args.ad,
+                         date_from=args.date_from, date_to=args.date_to))
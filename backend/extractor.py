@@ -0,0 +1,220 @@
+import logging
+import time
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from ad_classifier import get_classifier
+
+try:
+    import lxml.html
+    HAS_LXML = True
+except ImportError:  # lxml이 없으면 BeautifulSoup 경로만 사용
+    HAS_LXML = False
+
+TITLE_CLASSES = {'se-module', 'se-module-text', 'se-title-text'}
+VIDEO_CLASSES = {'se-module', 'se-module-video', '__se-component'}
+SYMPATHY_BUTTON_CLASSES = {'u_likeit_list_btn', '_button', 'btn_sympathy', 'pcol2', 'off'}
+SYMPATHY_COUNT_CLASSES = {'u_cnt', '_count'}
+NON_TEXT_TAGS = {'script', 'style', 'template'}  # BeautifulSoup의 get_text도 이 태그의 문자열은 제외
+
+
+def build_record(url: str, title: Optional[str], content: str, post_date: Optional[str], writer: Optional[str],
+                 tags: List[str], sympathy_text: Optional[str], ad_image_urls: List[str],
+                 ad_rule: Optional[str] = None) -> dict:
+    try:
+        sympathy = int(sympathy_text) if sympathy_text is not None else 0
+    except ValueError:
+        sympathy = 0
+    return {
+        'writer': writer if writer is not None else "unknown",
+        'date': post_date if post_date is not None else "unknown",
+        'title': title if title is not None else "unknown",
+        'content': content,
+        'tags': ", ".join(tags),
+        'sympathy': sympathy,
+        'post_url': url,
+        'ad_images': ", ".join(ad_image_urls),
+        '광고': "O" if ad_rule or ad_image_urls else "X",
+        'ad_rule': ad_rule
+    }
+
+
+def _parse_lxml(page_source: str):
+    try:
+        return lxml.html.fromstring(page_source)
+    except ValueError:
+        # 인코딩 선언이 포함된 문서는 str로 파싱할 수 없으므로 bytes로 다시 시도
+        return lxml.html.fromstring(page_source.encode('utf-8'))
+
+
+def extract_post_lxml(page_source: str, url: str, timings: Dict[str, float]) -> dict:
+    """
+    lxml 트리를 한 번만 순회하면서 제목, 본문, 날짜, 작성자, 태그, 공감 수, 광고 이미지를 함께 수집합니다.
+    선택자 의미는 BeautifulSoup 경로(extract_post_soup)와 같습니다.
+    """
+    started = time.perf_counter()
+    root = _parse_lxml(page_source)
+    timings['parse'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    found: Dict[str, list] = {}  # title/date/writer/sympathy: 첫 번째로 일치한 요소의 텍스트 조각
+    content_parts: List[list] = []
+    tag_parts: List[list] = []
+    img_srcs: List[str] = []
+    wrap_tag_depth = [0]
+
+    def add_text(text, collectors):
+        for buf, strip in collectors:
+            if strip:
+                text_stripped = text.strip()
+                if text_stripped:
+                    buf.append(text_stripped)
+            else:
+                buf.append(text)
+
+    def visit(el, collectors):
+        tag = el.tag
+        class_attr = el.get('class')
+        classes = set(class_attr.split()) if class_attr else ()
+
+        # 원본 로직에서 decompose 하던 동영상/해시태그 영역은 하위 트리 전체를 건너뜀
+        if tag == 'div' and classes and VIDEO_CLASSES <= classes:
+            parent = el.getparent()
+            if parent is not None and parent.tag == 'div' and 'se-main-container' in (parent.get('class') or '').split():
+                content_parts.append([])
+            return
+        if tag == 'span' and '__se-hash-tag' in classes:
+            return
+        if tag in NON_TEXT_TAGS:
+            return
+        if tag == 'img':
+            src = el.get('src')
+            if src:
+                img_srcs.append(src)
+
+        own = None
+        parent = el.getparent()
+        if tag == 'div':
+            if parent is not None and parent.tag == 'div' and 'se-main-container' in (parent.get('class') or '').split():
+                own = (content_parts, True)
+            if 'wrap_tag' in classes:
+                wrap_tag_depth[0] += 1
+        elif tag == 'span':
+            if 'se_publishDate' in classes and 'date' not in found:
+                own = (found.setdefault('date', []), False)
+            elif 'ell' in classes and wrap_tag_depth[0]:
+                own = (tag_parts, False)
+            elif 'title' not in found and parent is not None and parent.tag == 'p':
+                grandparent = parent.getparent()
+                if grandparent is not None and grandparent.tag == 'div' and \
+                        TITLE_CLASSES <= set((grandparent.get('class') or '').split()):
+                    own = (found.setdefault('title', []), False)
+        elif tag == 'a':
+            if 'link' in classes and 'writer' not in found and parent is not None and parent.tag == 'span' \
+                    and 'nick' in (parent.get('class') or '').split():
+                own = (found.setdefault('writer', []), False)
+        elif tag == 'em':
+            if 'sympathy' not in found and classes and SYMPATHY_COUNT_CLASSES <= classes and parent is not None \
+                    and parent.tag == 'span' and SYMPATHY_BUTTON_CLASSES <= set((parent.get('class') or '').split()):
+                own = (found.setdefault('sympathy', []), False)
+
+        if own is not None:
+            buf, strip = own
+            if buf is content_parts or buf is tag_parts:
+                piece: list = []
+                buf.append(piece)
+                buf = piece
+            collectors = collectors + ((buf, strip),)
+
+        if el.text and collectors:
+            add_text(el.text, collectors)
+        for child in el:
+            if isinstance(child.tag, str):
+                visit(child, collectors)
+            if child.tail and collectors:
+                add_text(child.tail, collectors)
+
+        if tag == 'div' and 'wrap_tag' in classes:
+            wrap_tag_depth[0] -= 1
+
+    visit(root, ())
+    timings['walk'] = time.perf_counter() - started
+
+    # 필드별 조립 시간 (트리 순회 자체는 모든 필드가 공유)
+    def timed(field, func):
+        field_started = time.perf_counter()
+        value = func()
+        timings[field] = time.perf_counter() - field_started
+        return value
+
+    def first_text(field):
+        return ''.join(found[field]).strip() if field in found else None
+
+    title = timed('title', lambda: first_text('title'))
+    content = timed('content', lambda: ' '.join(''.join(piece) for piece in content_parts))
+    post_date = timed('date', lambda: first_text('date'))
+    writer = timed('writer', lambda: first_text('writer'))
+    tags = timed('tags', lambda: [''.join(piece).strip() for piece in tag_parts])
+    sympathy_text = timed('sympathy', lambda: first_text('sympathy'))
+    ad_image_urls, ad_rule = timed('ad_images', lambda: get_classifier().classify(img_srcs, content))
+    return build_record(url, title, content, post_date, writer, tags, sympathy_text, ad_image_urls, ad_rule)
+
+
+def extract_post_soup(page_source: str, url: str, timings: Dict[str, float]) -> dict:
+    """BeautifulSoup(html.parser) 기반의 기존 추출 로직입니다. lxml을 쓸 수 없을 때 사용합니다."""
+    started = time.perf_counter()
+    html = BeautifulSoup(page_source, "html.parser")
+    timings['parse'] = time.perf_counter() - started
+
+    def timed(field, func):
+        field_started = time.perf_counter()
+        value = func()
+        timings[field] = time.perf_counter() - field_started
+        return value
+
+    def select_text(selector):
+        element = html.select_one(selector)
+        return element.text.strip() if element else None
+
+    # 제목 크롤링
+    title = timed('title', lambda: select_text("div.se-module.se-module-text.se-title-text > p > span"))
+
+    # 본문 내용 크롤링 (동영상, 해시태그 제거 후 텍스트만 추출)
+    def extract_content():
+        main_content = html.select("div.se-main-container > div")
+        for video_div in html.select("div.se-module.se-module-video.__se-component"):
+            video_div.decompose()
+        for hash_tag_span in html.select("span.__se-hash-tag"):
+            hash_tag_span.decompose()
+        return ' '.join(div.get_text(strip=True) for div in main_content)
+    content = timed('content', extract_content)
+
+    post_date = timed('date', lambda: select_text("span.se_publishDate"))
+    writer = timed('writer', lambda: select_text("span.nick > a.link"))
+    tags = timed('tags', lambda: [tag.text.strip() for tag in html.select("div.wrap_tag span.ell")])
+    sympathy_text = timed('sympathy', lambda: select_text(
+        "span.u_likeit_list_btn._button.btn_sympathy.pcol2.off > em.u_cnt._count"))
+
+    # 광고 판별 (광고 이미지 도메인, 본문 고지 문구)
+    ad_image_urls, ad_rule = timed('ad_images', lambda: get_classifier().classify(
+        [img.get("src") for img in html.select("img[src]") if img.get("src")], content))
+    return build_record(url, title, content, post_date, writer, tags, sympathy_text, ad_image_urls, ad_rule)
+
+
+def extract_post(page_source: str, url: str, timings: Optional[Dict[str, float]] = None,
+                 backend: Optional[str] = None) -> dict:
+    """
+    블로그 HTML에서 게시물 데이터를 추출합니다.
+    backend를 지정하지 않으면 lxml 단일 순회 엔진을 사용하고, 실패하면 BeautifulSoup 경로로 대체합니다.
+    timings에 dict를 넘기면 단계/필드별 소요 시간(초)이 기록됩니다.
+    """
+    timings = timings if timings is not None else {}
+    backend = backend or ('lxml' if HAS_LXML else 'bs4')
+    if backend == 'lxml':
+        try:
+            return extract_post_lxml(page_source, url, timings)
+        except Exception as e:
+            logging.warning(f"lxml 추출 실패, BeautifulSoup으로 대체합니다: {url}: {e}")
+            timings.clear()
+    return extract_post_soup(page_source, url, timings)
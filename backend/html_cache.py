@@ -0,0 +1,245 @@
+import argparse
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, Optional, Tuple
+
+from extractor import extract_post
+from sinks import batched
+
+
+class HtmlCache:
+    """
+    크롤링한 게시물 HTML을 디스크에 압축해 보관합니다.
+    본문은 내용 해시(sha256)를 이름으로 한 zlib 파일로 한 번만 저장하고(같은 HTML은 중복 저장하지 않음),
+    (post_url, fetched_at) -> 해시 인덱스는 SQLite에 기록합니다.
+    압축 후 전체 크기가 max_bytes를 넘으면 가장 오래 전에 수집된 본문부터 삭제합니다.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 2 * 1024 ** 3, compress_level: int = 6) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        os.makedirs(os.path.join(path, 'blobs'), exist_ok=True)
+        self._lock = threading.Lock()  # 크롤러 스레드들이 동시에 저장하므로 인덱스 접근을 직렬화
+        self._db = sqlite3.connect(os.path.join(path, 'index.sqlite'), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript('''
+        PRAGMA journal_mode = WAL;
+        CREATE TABLE IF NOT EXISTS blobs (
+            digest TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            raw_size INTEGER NOT NULL,
+            last_fetched_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS fetches (
+            post_url TEXT NOT NULL,
+            fetched_at REAL NOT NULL,
+            digest TEXT NOT NULL,
+            PRIMARY KEY (post_url, fetched_at)
+        );
+        CREATE INDEX IF NOT EXISTS idx_fetches_digest ON fetches (digest);
+        CREATE INDEX IF NOT EXISTS idx_blobs_last_fetched ON blobs (last_fetched_at);
+        ''')
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.path, 'blobs', digest[:2], digest[2:])
+
+    def put(self, post_url: str, html: str, fetched_at: Optional[float] = None) -> str:
+        """HTML을 저장하고 내용 해시를 반환합니다. 압축과 파일 쓰기는 잠금 밖에서 하므로 여러 스레드가 동시에 저장할 수 있습니다."""
+        raw = html.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        fetched_at = fetched_at if fetched_at is not None else time.time()
+        blob_path = self._blob_path(digest)
+        tmp_path: Optional[str] = None
+        size = 0
+        while True:
+            with self._lock:
+                known = self._db.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone() is not None
+                if known or tmp_path is not None:
+                    if known:
+                        self._db.execute("UPDATE blobs SET last_fetched_at = MAX(last_fetched_at, ?) WHERE digest = ?",
+                                         (fetched_at, digest))
+                    else:
+                        os.replace(tmp_path, blob_path)
+                        self._db.execute("INSERT INTO blobs (digest, size, raw_size, last_fetched_at) VALUES (?, ?, ?, ?)",
+                                         (digest, size, len(raw), fetched_at))
+                        self._total_bytes += size
+                    self._db.execute("INSERT OR REPLACE INTO fetches (post_url, fetched_at, digest) VALUES (?, ?, ?)",
+                                     (post_url, fetched_at, digest))
+                    self._db.commit()
+                    if self._total_bytes > self.max_bytes:
+                        self._evict()
+                    break
+            # 처음 보는 본문이면 잠금을 풀고 압축해 임시 파일로 쓴 뒤, 인덱스에 올리기 전에 다시 확인
+            tmp_path, size = self._write_tmp(raw, blob_path)
+        if known and tmp_path is not None:
+            os.remove(tmp_path)  # 압축하는 동안 다른 스레드가 같은 본문을 저장함
+        return digest
+
+    def _write_tmp(self, raw: bytes, blob_path: str) -> Tuple[str, int]:
+        compressed = zlib.compress(raw, self.compress_level)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        tmp_path = f"{blob_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(compressed)
+        return tmp_path, len(compressed)
+
+    def _evict(self) -> None:
+        # 목표 크기를 90%로 잡아 저장할 때마다 삭제가 반복되지 않도록 함
+        target = self.max_bytes * 0.9
+        evicted = 0
+        while self._total_bytes > target:
+            rows = self._db.execute(
+                "SELECT digest, size FROM blobs ORDER BY last_fetched_at LIMIT 100").fetchall()
+            if not rows:
+                break
+            for row in rows:
+                if self._total_bytes <= target:
+                    break
+                try:
+                    os.remove(self._blob_path(row['digest']))
+                except FileNotFoundError:
+                    pass
+                self._db.execute("DELETE FROM fetches WHERE digest = ?", (row['digest'],))
+                self._db.execute("DELETE FROM blobs WHERE digest = ?", (row['digest'],))
+                self._total_bytes -= row['size']
+                evicted += 1
+            self._db.commit()
+        if evicted:
+            logging.info(f"HTML 캐시 용량 초과로 {evicted}개를 삭제했습니다. (현재 {self._total_bytes / 1024 ** 2:.1f}MB)")
+
+    def get(self, digest: str) -> Optional[str]:
+        try:
+            with open(self._blob_path(digest), 'rb') as file:
+                return zlib.decompress(file.read()).decode('utf-8')
+        except FileNotFoundError:
+            return None
+
+    def latest(self, post_url: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest FROM fetches WHERE post_url = ? ORDER BY fetched_at DESC LIMIT 1", (post_url,)).fetchone()
+        return self.get(row['digest']) if row else None
+
+    def iter_latest(self, since: Optional[float] = None) -> Iterator[Tuple[str, float, str]]:
+        """URL마다 가장 최근에 수집한 (post_url, fetched_at, digest)를 반환합니다."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT f.post_url, f.fetched_at, f.digest FROM fetches f "
+                "JOIN (SELECT post_url, MAX(fetched_at) AS fetched_at FROM fetches "
+                "      WHERE fetched_at >= ? GROUP BY post_url) latest "
+                "ON f.post_url = latest.post_url AND f.fetched_at = latest.fetched_at "
+                "ORDER BY f.post_url",
+                (since or 0,),
+            ).fetchall()
+        for row in rows:
+            yield row['post_url'], row['fetched_at'], row['digest']
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            blobs = self._db.execute(
+                "SELECT COUNT(*) AS count, COALESCE(SUM(size), 0) AS size, COALESCE(SUM(raw_size), 0) AS raw_size "
+                "FROM blobs").fetchone()
+            fetches = self._db.execute(
+                "SELECT COUNT(*) AS count, COUNT(DISTINCT post_url) AS urls FROM fetches").fetchone()
+        return {
+            'urls': fetches['urls'],
+            'fetches': fetches['count'],
+            'blobs': blobs['count'],
+            'size_mb': blobs['size'] / 1024 ** 2,
+            'raw_size_mb': blobs['raw_size'] / 1024 ** 2,
+            'compression_ratio': blobs['raw_size'] / blobs['size'] if blobs['size'] else 0,
+            'max_size_mb': self.max_bytes / 1024 ** 2,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def create_cache(config: dict) -> Optional[HtmlCache]:
+    """config.yaml의 html_cache 설정으로 캐시를 생성합니다. enabled가 아니면 None을 반환합니다."""
+    cache_config = config.get('html_cache') or {}
+    if not cache_config.get('enabled'):
+        return None
+    path = cache_config.get('path', 'html_cache')
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(__file__), path)
+    return HtmlCache(path, max_bytes=int(cache_config.get('max_mb', 2048) * 1024 ** 2))
+
+
+def _extract(item: Tuple[str, str, Optional[str]]) -> dict:
+    post_url, html, backend = item
+    return extract_post(html, post_url, backend=backend)
+
+
+def replay(cache: HtmlCache, since: Optional[float] = None, batch_size: int = 500, workers: Optional[int] = None,
+           backend: Optional[str] = None, dry_run: bool = False) -> Dict[str, int]:
+    """
+    캐시된 HTML에서 게시물을 다시 추출해 DB에 일괄 upsert 합니다. 네트워크와 브라우저는 사용하지 않습니다.
+    restaurant_name은 DB에 저장된 값을 사용하고, HTML에 공감 수가 없는 경우(HTTP 수집 시 공감 API로 채운 값)는
+    DB의 sympathy를 유지합니다. DB에 없는 URL은 건너뜁니다.
+    """
+    from database import fetch_existing_posts, save_to_db  # DB 드라이버는 DB에 저장할 때만 필요
+
+    totals = {'replayed': 0, 'skipped': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0}
+    started = time.monotonic()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in batched(cache.iter_latest(since), batch_size):
+            items = [(post_url, cache.get(digest), backend) for post_url, _, digest in batch]
+            items = [item for item in items if item[1] is not None]
+            existing = {} if dry_run else fetch_existing_posts([post_url for post_url, _, _ in items])
+            records = []
+            for record in pool.map(_extract, items, chunksize=max(1, len(items) // ((workers or os.cpu_count() or 1) * 4))):
+                row = existing.get(record['post_url'])
+                if row is None and not dry_run:
+                    totals['skipped'] += 1
+                    continue
+                if row is not None:
+                    record['restaurant_name'] = row['restaurant_name']
+                    if record['sympathy'] == 0 and row['sympathy']:
+                        record['sympathy'] = row['sympathy']
+                records.append(record)
+            totals['replayed'] += len(records)
+            if records and not dry_run:
+                for status, count in save_to_db(records).items():
+                    totals[status] += count
+            logging.info(f"재추출 진행: {totals['replayed']}개 완료 ({time.monotonic() - started:.1f}s)")
+    return totals
+
+
+if __name__ == "__main__":
+    import yaml
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="크롤링한 HTML 캐시 관리 및 재추출")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('stats', help="캐시 크기와 압축률 출력")
+    replay_parser = subparsers.add_parser('replay', help="캐시된 HTML에서 다시 추출해 DB에 upsert")
+    replay_parser.add_argument('--since', type=float, default=None, help="이 시각(unix time) 이후 수집한 HTML만 사용")
+    replay_parser.add_argument('--batch-size', type=int, default=500)
+    replay_parser.add_argument('--workers', type=int, default=None, help="추출 프로세스 수 (기본: CPU 수)")
+    replay_parser.add_argument('--backend', choices=['lxml', 'bs4'], default=None)
+    replay_parser.add_argument('--dry-run', action='store_true', help="DB에 저장하지 않고 추출만 수행")
+    args = parser.parse_args()
+
+    config_path = os.environ.get('CONFIG_PATH', os.path.join(os.path.dirname(__file__), 'config.yaml'))
+    with open(config_path, 'r', encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+    cache = create_cache({**config, 'html_cache': {**(config.get('html_cache') or {}), 'enabled': True}})
+    try:
+        if args.command == 'stats':
+            print(cache.stats())
+        else:
+            print(replay(cache, since=args.since, batch_size=args.batch_size, workers=args.workers,
+                         backend=args.backend, dry_run=args.dry_run))
+    finally:
+        cache.close()
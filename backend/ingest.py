@@ -0,0 +1,96 @@
+import codecs
+import json
+from typing import Any, AsyncIterator, Optional, Tuple
+
+MAX_RECORD_BYTES = 1024 * 1024  # 레코드 하나의 최대 크기 (이보다 길게 끝나지 않으면 잘못된 본문으로 처리)
+
+# (레코드 번호, 디코딩한 값, 오류 메시지)
+Record = Tuple[int, Optional[Any], Optional[str]]
+
+
+def _decode_line(line: bytes) -> Tuple[Optional[Any], Optional[str]]:
+    try:
+        return json.loads(line), None
+    except ValueError as e:  # UnicodeDecodeError, JSONDecodeError
+        return None, f"JSON 형식 오류: {e}"
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """
+    한 줄에 JSON 하나인 본문(NDJSON)을 받는 대로 줄 단위로 디코딩합니다.
+    잘못된 줄은 오류 메시지와 함께 내보내고 다음 줄을 계속 처리합니다. 빈 줄은 건너뜁니다.
+    """
+    buffer = b''
+    index = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            if line.strip():
+                yield (index, *_decode_line(line))
+                index += 1
+        if len(buffer) > MAX_RECORD_BYTES:
+            raise ValueError(f"{index}번째 줄이 {MAX_RECORD_BYTES}바이트를 넘습니다.")
+    if buffer.strip():
+        yield (index, *_decode_line(buffer))
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """
+    JSON 배열 본문을 전체를 읽지 않고 원소 단위로 디코딩합니다.
+    원소 사이에는 ','가, 마지막에는 ']'가 와야 하고 ']' 뒤에는 공백만 허용합니다.
+    배열 안의 문법 오류는 어디서 다음 원소가 시작하는지 알 수 없으므로 ValueError로 전체 요청을 중단합니다.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer, position, index = '', 0, 0
+    expect = 'start'  # start -> first(원소 또는 ']') / value -> separator(',' 또는 ']') -> ... -> end
+    finished = False
+    stream = chunks.__aiter__()
+    while not finished:
+        try:
+            chunk = await stream.__anext__()
+        except StopAsyncIteration:
+            chunk, finished = b'', True
+        buffer = buffer[position:] + text_decoder.decode(chunk, final=finished)
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n':
+                position += 1
+            if position >= len(buffer):
+                break
+            char = buffer[position]
+            if expect == 'end':
+                raise ValueError(f"JSON 배열 뒤에 잘못된 내용이 있습니다: {buffer[position:position + 20]!r}")
+            if expect == 'start':
+                if char != '[':
+                    raise ValueError("본문이 JSON 배열이 아닙니다.")
+                expect = 'first'
+                position += 1
+                continue
+            if expect in ('first', 'separator') and char == ']':
+                expect = 'end'
+                position += 1
+                continue
+            if expect == 'separator':
+                if char != ',':
+                    raise ValueError(f"{index - 1}번째 원소 뒤에 ',' 또는 ']'가 와야 합니다.")
+                expect = 'value'
+                position += 1
+                continue
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                if finished or len(buffer) - position > MAX_RECORD_BYTES:
+                    raise ValueError(f"{index}번째 원소를 해석할 수 없습니다: {e}")
+                break  # 원소가 다음 청크까지 이어지므로 더 받은 뒤 다시 시도
+            if end == len(buffer) and not finished:
+                break  # 청크 끝에서 끝난 숫자/리터럴은 다음 청크에서 이어질 수 있음
+            position = end
+            yield index, value, None
+            index += 1
+            expect = 'separator'
+    if expect == 'start':
+        raise ValueError("본문이 비어 있습니다.")
+    if expect != 'end':
+        raise ValueError(f"JSON 배열이 닫히지 않았거나 {index}번째 원소가 잘못되었습니다.")
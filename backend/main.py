@@ -1,17 +1,30 @@
 import logging  # 추가: 로깅 모듈 임포트
 import asyncio
-from fastapi import FastAPI, BackgroundTasks, HTTPException, Request  # 변경: Request 추가
-from pydantic import BaseModel
-from typing import List, Optional  # 추가: Optional 임포트
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Request, Query  # 변경: Request 추가
+from fastapi.responses import Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, ValidationError
+from typing import Awaitable, Callable, List, Optional  # 추가: Optional 임포트
 from fastapi.middleware.cors import CORSMiddleware
 import os
+import json
+from datetime import date
 from concurrent.futures import ThreadPoolExecutor
 import yaml
 from asyncio import Queue  # 변경: asyncio.Queue 사용
 from contextlib import asynccontextmanager  # 추가: asynccontextmanager 임포트
 
-from database import save_to_db, create_table, fetch_all_data
+from database import save_to_db, save_records, fetch_crawled_urls, create_table, stream_data_async, search_posts_async, wait_for_database, close_pools, DATA_COLUMNS
+from database import fetch_restaurant_stats_async, list_restaurant_stats_async, fetch_data_version_async, RESTAURANT_STATS_ORDER
+from migrations import apply_migrations, check_query_plans
 from crawler import Crawler
+from batch_writer import BatchWriter
+from work_queue import WorkQueue
+from sharding import HashRing, shard_settings
+from response_cache import ResponseCache, etag_matches
+from export import FORMATS as EXPORT_FORMATS, create_encoder, stream_export_async
+from ingest import iter_json_array, iter_ndjson
+from metrics import DATA_QUEUE_DEPTH, ERRORS, RETRIES, ROWS_WRITTEN, URL_SECONDS, render as render_metrics
 # from predict import train_model  # 제거: predict.py 관련 임포트
 
 # 백그라운드 태스크 관리
@@ -20,15 +33,21 @@ crawl_task: Optional[asyncio.Task] = None  # 추가: 크롤러 태스크 변수
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 시작 시 초기화 작업
+    wait_for_database()  # DB가 준비될 때까지 기다린 뒤 연결 풀 생성
     create_table()
     logging.info("테이블이 생성되거나 존재함이 확인되었습니다.")
+    apply_migrations()  # 인덱스 등 스키마 변경을 버전 순서대로 적용 (이미 적용된 것은 건너뜀)
+    try:
+        check_query_plans()
+    except Exception as e:
+        logging.error(f"쿼리 계획 확인 중 오류 발생: {e}")
     
     # 백그라운드 작업 시작
     logging.info("백그라운드 작업을 시작합니다.")
     global crawl_task  # 추가: 전역 크롤러 태스크 사용
-    task1 = asyncio.create_task(crawl_worker(1))
+    crawl_task = asyncio.create_task(crawl_worker(1))
     logging.info("crawl_worker 작업이 시작되었습니다.")
-    task2 = asyncio.create_task(save())
+    task2 = asyncio.create_task(batch_writer.run())
     logging.info("save 작업이 시작되었습니다.")
     
     try:
@@ -38,13 +57,10 @@ async def lifespan(app: FastAPI):
         logging.info("백그라운드 작업을 취소합니다.")
         if crawl_task:
             crawl_task.cancel()  # 추가: 크롤러 태스크 취소
-        task2.cancel()
-        try:
-            crawler = Crawler()
-            crawler.driver.quit()
-            logging.info("브라우저 인스턴스가 정상적으로 종료되었습니다.")
-        except Exception as e:
-            logging.error(f"브라우저 종료 중 오류 발생: {e}")
+            await asyncio.gather(crawl_task, return_exceptions=True)
+        task2.cancel()  # 취소되면 큐에 남은 데이터를 모두 저장한 뒤 종료
+        await asyncio.gather(task2, return_exceptions=True)
+        await close_pools()
 
 # FastAPI 인스턴스 생성 시 lifespan 컨텍스트 전달
 app = FastAPI(lifespan=lifespan)
@@ -61,6 +77,7 @@ app.add_middleware(
 # 응답 모델
 class DataResponse(BaseModel):
     id: int
+    restaurant_name: Optional[str] = None
     writer: str
     date: str
     title: str
@@ -70,8 +87,10 @@ class DataResponse(BaseModel):
     post_url: str
     ad_images: str
     광고: str
+    ad_rule: Optional[str] = None
 
 class DataRequest(BaseModel):
+    restaurant_name: str
     writer: str
     date: str
     title: str
@@ -81,174 +100,451 @@ class DataRequest(BaseModel):
     post_url: str
     ad_images: str
     광고: str
+    ad_rule: Optional[str] = None
 
-executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=5)  # 병렬 작업을 위한 스레드 풀 생성
+def json_bytes(value) -> bytes:
+    return json.dumps(jsonable_encoder(value), ensure_ascii=False).encode("utf-8")
+
+# 조회 응답을 response_cache에서 꺼내거나 build()로 만들어 반환
+# 본문 해시를 ETag로 보내고, If-None-Match가 같으면 본문 없이 304로 응답
+async def cached_json_response(request: Request, build: Callable[[], Awaitable[bytes]]) -> Response:
+    if response_cache is None:
+        return Response(content=await build(), media_type="application/json")
+    key = request.url.path + "?" + "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    etag, body = await response_cache.get(key, build)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}  # 매번 ETag로 재검증
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        response_cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # 데이터 조회 엔드포인트 (GET)
+# id 기준 keyset 페이지네이션: 다음 페이지는 마지막 행의 id를 after_id로 넘겨 요청
 @app.get("/data", response_model=List[DataResponse])
-def get_all_data() -> List[DataResponse]:
-    results = fetch_all_data()
-    return results
+async def get_all_data(
+    request: Request,
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    restaurant_name: Optional[str] = None,
+    ad: Optional[str] = Query(None, alias="광고"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    fields: Optional[str] = Query(None, description="쉼표로 구분한 조회 컬럼 (예: id,title,restaurant_name)"),
+):
+    field_list = None
+    if fields:
+        field_list = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in field_list if field not in DATA_COLUMNS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"알 수 없는 컬럼: {', '.join(unknown)}")
+
+    rows = stream_data_async(after_id=after_id, limit=limit, restaurant_name=restaurant_name, ad=ad,
+                             date_from=date_from, date_to=date_to, fields=field_list)
+
+    if response_cache is not None:
+        # 캐시에 저장하고 ETag를 계산하기 위해 페이지 전체(최대 limit행)를 한 번에 직렬화
+        async def build() -> bytes:
+            items = [json.dumps(row, ensure_ascii=False, default=str) async for row in rows]
+            return ("[" + ",".join(items) + "]").encode("utf-8")
+
+        return await cached_json_response(request, build)
+
+    # 캐시를 끈 경우 전체 목록을 만들지 않고 행 단위로 JSON 배열을 흘려보냄
+    async def generate():
+        yield "["
+        first = True
+        try:
+            async for row in rows:
+                yield ("" if first else ",") + json.dumps(row, ensure_ascii=False, default=str)
+                first = False
+        except Exception as e:
+            logging.error(f"데이터 조회 중 오류 발생: {e}")
+        yield "]"
+
+    return StreamingResponse(generate(), media_type="application/json")
+
+# 내보내기 엔드포인트
+# 서버 측 커서로 chunk_size행씩 읽어 CSV(utf-8-sig)/JSONL/Parquet으로 흘려보내므로 전체 행 수와 관계없이 메모리가 일정함
+# 증분 내보내기는 지난번에 받은 마지막 행의 id를 since_id로 넘겨 요청
+@app.get("/export")
+async def export_data(
+    fmt: str = Query("csv", alias="format", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+    since_id: Optional[int] = None,
+    restaurant_name: Optional[str] = None,
+    ad: Optional[str] = Query(None, alias="광고"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    chunk_size: int = Query(1000, ge=100, le=10000),
+):
+    try:
+        encoder = create_encoder(fmt)
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    media_type, extension = EXPORT_FORMATS[fmt]
+    chunks = stream_export_async(encoder, chunk_size, since_id=since_id, restaurant_name=restaurant_name, ad=ad,
+                                 date_from=date_from, date_to=date_to)
+
+    async def generate():
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except Exception as e:
+            # 잘린 파일이 정상 응답처럼 보이지 않도록 연결을 끊음
+            logging.error(f"내보내기 중 오류 발생: {e}")
+            raise
+
+    return StreamingResponse(generate(), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="cr_data30{extension}"'})
+
+# 본문 검색 엔드포인트
+# 제목/본문/태그의 FULLTEXT(ngram) 인덱스로 관련도 순 검색하며, 본문 대신 검색어 주변 snippet만 반환
+@app.get("/search")
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, description="공백으로 구분한 검색어 (2글자 이상)"),
+    restaurant_name: Optional[str] = None,
+    ad: Optional[str] = Query(None, alias="광고"),
+    match: str = Query("all", pattern="^(all|any)$", description="all: 모든 검색어 포함, any: 하나 이상 포함"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    highlight: bool = True,
+):
+    async def build() -> bytes:
+        try:
+            return json_bytes(await search_posts_async(q, match_all=match == "all", highlight_terms=highlight,
+                                                       restaurant_name=restaurant_name, ad=ad, limit=limit,
+                                                       offset=offset))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return await cached_json_response(request, build)
+
+# 식당별 집계 목록 엔드포인트
+# save_to_db가 증분 갱신하는 restaurant_stats만 읽으므로 게시물 전체를 집계하지 않음
+@app.get("/restaurants")
+async def list_restaurants(
+    request: Request,
+    order_by: str = Query("post_count", pattern=f"^({'|'.join(RESTAURANT_STATS_ORDER)})$"),
+    desc: bool = True,
+    min_posts: int = Query(1, ge=1),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    async def build() -> bytes:
+        return json_bytes(await list_restaurant_stats_async(order_by=order_by, descending=desc, min_posts=min_posts,
+                                                            limit=limit, offset=offset))
+
+    return await cached_json_response(request, build)
+
+# 식당 하나의 집계 조회 엔드포인트
+@app.get("/restaurants/{restaurant_name}/stats")
+async def restaurant_stats(request: Request, restaurant_name: str):
+    async def build() -> bytes:
+        stats = await fetch_restaurant_stats_async(restaurant_name)
+        if stats is None:
+            raise HTTPException(status_code=404, detail="해당 식당의 게시물이 없습니다.")
+        return json_bytes(stats)
+
+    return await cached_json_response(request, build)
 
 # 데이터 삽입 엔드포인트 (POST)
-@app.post("/data", response_model=DataResponse)
+@app.post("/data", response_model=DataRequest)
 def add_data(data: DataRequest):
     try:
         save_to_db([data.dict()])
+        if response_cache is not None:
+            response_cache.invalidate()
         return data
     except Exception as e:
         logging.error(f"데이터 삽입 중 오류 발생: {e}")
         raise HTTPException(status_code=500, detail="데이터 삽입 중 오류 발생")
 
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors())
+
+# 대량 삽입 엔드포인트 (POST)
+# NDJSON(기본) 또는 JSON 배열(Content-Type: application/json) 본문을 받는 대로 검증하고,
+# chunk_size행씩 save_records로 저장(청크마다 트랜잭션 하나)한 뒤 행별 결과를 반환
+@app.post("/data/bulk")
+async def add_data_bulk(request: Request, chunk_size: int = Query(1000, ge=1, le=5000)):
+    loop = asyncio.get_running_loop()
+    content_type = request.headers.get("content-type", "")
+    records = iter_json_array(request.stream()) if content_type.startswith("application/json") \
+        else iter_ndjson(request.stream())
+    results: List[dict] = []
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "duplicate": 0, "invalid": 0, "failed": 0}
+    chunk: List[tuple] = []  # (레코드 번호, 검증한 레코드)
+
+    def add_result(index: int, status: str, post_url: Optional[str] = None, error: Optional[str] = None):
+        counts[status] += 1
+        result = {"index": index, "status": status}
+        if post_url is not None:
+            result["post_url"] = post_url
+        if error is not None:
+            result["error"] = error
+        results.append(result)
+
+    async def flush():
+        rows = [row for _, row in chunk]
+        try:
+            statuses = await loop.run_in_executor(None, save_records, rows)
+        except Exception as e:
+            ERRORS.labels("bulk_ingest", type(e).__name__).inc()
+            for index, row in chunk:
+                add_result(index, "failed", row["post_url"], str(e))
+        else:
+            # 같은 청크에서 post_url이 겹치면 마지막 레코드만 저장됨
+            last_index = {row["post_url"]: index for index, row in chunk}
+            for index, row in chunk:
+                url = row["post_url"]
+                add_result(index, statuses[url] if last_index[url] == index else "duplicate", url)
+            for status in ("inserted", "updated", "unchanged"):
+                ROWS_WRITTEN.labels(status).inc(sum(1 for value in statuses.values() if value == status))
+            if response_cache is not None:
+                response_cache.invalidate()
+        chunk.clear()
+
+    try:
+        async for index, value, error in records:
+            if error is None:
+                try:
+                    chunk.append((index, DataRequest(**value).dict()))
+                except ValidationError as e:
+                    error = validation_message(e)
+                except TypeError:
+                    error = "레코드는 JSON 객체여야 합니다."
+            if error is not None:
+                add_result(index, "invalid", error=error)
+            elif len(chunk) >= chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+    except ValueError as e:
+        # 본문 구조가 잘못된 경우: 그 앞까지 검증한 레코드는 저장하고 결과와 함께 400으로 응답
+        if chunk:
+            await flush()
+        results.sort(key=lambda item: item["index"])
+        raise HTTPException(status_code=400, detail={"error": str(e), "counts": counts, "results": results})
+
+    results.sort(key=lambda item: item["index"])
+    return {"counts": counts, "results": results}
+
 # config.yaml에서 설정 로드
-config_path = os.path.join(os.path.dirname(__file__), 'config.yaml')  # 수정된 경로
+config_path = os.environ.get('CONFIG_PATH', os.path.join(os.path.dirname(__file__), 'config.yaml'))  # 수정된 경로
 with open(config_path, 'r', encoding='utf-8') as file:
     config = yaml.safe_load(file)
 queries = config['query']  # 변경: query를 리스트로 로드
 max_posts = config['max_posts']
 num_crawlers = config.get('num_crawlers', 1)  # 변경: 크롤러 수를 1로 설정
+recrawl_ttl_hours = config.get('recrawl_ttl_hours')  # None이면 이미 저장된 게시물은 다시 수집하지 않음
+
+# shard 설정 (SHARD_COUNT > 1이면 query를 일관 해시로 나눠 이 프로세스는 SHARD_ID의 작업만 처리)
+shard_id, shard_count = shard_settings()
+heartbeat_interval = config.get('heartbeat_interval', 30)
+
+# 병렬 작업을 위한 스레드 풀 생성 (shard마다 WebDriver 풀 크기와 동일하게 num_crawlers 사용)
+executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=num_crawlers)
 
 # asyncio 큐 생성
 data_queue = Queue()
+DATA_QUEUE_DEPTH.set_function(data_queue.qsize)
+
+# query/URL 단위 작업 큐 (진행 상황을 DB에 기록하므로 여러 작업자가 나눠 처리하고 중단된 곳부터 재개할 수 있음)
+work_queue_config = config.get('work_queue', {})
+work_queue = WorkQueue(
+    lease_seconds=work_queue_config.get('lease_seconds', 300),
+    max_attempts=work_queue_config.get('max_attempts', 3),
+    ring=HashRing(shard_count),
+    shard=shard_id if shard_count > 1 else None,
+)
+query_claim_batch = work_queue_config.get('query_claim_batch', 5)
+job_claim_batch = work_queue_config.get('job_claim_batch', num_crawlers * 2)
+
+# 조회 응답 캐시 (DB의 데이터 버전이 바뀔 때까지 같은 요청의 응답을 재사용)
+response_cache_config = config.get('response_cache', {})
+response_cache: Optional[ResponseCache] = ResponseCache(
+    fetch_data_version_async,
+    max_bytes=int(response_cache_config.get('max_mb', 64) * 1024 * 1024),
+    version_check_interval=response_cache_config.get('version_check_interval', 1.0),
+) if response_cache_config.get('enabled', True) else None
+
+def on_batch_flushed(records: List[dict]):
+    work_queue.complete_records(records)  # 저장된 레코드의 작업만 완료 처리
+    if response_cache is not None:
+        response_cache.invalidate()  # 다른 shard의 저장은 version_check_interval 안에 반영됨
+
+# 큐의 데이터를 크기/시간 기준으로 모아서 저장하는 배치 writer
+batch_writer_config = config.get('batch_writer', {})
+batch_writer = BatchWriter(
+    data_queue,
+    max_batch_size=batch_writer_config.get('max_batch_size', 100),
+    max_latency=batch_writer_config.get('max_latency', 2.0),
+    on_flushed=on_batch_flushed,
+)
 
 # 로깅 설정 추가
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
+    format="%(asctime)s - %(levelname)s - " + (f"[shard {shard_id}/{shard_count}] " if shard_count > 1 else "") + "%(message)s",
+    force=True,  # database.py에서 먼저 설정한 형식을 shard 표시가 포함된 형식으로 교체
 )
-import json  # 상태 저장을 위한 json
-import os
-import logging  # 로깅 모듈 추가
+# 검색으로 찾은 query의 URL을 작업 큐에 등록
+async def expand_queries(worker_id: int, crawler: Crawler, claimed: List[dict]):
+    loop = asyncio.get_running_loop()
+    # 임대한 query들의 URL을 검색 API로 한 번에 병렬 수집
+    urls_by_query = await crawler.fetch_urls_for_queries([item['query'] for item in claimed], max_posts)
+    for item in claimed:
+        query = item['query']
+        urls = urls_by_query.get(query, [])
+        logging.info(f"Worker {worker_id}: '{query}'에서 {len(urls)}개의 URL을 수집했습니다.")
+        if not urls:
+            await loop.run_in_executor(None, work_queue.fail_query, item, "검색 결과 없음")
+            continue
+        urls = await skip_crawled_urls(worker_id, urls)
+        await loop.run_in_executor(None, work_queue.enqueue_jobs, item, urls)
+        await loop.run_in_executor(None, work_queue.complete_query, item)
 
-STATE_FILE = os.path.join(os.path.dirname(__file__), "crawl_state.json")  # 절대 경로로 수정
-DEFAULT_START_INDEX = 0  # 기본 시작 인덱스, 필요한 경우 90으로 설정 가능
+# URL 작업 하나를 크롤링하여 큐에 추가 (완료 처리는 DB에 저장된 뒤 batch_writer가 수행)
+async def crawl_job(worker_id: int, crawler: Crawler, job: dict):
+    loop = asyncio.get_running_loop()
+    url = job['post_url']
+    if job['attempts'] > 1:
+        RETRIES.labels('crawl_job').inc()
+    try:
+        logging.info(f"Worker {worker_id}: {url} 크롤링 시작 (시도 {job['attempts']}회)")
+        with URL_SECONDS.time():
+            data = await loop.run_in_executor(executor, crawler.crawl_blog_content, url)
+    except Exception as e:
+        # 실패한 작업은 큐로 돌아가 다음 임대 때 다시 시도됨 (max_attempts 초과 시 dead)
+        ERRORS.labels('crawl_job', type(e).__name__).inc()
+        logging.error(f"Worker {worker_id}: URL 크롤링 중 오류 발생 - {url}: {e}")
+        await loop.run_in_executor(None, work_queue.fail_job, job, str(e))
+        return
+    if data and data['title'] != 'error':  # "error" 데이터 필터링
+        data['restaurant_name'] = job['restaurant_name']
+        data['_job'] = {'id': job['id'], 'lease_token': job['lease_token']}
+        await data_queue.put(data)
+        logging.info(f"Worker {worker_id}: 데이터 큐에 추가됨 - {url}")
+        logging.info(f"현재 큐에 {data_queue.qsize()}개가 있습니다.")
+        logging.info(f"크롤링된 제목: {data['title']}")
+    else:
+        ERRORS.labels('crawl_job', 'crawl_failed').inc()
+        logging.warning(f"Worker {worker_id}: URL 크롤링 실패 - {url}")
+        await loop.run_in_executor(None, work_queue.fail_job, job, "크롤링 실패")
 
-# 상태 저장 함수
-def save_crawl_state(start_index: int):
+# 이미 수집한 URL 제외
+async def skip_crawled_urls(worker_id: int, urls: List[str]) -> List[str]:
     try:
-        os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)  # 디렉토리 생성
-        with open(STATE_FILE, "w") as file:
-            json.dump({"start_index": start_index}, file)
-        logging.info(f"크롤링 상태 저장됨: start_index={start_index}")
+        crawled = await asyncio.get_event_loop().run_in_executor(None, fetch_crawled_urls, urls, recrawl_ttl_hours)
     except Exception as e:
-        logging.error(f"상태 저장 중 오류 발생: {e}")
-
-# 상태 로드 함수
-def load_crawl_state(default_index: int = DEFAULT_START_INDEX) -> int:
-    """
-    상태를 로드하며, 상태 파일이 없으면 기본값을 반환합니다.
-    기본값은 DEFAULT_START_INDEX 또는 호출 시 설정한 값으로 설정됩니다.
-    """
+        logging.error(f"Worker {worker_id}: 수집 여부 조회 중 오류 발생, 전체 URL을 크롤링합니다 - {e}")
+        crawled = set()
+    new_urls = [url for url in urls if url not in crawled]
+    if crawled:
+        logging.info(f"Worker {worker_id}: 이미 수집된 URL {len(crawled)}개를 건너뜁니다.")
+    return new_urls
+
+# 코디네이터가 shard별 진행 상황을 모을 수 있도록 작업자 상태 기록
+async def send_heartbeat(worker_id: int):
     try:
-        if os.path.exists(STATE_FILE):
-            with open(STATE_FILE, "r") as file:
-                state = json.load(file)
-            logging.info(f"크롤링 상태 로드됨: start_index={state.get('start_index', default_index)}")
-            return state.get("start_index", default_index)
-        else:
-            logging.info(f"상태 파일이 존재하지 않아 기본값 사용: start_index={default_index}")
+        await asyncio.get_running_loop().run_in_executor(None, work_queue.heartbeat)
     except Exception as e:
-        logging.error(f"상태 로드 중 오류 발생: {e}")
-    return default_index  # 파일이 없거나 오류 발생 시 기본값 반환
+        logging.error(f"Worker {worker_id}: heartbeat 기록 중 오류 발생 - {e}")
 
 # 비동기 크롤러 작업
-async def crawl_worker(worker_id: int = 1, limit: Optional[int] = 170):
+# 작업 큐에서 query와 URL을 임대해 처리하며, 더 가져올 작업이 없으면 종료합니다.
+# 중간에 죽더라도 임대가 만료되면 다른 작업자(또는 재시작한 작업자)가 이어서 처리합니다.
+async def crawl_worker(worker_id: int = 1):
     logging.info(f"crawl_worker {worker_id} 시작")
     crawler = Crawler()
+    loop = asyncio.get_running_loop()
+
+    try:
+        # config의 query 중 아직 큐에 없는 것만 등록
+        await loop.run_in_executor(None, work_queue.enqueue_queries, queries)
 
-    # 이전 상태에서 시작
-    start_index = load_crawl_state(default_index=0)  # 기본값을 0으로 설정
-    logging.info(f"이전 크롤링 상태에서 시작: start_index={start_index}, limit={limit}")
+        last_heartbeat = 0.0
+        while True:
+            if loop.time() - last_heartbeat >= heartbeat_interval:
+                await send_heartbeat(worker_id)
+                last_heartbeat = loop.time()
 
-    batch_size = 5  # 배치 크기 설정
-    processed_queries = 0  # 처리된 쿼리 수 초기화
+            claimed_queries = await loop.run_in_executor(None, work_queue.claim_queries, query_claim_batch)
+            if claimed_queries:
+                logging.info(f"Worker {worker_id}: query {len(claimed_queries)}개를 임대했습니다 - "
+                             f"{[item['query'] for item in claimed_queries]}")
+                await expand_queries(worker_id, crawler, claimed_queries)
 
-    try:
-        limit = limit or num_crawlers * 170  # 수정: limit 기본값 설정
-        limited_queries = queries[start_index:start_index + limit]  # 제한된 query 목록
-        logging.info(f"Worker {worker_id}: 크롤링할 query 목록 - {limited_queries}")
-
-        for query_index, query in enumerate(limited_queries, start=start_index):
-            urls = crawler.fetch_urls_from_api(query, max_posts)
-            logging.info(f"Worker {worker_id}: {len(urls)}개의 URL을 수집했습니다.")
-
-            for url in urls:
-                retries = 3  # 최대 재시도 횟수
-                while retries > 0:
-                    try:
-                        logging.info(f"Worker {worker_id}: {url} 크롤링 시작")
-                        data = await asyncio.get_event_loop().run_in_executor(
-                            executor, crawler.crawl_blog_content, url
-                        )
-                        if data and data['title'] != 'error':  # "error" 데이터 필터링
-                            # restaurant_name 추가
-                            data['restaurant_name'] = query
-                            await data_queue.put(data)
-                            logging.info(f"Worker {worker_id}: 데이터 큐에 추가됨 - {url}")
-                            logging.info(f"현재 큐에 {data_queue.qsize()}개가 있습니다.")
-                            logging.info(f"크롤링된 제목: {data['title']}")
-                        else:
-                            logging.warning(f"Worker {worker_id}: URL 크롤링 실패 - {url}")
-                        break  # 성공적으로 크롤링하면 재시도 종료
-                    except Exception as e:
-                        logging.error(f"Worker {worker_id}: URL 크롤링 중 오류 발생 - {url}: {e}")
-                        retries -= 1
-                        if retries > 0:
-                            logging.info(f"Worker {worker_id}: WebDriver 재시도 중...")
-                            crawler.reset_driver()  # WebDriver 재생성
-                        else:
-                            logging.warning(f"Worker {worker_id}: {url} 크롤링 재시도 횟수 초과")
-
-            # 현재 인덱스 상태 저장
-            save_crawl_state(query_index + 1)  # 다음 query 시작 위치 저장
-            processed_queries += 1  # 처리된 쿼리 수 증가
-
-            if processed_queries >= batch_size:
-                logging.info(f"Worker {worker_id}: 배치 크기 {batch_size}에 도달하여 작업을 종료합니다.")
-                break  # 배치 크기에 도달하면 루프 종료
-
-        logging.info(f"Worker {worker_id}: 모든 query에 대해 크롤링이 완료되었습니다.")
+            # URL 작업을 드라이버 풀 크기의 배수만큼 임대해 병렬로 크롤링
+            jobs = await loop.run_in_executor(None, work_queue.claim_jobs, job_claim_batch)
+            if jobs:
+                await asyncio.gather(*(crawl_job(worker_id, crawler, job) for job in jobs))
+
+            if not claimed_queries and not jobs:
+                break
+
+        await send_heartbeat(worker_id)
+        logging.info(f"Worker {worker_id}: 작업 큐의 모든 작업을 처리했습니다.")
 
     except Exception as e:
         logging.error(f"Worker {worker_id}: 크롤링 중 오류 발생 - {e}")
     finally:
+        crawler.close()
+        logging.info(f"Worker {worker_id}: 브라우저 인스턴스가 정상적으로 종료되었습니다.")
         global crawl_task
         crawl_task = None  # 작업 완료 시 crawl_task 초기화
         logging.info(f"Worker {worker_id}: crawl_task가 초기화되었습니다.")
         
 
-async def save():
-    logging.info("save 작업 시작")
-    while True:
-        try:
-            if data_queue.qsize() >= 5:
-                data_list = []
-                for _ in range(5):
-                    data = await data_queue.get()
-                    if data:
-                        data_list.append(data)
-                if data_list:
-                    # restaurant_name은 batch 내 첫 번째 데이터의 값으로 사용
-                    restaurant_name = data_list[0].get('restaurant_name', None)
-                    if restaurant_name:
-                        await asyncio.get_event_loop().run_in_executor(
-                            None, save_to_db, data_list, restaurant_name
-                        )  # 비동기로 save_to_db 실행
-                        logging.info("5개의 데이터를 데이터베이스에 저장했습니다.")
-                        logging.info(f"현재 큐에 {data_queue.qsize()}개가 있습니다.")
-                    else:
-                        logging.warning("restaurant_name이 누락된 데이터가 발견되었습니다.")
-            else:
-                await asyncio.sleep(1)  # 큐에 5개 미만이면 1초 대기
-        except Exception as e:
-            logging.error(f"데이터 저장 중 오류 발생: {e}")
+# HTTP 서버 없이 크롤링과 저장만 수행 (shard_runner.py에서 shard 프로세스마다 실행)
+async def run_crawler(worker_id: int = 1):
+    wait_for_database()
+    create_table()
+    apply_migrations()
+    writer_task = asyncio.create_task(batch_writer.run())
+    try:
+        await crawl_worker(worker_id)
+    finally:
+        writer_task.cancel()  # 취소되면 큐에 남은 데이터를 모두 저장한 뒤 종료
+        await asyncio.gather(writer_task, return_exceptions=True)
+        await close_pools()
+
+# Prometheus 형식 지표 엔드포인트
+@app.get("/metrics")
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+# 배치 writer 상태 조회 엔드포인트
+@app.get("/writer/stats")
+async def writer_stats():
+    return batch_writer.stats()
+
+# 조회 응답 캐시 상태 조회 엔드포인트
+@app.get("/cache/stats")
+async def cache_stats():
+    return response_cache.stats() if response_cache is not None else {"enabled": False}
+
+# 작업 큐 상태 조회 엔드포인트
+@app.get("/queue/stats")
+async def queue_stats():
+    return await asyncio.get_running_loop().run_in_executor(None, work_queue.stats)
+
+# 전체 shard의 진행 상황 조회 엔드포인트 (코디네이터)
+@app.get("/cluster/progress")
+async def cluster_progress(stale_seconds: int = Query(heartbeat_interval * 4, ge=1)):
+    return await asyncio.get_running_loop().run_in_executor(None, work_queue.progress, stale_seconds)
 
 # 크롤러 시작 엔드포인트 추가
+# requeue=true이면 완료/실패한 query를 다시 대기 상태로 돌려 처음부터 재수집
 @app.post("/start-crawler")
-async def start_crawler():
+async def start_crawler(requeue: bool = False):
     global crawl_task
     if crawl_task and not crawl_task.done():
         raise HTTPException(status_code=400, detail="크롤러가 이미 실행 중입니다.")
+    if requeue:
+        count = await asyncio.get_running_loop().run_in_executor(None, work_queue.requeue_queries)
+        logging.info(f"query {count}개를 다시 대기 상태로 돌렸습니다.")
     
     crawl_task = asyncio.create_task(crawl_worker())
     
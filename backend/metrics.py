@@ -0,0 +1,45 @@
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# 단계별 소요 시간 (초)
+PAGE_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+SEARCH_API_SECONDS = Histogram(
+    'crawler_search_api_seconds', "네이버 검색 API 요청 한 번의 소요 시간", buckets=PAGE_BUCKETS)
+PAGE_LOAD_SECONDS = Histogram(
+    'crawler_page_load_seconds', "게시물 페이지 로드 시간 (mode=http|browser)", ['mode'], buckets=PAGE_BUCKETS)
+IFRAME_WAIT_SECONDS = Histogram(
+    'crawler_iframe_wait_seconds', "브라우저에서 mainFrame iframe을 기다린 시간", buckets=PAGE_BUCKETS)
+CONTENT_WAIT_SECONDS = Histogram(
+    'crawler_content_wait_seconds', "iframe 전환 후 본문 요소가 나타날 때까지 기다린 시간", buckets=PAGE_BUCKETS)
+PARSE_SECONDS = Histogram(
+    'crawler_parse_seconds', "게시물 HTML 추출 시간", buckets=FAST_BUCKETS)
+URL_SECONDS = Histogram(
+    'crawler_url_seconds', "URL 하나를 수집하는 전체 시간 (페이지 로드부터 추출까지)",
+    buckets=(0.01, 0.025, 0.05) + PAGE_BUCKETS)
+DB_FLUSH_SECONDS = Histogram(
+    'crawler_db_flush_seconds', "배치 하나를 DB에 저장하는 데 걸린 시간", buckets=FAST_BUCKETS + (5, 10, 30))
+
+# 큐/풀 상태
+DATA_QUEUE_DEPTH = Gauge('crawler_data_queue_depth', "저장을 기다리는 data_queue 레코드 수")
+DB_FLUSH_BATCH_SIZE = Gauge('crawler_db_flush_batch_size', "마지막으로 저장한 배치의 레코드 수")
+
+# 누적 횟수 (초당 값은 rate()로 계산)
+DRIVER_RESTARTS = Counter(
+    'crawler_driver_restarts_total', "WebDriver를 폐기하고 새로 만든 횟수 (reason=unhealthy|crashed|recycled)", ['reason'])
+RETRIES = Counter('crawler_retries_total', "단계별 재시도 횟수 (stage=search_api|db_flush|crawl_job)", ['stage'])
+ERRORS = Counter('crawler_errors_total', "단계별/유형별 오류 수", ['stage', 'type'])
+ROWS_WRITTEN = Counter(
+    'crawler_rows_written_total', "DB에 저장한 레코드 수 (status=inserted|updated|unchanged)", ['status'])
+ROWS_DROPPED = Counter('crawler_rows_dropped_total', "재시도 후에도 저장하지 못해 버린 레코드 수")
+
+# 조회 응답 캐시
+RESPONSE_CACHE_REQUESTS = Counter(
+    'api_response_cache_requests_total', "조회 응답 캐시 조회 결과 (result=hit|miss, 304로 응답하면 not_modified도 증가)", ['result'])
+RESPONSE_CACHE_EVICTIONS = Counter('api_response_cache_evictions_total', "메모리 한도 때문에 LRU로 밀려난 응답 수")
+RESPONSE_CACHE_BYTES = Gauge('api_response_cache_bytes', "캐시된 응답 본문의 총 크기")
+
+
+def render() -> tuple:
+    """(본문, Content-Type) 형태의 Prometheus 텍스트 형식 응답을 만듭니다."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,250 @@
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from database import get_connection, recompute_restaurant_stats
+
+MIGRATION_LOCK = "cr_data30_migrations"
+
+
+# 존재 여부를 먼저 확인하므로 수동으로 일부 적용된 DB에서도 다시 실행할 수 있음
+def index_exists(cursor, table: str, index: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s LIMIT 1",
+        (table, index),
+    )
+    return cursor.fetchone() is not None
+
+
+def column_exists(cursor, table: str, column: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s LIMIT 1",
+        (table, column),
+    )
+    return cursor.fetchone() is not None
+
+
+def add_index(table: str, index: str, definition: str) -> Callable:
+    def apply(cursor):
+        if not index_exists(cursor, table, index):
+            cursor.execute(f"ALTER TABLE {table} ADD {definition}")
+    return apply
+
+
+def add_column(table: str, column: str, definition: str) -> Callable:
+    def apply(cursor):
+        if not column_exists(cursor, table, column):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {definition}")
+    return apply
+
+
+def run_sql(query: str) -> Callable:
+    def apply(cursor):
+        cursor.execute(query)
+    return apply
+
+
+def drop_index(table: str, index: str) -> Callable:
+    def apply(cursor):
+        if index_exists(cursor, table, index):
+            cursor.execute(f"ALTER TABLE {table} DROP INDEX `{index}`")
+    return apply
+
+
+# (버전, 설명, 단계 목록). 이미 배포된 항목은 수정하지 말고 새 버전을 추가할 것
+MIGRATIONS: List[Tuple[int, str, List[Callable]]] = [
+    (1, "restaurant_name + id 복합 인덱스", [
+        add_index("cr_data30", "idx_restaurant_id", "INDEX idx_restaurant_id (restaurant_name, id)"),
+    ]),
+    (2, "restaurant_name + sympathy 복합 인덱스", [
+        add_index("cr_data30", "idx_restaurant_sympathy", "INDEX idx_restaurant_sympathy (restaurant_name, sympathy)"),
+    ]),
+    (3, "광고 + id 복합 인덱스", [
+        add_index("cr_data30", "idx_ad_id", "INDEX idx_ad_id (`광고`, id)"),
+    ]),
+    (4, "post_url 고정 길이 해시를 upsert 키로 사용", [
+        add_column("cr_data30", "post_url_hash",
+                   "post_url_hash BINARY(16) AS (UNHEX(MD5(post_url))) STORED"),
+        add_index("cr_data30", "uq_post_url_hash", "UNIQUE INDEX uq_post_url_hash (post_url_hash)"),
+        drop_index("cr_data30", "post_url"),  # create_table의 VARCHAR(255) UNIQUE 인덱스
+    ]),
+    (5, "마지막 크롤링 시각 기록", [
+        add_column("cr_data30", "last_crawled_at", "last_crawled_at DATETIME NULL"),
+        # 기존 행은 마이그레이션 시점에 수집된 것으로 간주해 재시작 직후 전체 재수집을 막음
+        run_sql("UPDATE cr_data30 SET last_crawled_at = NOW() WHERE last_crawled_at IS NULL"),
+    ]),
+    (6, "변경 감지용 content_hash", [
+        # 기존 행은 NULL로 두고, 다음 저장 때 컬럼별로 비교한 뒤 채움
+        add_column("cr_data30", "content_hash", "content_hash BINARY(16) NULL"),
+    ]),
+    (7, "query/URL 단위 크롤링 작업 큐", [
+        run_sql('''
+        CREATE TABLE IF NOT EXISTS crawl_queries (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            query VARCHAR(255) NOT NULL,
+            status ENUM('pending', 'leased', 'done', 'dead') NOT NULL DEFAULT 'pending',
+            attempts INT NOT NULL DEFAULT 0,
+            lease_owner VARCHAR(255) NULL,
+            lease_token CHAR(32) NULL,
+            lease_expires_at DATETIME NULL,
+            last_error TEXT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            UNIQUE INDEX uq_query (query),
+            INDEX idx_status_lease (status, lease_expires_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        '''),
+        run_sql('''
+        CREATE TABLE IF NOT EXISTS crawl_jobs (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            query_id INT NOT NULL,
+            restaurant_name VARCHAR(255),
+            post_url VARCHAR(1024) NOT NULL,
+            url_hash BINARY(16) AS (UNHEX(MD5(post_url))) STORED,
+            status ENUM('pending', 'leased', 'done', 'dead') NOT NULL DEFAULT 'pending',
+            attempts INT NOT NULL DEFAULT 0,
+            lease_owner VARCHAR(255) NULL,
+            lease_token CHAR(32) NULL,
+            lease_expires_at DATETIME NULL,
+            last_error TEXT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            UNIQUE INDEX uq_url_hash (url_hash),
+            INDEX idx_status_lease (status, lease_expires_at),
+            INDEX idx_query_id (query_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        '''),
+    ]),
+    (8, "작업 큐 shard 분할 및 작업자 heartbeat", [
+        add_column("crawl_queries", "shard", "shard INT NOT NULL DEFAULT 0"),
+        add_index("crawl_queries", "idx_shard_status_lease",
+                  "INDEX idx_shard_status_lease (shard, status, lease_expires_at)"),
+        add_column("crawl_jobs", "shard", "shard INT NOT NULL DEFAULT 0"),
+        add_index("crawl_jobs", "idx_shard_status_lease",
+                  "INDEX idx_shard_status_lease (shard, status, lease_expires_at)"),
+        run_sql('''
+        CREATE TABLE IF NOT EXISTS crawl_workers (
+            owner VARCHAR(255) PRIMARY KEY,
+            shard INT NOT NULL,
+            shard_count INT NOT NULL,
+            started_at DATETIME NOT NULL,
+            heartbeat_at DATETIME NOT NULL,
+            jobs_done INT NOT NULL DEFAULT 0,
+            jobs_failed INT NOT NULL DEFAULT 0
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        '''),
+    ]),
+    (9, "구글 지도 장소 정보 (google_crawling.py)", [
+        run_sql('''
+        CREATE TABLE IF NOT EXISTS google_maps_places (
+            restaurant_name VARCHAR(255) PRIMARY KEY,
+            googlemap_name VARCHAR(255) NULL,
+            rating DECIMAL(2, 1) NULL,
+            review_count INT NULL,
+            price VARCHAR(64) NULL,
+            category VARCHAR(255) NULL,
+            image TEXT NULL,
+            status ENUM('ok', 'not_found') NOT NULL DEFAULT 'ok',
+            enriched_at DATETIME NOT NULL,
+            INDEX idx_enriched_at (enriched_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        '''),
+    ]),
+    (10, "제목/본문/태그 한국어 전문 검색 인덱스 (ngram)", [
+        add_index("cr_data30", "ft_title_content_tags",
+                  "FULLTEXT INDEX ft_title_content_tags (title, content, tags) WITH PARSER ngram"),
+    ]),
+    (11, "식당별 집계 테이블 (save_to_db가 증분 갱신)", [
+        run_sql('''
+        CREATE TABLE IF NOT EXISTS restaurant_stats (
+            restaurant_name VARCHAR(255) PRIMARY KEY,
+            post_count INT NOT NULL DEFAULT 0,
+            ad_count INT NOT NULL DEFAULT 0,
+            sympathy_sum BIGINT NOT NULL DEFAULT 0,
+            latest_post_at DATETIME NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        '''),
+        recompute_restaurant_stats,  # 기존 게시물로 한 번 채움
+    ]),
+    (12, "조회 응답 캐시용 데이터 버전", [
+        run_sql('''
+        CREATE TABLE IF NOT EXISTS data_version (
+            id TINYINT PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        '''),
+        run_sql("INSERT IGNORE INTO data_version (id, version) VALUES (1, 0)"),
+    ]),
+    (13, "광고 판별 규칙 기록 (기존 행은 ad_classifier.py reclassify로 채움)", [
+        add_column("cr_data30", "ad_rule", "ad_rule VARCHAR(255) NULL"),
+    ]),
+]
+
+
+def apply_migrations() -> List[int]:
+    """적용되지 않은 마이그레이션을 버전 순서대로 적용하고, 새로 적용한 버전 목록을 반환합니다."""
+    applied_now = []
+    with get_connection() as conn, conn.cursor() as cursor:
+        # 여러 프로세스가 동시에 시작해도 한 곳에서만 적용되도록 잠금
+        cursor.execute("SELECT GET_LOCK(%s, 60) AS locked", (MIGRATION_LOCK,))
+        if not cursor.fetchone()['locked']:
+            raise RuntimeError("마이그레이션 잠금을 얻지 못했습니다.")
+        try:
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                name VARCHAR(255),
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            ''')
+            cursor.execute("SELECT version FROM schema_migrations")
+            applied = {row['version'] for row in cursor.fetchall()}
+            for version, name, steps in MIGRATIONS:
+                if version in applied:
+                    continue
+                logging.info(f"마이그레이션 {version} 적용 중: {name}")
+                for step in steps:
+                    step(cursor)
+                cursor.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+                conn.commit()
+                applied_now.append(version)
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK,))
+    if applied_now:
+        logging.info(f"마이그레이션 적용 완료: {applied_now}")
+    else:
+        logging.info("적용할 마이그레이션이 없습니다.")
+    return applied_now
+
+
+# 인덱스를 타야 하는 주요 조회 쿼리
+HOT_QUERIES: List[Tuple[str, str, tuple]] = [
+    ("식당별 게시물", "SELECT id, title FROM cr_data30 WHERE restaurant_name = %s ORDER BY id LIMIT 100", ("",)),
+    ("식당별 keyset 페이지", "SELECT id FROM cr_data30 WHERE restaurant_name = %s AND id > %s ORDER BY id LIMIT 100", ("", 0)),
+    ("식당별 공감순", "SELECT id FROM cr_data30 WHERE restaurant_name = %s ORDER BY sympathy DESC LIMIT 10", ("",)),
+    ("광고 여부 keyset 페이지", "SELECT id FROM cr_data30 WHERE `광고` = %s AND id > %s ORDER BY id LIMIT 100", ("O", 0)),
+    ("post_url 조회", "SELECT id FROM cr_data30 WHERE post_url_hash = UNHEX(MD5(%s))", ("",)),
+    ("본문 검색", "SELECT id FROM cr_data30 WHERE MATCH(title, content, tags) AGAINST (%s IN BOOLEAN MODE) LIMIT 20",
+     ('+"국밥"',)),
+]
+
+
+def check_query_plans() -> Dict[str, Optional[str]]:
+    """주요 쿼리의 EXPLAIN 결과를 확인해 전체 스캔(type=ALL)이면 경고하고, 쿼리별 사용 인덱스를 반환합니다."""
+    plans: Dict[str, Optional[str]] = {}
+    with get_connection() as conn, conn.cursor() as cursor:
+        for name, query, params in HOT_QUERIES:
+            cursor.execute("EXPLAIN " + query, params)
+            plan = cursor.fetchone()
+            plans[name] = plan.get('key')
+            if plan.get('type') == 'ALL' or plan.get('key') is None:
+                logging.warning(f"쿼리 계획 확인: '{name}' 쿼리가 인덱스를 사용하지 않습니다. ({plan})")
+            else:
+                logging.info(f"쿼리 계획 확인: '{name}' -> {plan.get('key')} ({plan.get('type')})")
+    return plans
+
+
+if __name__ == "__main__":
+    apply_migrations()
+    check_query_plans()
@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Tuple
+
+from metrics import RESPONSE_CACHE_BYTES, RESPONSE_CACHE_EVICTIONS, RESPONSE_CACHE_REQUESTS
+
+ENTRY_OVERHEAD = 256  # 키/튜플 등 본문 외에 항목마다 차지하는 대략적인 크기 (bytes)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더(쉼표로 구분, W/ 약한 비교 허용)에 etag가 포함되어 있는지 확인합니다."""
+    if not if_none_match:
+        return False
+    for value in if_none_match.split(','):
+        value = value.strip()
+        if value == '*' or (value[2:] if value.startswith('W/') else value) == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    GET 응답 본문을 데이터 버전별로 저장하는 LRU 캐시입니다.
+    데이터 버전은 save_to_db가 행을 추가/변경할 때마다 올리는 DB 값(data_version)이며,
+    최대 version_check_interval초마다 확인해 바뀌었으면 캐시를 비웁니다.
+    같은 프로세스에서 저장한 뒤에는 invalidate()를 호출해 다음 요청에서 바로 다시 확인합니다.
+    ETag는 본문의 해시이므로 버전이 바뀌어도 내용이 같은 응답은 304로 응답할 수 있습니다.
+    """
+
+    def __init__(self, fetch_version: Callable[[], Awaitable[int]], max_bytes: int = 64 * 1024 * 1024,
+                 version_check_interval: float = 1.0, max_entry_ratio: float = 0.25) -> None:
+        self.fetch_version = fetch_version
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = int(max_bytes * max_entry_ratio)  # 이보다 큰 응답은 캐시하지 않음
+        self.version_check_interval = version_check_interval
+        self._entries: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()  # key -> (etag, 본문)
+        self._bytes = 0
+        self._version: Optional[int] = None
+        self._checked_at = float('-inf')
+        self._invalidations = 0
+        self._lock: Optional[asyncio.Lock] = None  # 이벤트 루프 안에서 처음 사용할 때 생성
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def invalidate(self) -> None:
+        """다음 요청에서 데이터 버전을 바로 다시 확인하게 합니다. 다른 스레드(배치 writer 콜백)에서 호출해도 됩니다."""
+        self._invalidations += 1
+        self._checked_at = float('-inf')
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+        RESPONSE_CACHE_BYTES.set(0)
+
+    async def version(self) -> Optional[int]:
+        if time.monotonic() - self._checked_at < self.version_check_interval:
+            return self._version
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:  # 동시에 들어온 요청은 한 번만 조회
+            if time.monotonic() - self._checked_at >= self.version_check_interval:
+                invalidations, checked_at = self._invalidations, time.monotonic()
+                version = await self.fetch_version()
+                if version != self._version:
+                    if self._version is not None:
+                        logging.info(f"데이터 버전이 {self._version}에서 {version}(으)로 바뀌어 응답 캐시를 비웁니다.")
+                    self.clear()
+                    self._version = version
+                # 조회하는 동안 invalidate()가 호출됐으면 다음 요청에서 다시 확인
+                if invalidations == self._invalidations:
+                    self._checked_at = checked_at
+        return self._version
+
+    async def get(self, key: str, build: Callable[[], Awaitable[bytes]]) -> Tuple[str, bytes]:
+        """key의 (etag, 본문)을 반환합니다. 현재 버전으로 캐시된 것이 없으면 build()로 만들어 저장합니다."""
+        version = await self.version()
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            RESPONSE_CACHE_REQUESTS.labels('hit').inc()
+            return entry
+        self.misses += 1
+        RESPONSE_CACHE_REQUESTS.labels('miss').inc()
+        body = await build()
+        entry = (f'"{hashlib.md5(body).hexdigest()}"', body)
+        # 만드는 동안 버전이 바뀌었으면 예전 버전 기준의 본문일 수 있으므로 저장하지 않음
+        if version == self._version and len(body) <= self.max_entry_bytes:
+            self._put(key, entry)
+        return entry
+
+    def _put(self, key: str, entry: Tuple[str, bytes]) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous[1]) + len(key) + ENTRY_OVERHEAD
+        self._entries[key] = entry
+        self._bytes += len(entry[1]) + len(key) + ENTRY_OVERHEAD
+        while self._bytes > self.max_bytes and self._entries:
+            old_key, (_, old_body) = self._entries.popitem(last=False)
+            self._bytes -= len(old_body) + len(old_key) + ENTRY_OVERHEAD
+            self.evictions += 1
+            RESPONSE_CACHE_EVICTIONS.inc()
+        RESPONSE_CACHE_BYTES.set(self._bytes)
+
+    def record_not_modified(self) -> None:
+        self.not_modified += 1
+        RESPONSE_CACHE_REQUESTS.labels('not_modified').inc()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'version': self._version,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'not_modified': self.not_modified,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,69 @@
+import argparse
+import logging
+from typing import Dict, List, Optional
+
+from database import POST_DATE_EXPR, bump_data_version, get_connection, recompute_restaurant_stats, wait_for_database
+from migrations import apply_migrations
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+
+STATS_FIELDS = ('post_count', 'ad_count', 'sympathy_sum', 'latest_post_at')
+
+
+def rebuild(names: Optional[List[str]] = None) -> int:
+    """
+    cr_data30 전체를 다시 집계해 restaurant_stats를 만듭니다. names를 지정하면 해당 식당만 다시 집계합니다.
+    전체 재집계 중에는 restaurant_stats가 잠기므로 저장 중인 writer는 끝날 때까지 기다립니다.
+    """
+    with get_connection() as conn, conn.cursor() as cursor:
+        recompute_restaurant_stats(cursor, names)
+        bump_data_version(cursor)  # 캐시된 /restaurants 응답도 새로 만들도록
+        conn.commit()
+        cursor.execute("SELECT COUNT(*) AS count FROM restaurant_stats")
+        count = cursor.fetchone()['count']
+    logging.info(f"식당 {count}개의 집계를 다시 만들었습니다.")
+    return count
+
+
+def check(limit: int = 20) -> Dict[str, dict]:
+    """증분 갱신된 restaurant_stats와 cr_data30을 새로 집계한 값을 비교해 어긋난 식당을 반환합니다."""
+    with get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(
+            f"SELECT restaurant_name, COUNT(*) AS post_count, SUM(`광고` = 'O') AS ad_count, "
+            f"COALESCE(SUM(sympathy), 0) AS sympathy_sum, MAX({POST_DATE_EXPR}) AS latest_post_at "
+            f"FROM cr_data30 WHERE restaurant_name IS NOT NULL GROUP BY restaurant_name",
+            (),
+        )
+        expected = {row['restaurant_name']: row for row in cursor.fetchall()}
+        cursor.execute(f"SELECT restaurant_name, {', '.join(STATS_FIELDS)} FROM restaurant_stats")
+        actual = {row['restaurant_name']: row for row in cursor.fetchall()}
+
+    mismatches: Dict[str, dict] = {}
+    for name in sorted(set(expected) | set(actual)):
+        want, have = expected.get(name), actual.get(name)
+        if want and have and all(want[field] == have[field] for field in STATS_FIELDS):
+            continue
+        mismatches[name] = {'expected': want, 'actual': have}
+    logging.info(f"식당 {len(expected)}개 중 {len(mismatches)}개의 집계가 어긋나 있습니다.")
+    for name in list(mismatches)[:limit]:
+        logging.warning(f"{name}: {mismatches[name]}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="식당별 집계(restaurant_stats) 재생성 및 검증")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    rebuild_parser = subparsers.add_parser('rebuild', help="cr_data30을 다시 집계해 restaurant_stats를 덮어씀")
+    rebuild_parser.add_argument('--name', action='append', default=None, help="이 식당만 다시 집계 (여러 번 지정 가능)")
+    subparsers.add_parser('check', help="증분 집계와 전체 재집계 결과를 비교")
+    args = parser.parse_args()
+
+    wait_for_database()
+    apply_migrations()
+    if args.command == 'rebuild':
+        rebuild(args.name)
+    elif check():
+        raise SystemExit(1)
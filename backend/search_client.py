@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from metrics import ERRORS, RETRIES, SEARCH_API_SECONDS
+
+NAVER_BLOG_SEARCH_URL = os.environ.get('NAVER_OPENAPI_BASE', 'https://openapi.naver.com') + "/v1/search/blog"
+MAX_DISPLAY = 100  # 네이버 검색 API가 한 번에 반환하는 최대 결과 수
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """초당 rate개의 토큰을 채우고 최대 capacity개까지 모아두는 비동기 토큰 버킷입니다."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class NaverSearchClient:
+    """
+    네이버 블로그 검색 API 비동기 클라이언트입니다.
+    keep-alive 연결을 재사용하며, 페이지와 query를 동시에 요청하되 토큰 버킷으로 API 할당량을 지킵니다.
+    """
+
+    def __init__(self, client_id: str, client_secret: str, rate_per_sec: float = 10, burst: int = 10,
+                 concurrency: int = 10, max_retries: int = 5, backoff_base: float = 0.5) -> None:
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.bucket = TokenBucket(rate_per_sec, burst)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "NaverSearchClient":
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=10),
+            headers={
+                "X-Naver-Client-Id": self.client_id,
+                "X-Naver-Client-Secret": self.client_secret,
+            },
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.session.close()
+        self.session = None
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff_base * (2 ** attempt) + random.uniform(0, self.backoff_base)
+
+    async def fetch_page(self, query: str, start: int, display: int) -> List[dict]:
+        params = {"query": query, "start": start, "display": display, "sort": "sim"}
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            started = time.monotonic()
+            try:
+                async with self.session.get(NAVER_BLOG_SEARCH_URL, params=params) as response:
+                    if response.status == 200:
+                        items = (await response.json())['items']
+                        SEARCH_API_SECONDS.observe(time.monotonic() - started)
+                        return items
+                    SEARCH_API_SECONDS.observe(time.monotonic() - started)
+                    ERRORS.labels('search_api', f"http_{response.status}").inc()
+                    if response.status not in RETRY_STATUSES:
+                        logging.error(f"Error fetching data: {response.status} (query={query}, start={start})")
+                        return []
+                    delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                    logging.warning(f"검색 API {response.status} 응답, {delay:.1f}초 후 재시도합니다. (query={query})")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                ERRORS.labels('search_api', type(e).__name__).inc()
+                delay = self._backoff(attempt)
+                logging.warning(f"검색 API 요청 실패: {e}, {delay:.1f}초 후 재시도합니다. (query={query})")
+            if attempt < self.max_retries:
+                RETRIES.labels('search_api').inc()
+                await asyncio.sleep(delay)
+        logging.error(f"검색 API 재시도 횟수 초과 (query={query}, start={start})")
+        return []
+
+    async def fetch_urls(self, query: str, max_posts: int) -> List[str]:
+        display = min(MAX_DISPLAY, max_posts)
+        pages = await asyncio.gather(*(
+            self.fetch_page(query, start, display) for start in range(1, max_posts + 1, display)
+        ))
+
+        # 순서를 유지하면서 set으로 중복 제거
+        seen = set()
+        naver_urls: List[str] = []
+        for items in pages:
+            for row in items:
+                link = row['link']
+                if 'blog.naver' in link and link not in seen:
+                    seen.add(link)
+                    naver_urls.append(link)
+                if len(naver_urls) >= max_posts:
+                    return naver_urls
+        return naver_urls
+
+    async def fetch_many(self, queries: List[str], max_posts: int) -> Dict[str, List[str]]:
+        results = await asyncio.gather(*(self.fetch_urls(query, max_posts) for query in queries))
+        return dict(zip(queries, results))
@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+from typing import List
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+
+
+async def _run(shard_id: int) -> None:
+    # main.py의 asyncio.Queue 등이 이 이벤트 루프에 묶이도록 루프 안에서 import
+    import main
+    await main.run_crawler(worker_id=shard_id)
+
+
+def run_shard(shard_id: int, shard_count: int) -> None:
+    # main.py는 import 시점에 shard 설정을 읽으므로 환경 변수를 먼저 지정
+    os.environ['SHARD_ID'] = str(shard_id)
+    os.environ['SHARD_COUNT'] = str(shard_count)
+    asyncio.run(_run(shard_id))
+
+
+def parse_shard_ids(value: str, shard_count: int) -> List[int]:
+    """'0,2,5' 또는 '1-3' 형식의 shard 목록을 해석합니다. 비어 있거나 거꾸로 된 범위는 ValueError를 냅니다."""
+    shard_ids = []
+    for part in value.split(','):
+        if '-' in part:
+            start, end = part.split('-', 1)
+            if int(start) > int(end):
+                raise ValueError(f"shard 범위가 비어 있습니다: '{part}' (전체 shard 수 {shard_count}개)")
+            shard_ids.extend(range(int(start), int(end) + 1))
+        elif part:
+            shard_ids.append(int(part))
+    if not shard_ids:
+        raise ValueError(f"실행할 shard가 없습니다: '{value}'")
+    invalid = [shard for shard in shard_ids if not 0 <= shard < shard_count]
+    if invalid:
+        raise ValueError(f"shard 번호는 0 ~ {shard_count - 1} 사이여야 합니다: {invalid}")
+    return shard_ids
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="query를 shard로 나눠 shard마다 별도 프로세스(드라이버 풀)로 크롤링합니다.")
+    parser.add_argument('--shard-count', type=int, default=int(os.environ.get('SHARD_COUNT', os.cpu_count() or 1)),
+                        help="전체 shard 수 (모든 노드에서 같은 값을 사용해야 함)")
+    parser.add_argument('--shard-ids', default=None,
+                        help="이 노드에서 실행할 shard 번호 (예: 0-3, 4,5). 지정하지 않으면 전체")
+    parser.add_argument('--max-restarts', type=int, default=3, help="비정상 종료한 shard 프로세스를 다시 띄우는 최대 횟수")
+    args = parser.parse_args()
+
+    try:
+        shard_ids = parse_shard_ids(args.shard_ids, args.shard_count) if args.shard_ids else list(range(args.shard_count))
+    except ValueError as e:
+        parser.error(str(e))
+    logging.info(f"shard {shard_ids}를 실행합니다. (전체 shard 수: {args.shard_count})")
+
+    context = multiprocessing.get_context('spawn')  # 프로세스마다 브라우저/DB 연결을 새로 생성
+
+    def start(shard_id):
+        process = context.Process(target=run_shard, args=(shard_id, args.shard_count), name=f"shard-{shard_id}")
+        process.start()
+        return process
+
+    processes = {shard_id: start(shard_id) for shard_id in shard_ids}
+    restarts = {shard_id: 0 for shard_id in shard_ids}
+    failed = []
+    try:
+        while processes:
+            for shard_id, process in list(processes.items()):
+                process.join(timeout=1)
+                if process.exitcode is None:
+                    continue
+                del processes[shard_id]
+                if process.exitcode == 0:
+                    logging.info(f"shard {shard_id} 작업이 완료되었습니다.")
+                elif restarts[shard_id] < args.max_restarts:
+                    # 임대 중이던 작업은 임대가 만료되면 다시 처리되므로 그대로 재시작
+                    restarts[shard_id] += 1
+                    logging.warning(f"shard {shard_id}가 비정상 종료되어 다시 시작합니다. "
+                                    f"(exitcode={process.exitcode}, {restarts[shard_id]}/{args.max_restarts})")
+                    processes[shard_id] = start(shard_id)
+                else:
+                    logging.error(f"shard {shard_id}가 재시작 횟수를 초과했습니다. (exitcode={process.exitcode})")
+                    failed.append(shard_id)
+    except KeyboardInterrupt:
+        logging.info("중지 요청을 받아 shard 프로세스를 종료합니다.")
+        for process in processes.values():
+            process.terminate()
+        for process in processes.values():
+            process.join()
+        return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import bisect
+import hashlib
+import os
+from typing import List, Tuple
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """
+    query를 shard에 나누는 일관 해시 링입니다.
+    shard마다 가상 노드를 replicas개 두므로 shard 수를 늘리거나 줄여도 약 1/N의 query만 다른 shard로 옮겨집니다.
+    """
+
+    def __init__(self, shard_count: int, replicas: int = 100) -> None:
+        if shard_count < 1:
+            raise ValueError("shard_count는 1 이상이어야 합니다.")
+        self.shard_count = shard_count
+        points: List[Tuple[int, int]] = sorted(
+            (_hash(f"shard-{shard}#{replica}"), shard)
+            for shard in range(shard_count)
+            for replica in range(replicas)
+        )
+        self._keys = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_for(self, key: str) -> int:
+        if self.shard_count == 1:
+            return 0
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._shards[index]
+
+
+def shard_settings() -> Tuple[int, int]:
+    """환경 변수 SHARD_ID, SHARD_COUNT에서 (이 프로세스의 shard 번호, 전체 shard 수)를 읽습니다."""
+    shard_count = int(os.environ.get('SHARD_COUNT', 1))
+    shard_id = int(os.environ.get('SHARD_ID', 0))
+    if shard_count < 1 or not 0 <= shard_id < shard_count:
+        raise ValueError(f"잘못된 shard 설정입니다: SHARD_ID={shard_id}, SHARD_COUNT={shard_count}")
+    return shard_id, shard_count
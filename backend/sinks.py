@@ -0,0 +1,47 @@
+import logging
+import os
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+COLUMNS = ['writer', 'date', 'title', 'content', 'tags', 'sympathy', 'post_url', 'ad_images', '광고', 'ad_rule']
+
+
+def batched(records: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def records_to_dataframe(records: Iterable[dict]) -> pd.DataFrame:
+    return pd.DataFrame(list(records), columns=COLUMNS)
+
+
+def iter_dataframes(records: Iterable[dict], size: int = 500) -> Iterator[pd.DataFrame]:
+    for batch in batched(records, size):
+        yield pd.DataFrame(batch, columns=COLUMNS)
+
+
+def write_csv(records: Iterable[dict], path: str, size: int = 500) -> int:
+    """레코드를 size개씩 CSV에 이어 씁니다. 헤더와 BOM(utf-8-sig)은 처음 한 번만 기록합니다."""
+    written = 0
+    for index, df in enumerate(iter_dataframes(records, size)):
+        df.to_csv(path, mode='w' if index == 0 else 'a', header=index == 0, index=False,
+                  encoding='utf-8-sig' if index == 0 else 'utf-8')
+        written += len(df)
+    logging.info(f"{written}개의 레코드를 {os.path.basename(path)}에 저장했습니다.")
+    return written
+
+
+def write_db(records: Iterable[dict], size: int = 100, restaurant_name: Optional[str] = None) -> int:
+    from database import save_to_db  # DB 드라이버는 DB에 저장할 때만 필요
+
+    written = 0
+    for batch in batched(records, size):
+        save_to_db(batch, restaurant_name)
+        written += len(batch)
+    return written
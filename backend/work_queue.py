@@ -0,0 +1,233 @@
+import logging
+import os
+import socket
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from database import get_connection
+from sharding import HashRing
+
+# 큐 테이블 (스키마는 migrations.py 7번)
+QUERY_TABLE = "crawl_queries"
+JOB_TABLE = "crawl_jobs"
+WORKER_TABLE = "crawl_workers"
+
+
+class WorkQueue:
+    """
+    MySQL 테이블 기반의 크롤링 작업 큐입니다. query 단위(crawl_queries)와 URL 단위(crawl_jobs) 두 단계로 나뉩니다.
+    작업은 lease_seconds 동안 임대(lease)되며, 임대가 만료되면 다른 작업자가 다시 가져갈 수 있습니다.
+    완료/실패 처리는 임대할 때 받은 lease_token이 일치할 때만 반영되므로 한 작업은 정확히 한 번만 완료됩니다.
+    max_attempts번 실패한 작업은 dead 상태로 옮겨 더 이상 시도하지 않습니다.
+
+    query는 ring(일관 해시)으로 shard를 정해 등록하고, URL 작업은 자신을 만든 query의 shard를 따릅니다.
+    shard를 지정하면 그 shard의 작업만 임대하며, None이면 모든 shard의 작업을 가져옵니다.
+    """
+
+    def __init__(self, owner: Optional[str] = None, lease_seconds: int = 300, max_attempts: int = 3,
+                 ring: Optional[HashRing] = None, shard: Optional[int] = None) -> None:
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.ring = ring or HashRing(1)
+        self.shard = shard
+        self.jobs_done = 0
+        self.jobs_failed = 0
+
+    # 등록
+    def enqueue_queries(self, queries: Iterable[str]) -> int:
+        """
+        query를 등록합니다. 이미 있는 query 중 아직 대기 중인 것은 현재 ring 기준 shard로 다시 배정하므로,
+        shard 수를 바꿔 재시작해도 옮겨진 query만 새 shard에서 처리됩니다.
+        """
+        values = [(query, self.ring.shard_for(query)) for query in queries]
+        if not values:
+            return 0
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {QUERY_TABLE} (query, shard) VALUES (%s, %s) "
+                f"ON DUPLICATE KEY UPDATE shard = IF(status = 'pending', VALUES(shard), shard)",
+                values,
+            )
+            conn.commit()
+        logging.info(f"작업 큐에 query {len(values)}개를 shard {self.ring.shard_count}개로 나눠 등록했습니다.")
+        return len(values)
+
+    def requeue_queries(self) -> int:
+        """완료되었거나 dead 상태인 query를 다시 대기 상태로 돌려 재수집합니다."""
+        with get_connection() as conn, conn.cursor() as cursor:
+            count = cursor.execute(
+                f"UPDATE {QUERY_TABLE} SET status = 'pending', attempts = 0, last_error = NULL "
+                f"WHERE status IN ('done', 'dead')"
+            )
+            conn.commit()
+        return count
+
+    def enqueue_jobs(self, query: dict, urls: List[str]) -> int:
+        """임대한 query의 URL 작업을 등록합니다. 이미 완료/실패한 URL이면 다시 대기 상태로 되돌립니다."""
+        if not urls:
+            return 0
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.executemany(
+                f'''
+                INSERT INTO {JOB_TABLE} (query_id, restaurant_name, post_url, shard) VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    attempts = IF(status IN ('done', 'dead'), 0, attempts),
+                    last_error = IF(status IN ('done', 'dead'), NULL, last_error),
+                    status = IF(status IN ('done', 'dead'), 'pending', status)
+                ''',
+                [(query['id'], query['query'], url, query['shard']) for url in urls],
+            )
+            conn.commit()
+        return len(urls)
+
+    # 임대
+    def _claim(self, table: str, columns: str, limit: int, where: str = "", params: tuple = ()) -> List[dict]:
+        token = uuid.uuid4().hex
+        with get_connection() as conn, conn.cursor() as cursor:
+            # 임대가 만료된 작업 중 시도 횟수를 다 쓴 것은 dead로 이동
+            cursor.execute(
+                f"UPDATE {table} SET status = 'dead', lease_token = NULL, "
+                f"last_error = COALESCE(last_error, 'lease expired') "
+                f"WHERE status = 'leased' AND lease_expires_at < NOW() AND attempts >= %s",
+                (self.max_attempts,),
+            )
+            # 다른 작업자가 잠근 행은 건너뛰고 가져옴 (MySQL 8 SKIP LOCKED)
+            cursor.execute(
+                f"SELECT id FROM {table} "
+                f"WHERE (status = 'pending' OR (status = 'leased' AND lease_expires_at < NOW())) {where} "
+                f"ORDER BY id LIMIT %s FOR UPDATE SKIP LOCKED",
+                params + (limit,),
+            )
+            ids = [row['id'] for row in cursor.fetchall()]
+            if not ids:
+                conn.commit()
+                return []
+            placeholders = ', '.join(['%s'] * len(ids))
+            cursor.execute(
+                f"UPDATE {table} SET status = 'leased', lease_owner = %s, lease_token = %s, "
+                f"lease_expires_at = NOW() + INTERVAL %s SECOND, attempts = attempts + 1 "
+                f"WHERE id IN ({placeholders})",
+                (self.owner, token, self.lease_seconds, *ids),
+            )
+            cursor.execute(f"SELECT {columns}, attempts, lease_token FROM {table} WHERE id IN ({placeholders})", ids)
+            claimed = cursor.fetchall()
+            conn.commit()
+        return claimed
+
+    def _claim_shard(self, table: str, columns: str, limit: int) -> List[dict]:
+        if self.shard is None:
+            return self._claim(table, columns, limit)
+        return self._claim(table, columns, limit, "AND shard = %s", (self.shard,))
+
+    def claim_queries(self, limit: int) -> List[dict]:
+        return self._claim_shard(QUERY_TABLE, "id, query, shard", limit)
+
+    def claim_jobs(self, limit: int) -> List[dict]:
+        return self._claim_shard(JOB_TABLE, "id, query_id, restaurant_name, post_url, shard", limit)
+
+    # 완료/실패
+    def _complete(self, table: str, leases: List[tuple]) -> int:
+        if not leases:
+            return 0
+        with get_connection() as conn, conn.cursor() as cursor:
+            completed = cursor.execute(
+                f"UPDATE {table} SET status = 'done', lease_token = NULL, lease_expires_at = NULL, last_error = NULL "
+                f"WHERE status = 'leased' AND (id, lease_token) IN ({', '.join(['(%s, %s)'] * len(leases))})",
+                [value for lease in leases for value in lease],
+            )
+            conn.commit()
+        if completed < len(leases):
+            logging.warning(f"{table}: 임대가 만료된 작업 {len(leases) - completed}개는 완료 처리하지 않았습니다.")
+        return completed
+
+    def _fail(self, table: str, item: dict, error: str) -> None:
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET status = IF(attempts >= %s, 'dead', 'pending'), "
+                f"lease_token = NULL, lease_expires_at = NULL, last_error = %s "
+                f"WHERE id = %s AND lease_token = %s AND status = 'leased'",
+                (self.max_attempts, error[:1000], item['id'], item['lease_token']),
+            )
+            conn.commit()
+
+    def complete_query(self, query: dict) -> bool:
+        return self._complete(QUERY_TABLE, [(query['id'], query['lease_token'])]) == 1
+
+    def fail_query(self, query: dict, error: str) -> None:
+        self._fail(QUERY_TABLE, query, error)
+
+    def complete_jobs(self, jobs: List[dict]) -> int:
+        completed = self._complete(JOB_TABLE, [(job['id'], job['lease_token']) for job in jobs])
+        self.jobs_done += completed
+        return completed
+
+    def fail_job(self, job: dict, error: str) -> None:
+        self._fail(JOB_TABLE, job, error)
+        self.jobs_failed += 1
+
+    def complete_records(self, records: List[dict]) -> int:
+        """DB에 저장된 레코드에 붙어 있는 작업(_job)을 완료 처리합니다."""
+        return self.complete_jobs([record['_job'] for record in records if record.get('_job')])
+
+    # 작업자 상태
+    def heartbeat(self) -> None:
+        """이 작업자의 생존 시각과 처리 건수를 기록합니다. 코디네이터(progress)가 shard별 진행 상황을 모을 때 사용합니다."""
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {WORKER_TABLE} (owner, shard, shard_count, started_at, heartbeat_at, jobs_done, jobs_failed) "
+                f"VALUES (%s, %s, %s, NOW(), NOW(), %s, %s) "
+                f"ON DUPLICATE KEY UPDATE shard = VALUES(shard), shard_count = VALUES(shard_count), "
+                f"heartbeat_at = NOW(), jobs_done = VALUES(jobs_done), jobs_failed = VALUES(jobs_failed)",
+                (self.owner, self.shard or 0, self.ring.shard_count, self.jobs_done, self.jobs_failed),
+            )
+            conn.commit()
+
+    def progress(self, stale_seconds: int = 120) -> dict:
+        """shard별 query/URL 작업 상태와 작업자 heartbeat를 모아 반환합니다."""
+        shards: Dict[int, dict] = {
+            shard: {'queries': {}, 'jobs': {}, 'workers': []} for shard in range(self.ring.shard_count)
+        }
+        with get_connection() as conn, conn.cursor() as cursor:
+            for name, table in (("queries", QUERY_TABLE), ("jobs", JOB_TABLE)):
+                cursor.execute(f"SELECT shard, status, COUNT(*) AS count FROM {table} GROUP BY shard, status")
+                for row in cursor.fetchall():
+                    shard = shards.setdefault(row['shard'], {'queries': {}, 'jobs': {}, 'workers': []})
+                    shard[name][row['status']] = row['count']
+            cursor.execute(
+                f"SELECT owner, shard, started_at, heartbeat_at, jobs_done, jobs_failed, "
+                f"heartbeat_at >= NOW() - INTERVAL %s SECOND AS alive, "
+                f"TIMESTAMPDIFF(SECOND, started_at, heartbeat_at) AS uptime_seconds "
+                f"FROM {WORKER_TABLE} ORDER BY shard, owner",
+                (stale_seconds,),
+            )
+            for row in cursor.fetchall():
+                row['alive'] = bool(row['alive'])
+                uptime = row.pop('uptime_seconds') or 0
+                row['jobs_per_minute'] = row['jobs_done'] * 60 / uptime if uptime > 0 else 0
+                shards.setdefault(row['shard'], {'queries': {}, 'jobs': {}, 'workers': []})['workers'].append(row)
+
+        def total(name):
+            counts: Dict[str, int] = {}
+            for shard in shards.values():
+                for status, count in shard[name].items():
+                    counts[status] = counts.get(status, 0) + count
+            return counts
+
+        return {
+            'shard_count': self.ring.shard_count,
+            'queries': total('queries'),
+            'jobs': total('jobs'),
+            'alive_workers': sum(worker['alive'] for shard in shards.values() for worker in shard['workers']),
+            'jobs_per_minute': sum(worker['jobs_per_minute'] for shard in shards.values()
+                                   for worker in shard['workers'] if worker['alive']),
+            'shards': [{'shard': shard, **shards[shard]} for shard in sorted(shards)],
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        result = {}
+        with get_connection() as conn, conn.cursor() as cursor:
+            for name, table in (("queries", QUERY_TABLE), ("jobs", JOB_TABLE)):
+                cursor.execute(f"SELECT status, COUNT(*) AS count FROM {table} GROUP BY status")
+                result[name] = {row['status']: row['count'] for row in cursor.fetchall()}
+        return result
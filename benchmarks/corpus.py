@@ -0,0 +1,167 @@
+import argparse
+import gzip
+import html
+import json
+import os
+import random
+import sys
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from ad_classifier import get_classifier
+
+DEFAULT_CSV = os.path.join(ROOT, 'cr_data30.csv')
+RECORDED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'recorded')
+
+# 실제 PostView 문서는 본문보다 스크립트/스타일/메뉴가 훨씬 크므로 비슷한 분량을 채움
+BOILERPLATE = (
+    '<script type="text/javascript">var blogInfo = {' + ', '.join(f'"k{i}": "{"x" * 40}"' for i in range(200)) + '};</script>'
+    '<style>' + ''.join(f'.c{i} {{ margin: {i}px; padding: 0; }}' for i in range(400)) + '</style>'
+    '<div id="gnb"><ul>' + ''.join(f'<li class="menu"><a href="/m{i}">메뉴 {i}</a></li>' for i in range(80)) + '</ul></div>'
+)
+IMAGE_SRC = "https://postfiles.pstatic.net/MjAyMTA1MzFf{index}/image_{index}.jpg?type=w80_blur"
+
+
+def _paragraphs(content: str, size: int = 200) -> List[str]:
+    content = content.strip()
+    return [content[start:start + size] for start in range(0, len(content), size)] or [""]
+
+
+def render_post(row: Dict, content_repeat: int = 1, images: int = 2, videos: int = 1) -> str:
+    """cr_data30.csv의 한 행을 네이버 PostView와 같은 구조의 HTML로 만듭니다."""
+    paragraphs = _paragraphs(str(row['content'] if pd.notna(row['content']) else "") * content_repeat)
+    tags = [tag.strip() for tag in str(row['tags'] if pd.notna(row['tags']) else "").split(',') if tag.strip()]
+    ad_images = [src.strip() for src in str(row['ad_images'] if pd.notna(row['ad_images']) else "").split(',') if src.strip()]
+    esc = html.escape
+
+    body = []
+    for index, paragraph in enumerate(paragraphs):
+        body.append(f'<div class="se-component se-text se-l-default"><div class="se-module se-module-text">'
+                    f'<p class="se-text-paragraph"><span class="se-fs-">{esc(paragraph)}</span></p></div></div>')
+        # 이미지를 문단 사이에 고르게 배치
+        count = images * (index + 1) // len(paragraphs) - images * index // len(paragraphs)
+        for image in range(count):
+            body.append(f'<div class="se-component se-image"><img src="{IMAGE_SRC.format(index=index * 1000 + image)}" '
+                        f'alt=""></div>')
+        if videos and index == len(paragraphs) // 2:
+            body.append('<div class="se-module se-module-video __se-component"><span>동영상 설명</span></div>')
+    for src in ad_images:
+        body.append(f'<div class="se-component se-image"><img src="{esc(src)}" alt=""></div>')
+    body.append('<div class="se-component se-text"><span class="__se-hash-tag">#해시태그</span></div>')
+
+    return (
+        '<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8"><title>네이버 블로그</title>' + BOILERPLATE +
+        '</head><body><div id="postViewArea">'
+        f'<div class="se-module se-module-text se-title-text"><p class="se-text-paragraph">'
+        f'<span class="se-fs-">{esc(str(row["title"]))}</span></p></div>'
+        f'<span class="nick"><a class="link" href="#">{esc(str(row["writer"]))}</a></span>'
+        f'<span class="se_publishDate pcol2">{esc(str(row["date"]))}</span>'
+        f'<div class="se-main-container">{"".join(body)}</div>'
+        '<div class="wrap_tag">' + ''.join(f'<a href="#"><span class="ell">{esc(tag)}</span></a>' for tag in tags) + '</div>'
+        f'<span class="u_likeit_list_btn _button btn_sympathy pcol2 off"><em class="u_cnt _count">{int(row["sympathy"])}</em></span>'
+        '</div></body></html>'
+    )
+
+
+def expected_record(row: Dict) -> Dict:
+    """render_post로 만든 문서에서 추출되어야 하는 값 (본문은 문단 구조가 달라 비교하지 않음)"""
+    tags = [tag.strip() for tag in str(row['tags'] if pd.notna(row['tags']) else "").split(',') if tag.strip()]
+    ad_images = [src.strip() for src in str(row['ad_images'] if pd.notna(row['ad_images']) else "").split(',') if src.strip()]
+    # 광고 판별은 공백을 무시하므로 문단으로 나뉘어도 원래 본문과 결과가 같음
+    _, ad_rule = get_classifier().classify(ad_images, str(row['content'] if pd.notna(row['content']) else ""))
+    return {
+        'title': str(row['title']).strip(),
+        'writer': str(row['writer']).strip(),
+        'date': str(row['date']).strip(),
+        'tags': ", ".join(tags),
+        'sympathy': int(row['sympathy']),
+        '광고': 'O' if ad_rule else 'X',
+        'ad_rule': ad_rule,
+    }
+
+
+def build_corpus(csv_path: str = DEFAULT_CSV, limit: Optional[int] = None, seed: int = 0) -> List[Dict]:
+    """
+    CSV 행으로 고정된(seed) 합성 문서 묶음을 만듭니다.
+    - small: 원래 길이 그대로
+    - huge: 본문 20배, 이미지 40장
+    - image_heavy: 이미지 200장
+    """
+    df = pd.read_csv(csv_path).dropna(subset=['title', 'post_url'])
+    df = df[df['title'] != 'error']
+    rows = df.to_dict('records')
+    random.Random(seed).shuffle(rows)
+    if limit:
+        rows = rows[:limit]
+    corpus = []
+    for index, row in enumerate(rows):
+        kind = ('small', 'small', 'huge', 'image_heavy')[index % 4]
+        if kind == 'huge':
+            page = render_post(row, content_repeat=20, images=40, videos=3)
+        elif kind == 'image_heavy':
+            page = render_post(row, images=200)
+        else:
+            page = render_post(row)
+        corpus.append({'kind': kind, 'url': row['post_url'], 'html': page, 'expected': expected_record(row)})
+    return corpus
+
+
+def load_recorded(directory: str = RECORDED_DIR) -> Iterator[Dict]:
+    """record 명령으로 저장한 실제 PostView 문서 (정답 값 없이 시간만 측정)"""
+    if not os.path.isdir(directory):
+        return
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json.gz'):
+            continue
+        with gzip.open(os.path.join(directory, name), 'rt', encoding='utf-8') as file:
+            fixture = json.load(file)
+        yield {'kind': 'recorded', 'url': fixture['url'], 'html': fixture['html'], 'expected': None}
+
+
+def record(csv_path: str = DEFAULT_CSV, limit: int = 50, directory: str = RECORDED_DIR) -> int:
+    """CSV의 URL에서 실제 PostView 문서를 받아 fixture로 저장합니다. (네트워크 필요)"""
+    from crawler import Crawler, parse_blog_post_id
+
+    os.makedirs(directory, exist_ok=True)
+    urls = pd.read_csv(csv_path)['post_url'].dropna().drop_duplicates().tolist()
+    crawler = Crawler()
+    saved = 0
+    try:
+        for url in urls:
+            if saved >= limit:
+                break
+            post_id = parse_blog_post_id(url)
+            if post_id is None:
+                continue
+            try:
+                page = crawler.fetch_post_html(url)
+            except Exception as e:
+                print(f"건너뜀: {url}: {e}")
+                continue
+            with gzip.open(os.path.join(directory, f"{post_id[0]}_{post_id[1]}.json.gz"), 'wt', encoding='utf-8') as file:
+                json.dump({'url': url, 'html': page}, file, ensure_ascii=False)
+            saved += 1
+    finally:
+        crawler.close()
+    print(f"{saved}개의 문서를 {directory}에 저장했습니다.")
+    return saved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크용 블로그 문서 fixture")
+    parser.add_argument('command', choices=['record', 'summary'])
+    parser.add_argument('--csv', default=DEFAULT_CSV)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+    if args.command == 'record':
+        record(args.csv, args.limit)
+    else:
+        corpus = build_corpus(args.csv) + list(load_recorded())
+        for kind in sorted({doc['kind'] for doc in corpus}):
+            docs = [doc for doc in corpus if doc['kind'] == kind]
+            sizes = sorted(len(doc['html']) for doc in docs)
+            print(f"{kind}: {len(docs)}개, 크기 중앙값 {sizes[len(sizes) // 2] / 1024:.0f}KB, 최대 {sizes[-1] / 1024:.0f}KB")
@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from corpus import ROOT, build_corpus, load_recorded
+
+from ad_classifier import get_classifier
+from extractor import HAS_LXML, extract_post
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_THRESHOLDS = os.path.join(BENCH_DIR, 'thresholds.json')
+IMG_SRC_RE = re.compile(r'<img[^>]+src="([^"]+)"')
+BENCH_URL_PREFIX = "https://blog.naver.com/__bench__/"  # save_to_db 벤치마크가 쓰고 지우는 행
+
+
+def summarize(samples: List[float], extra: Optional[Dict] = None) -> Dict:
+    samples = sorted(samples)
+    total = sum(samples)
+    result = {
+        'n': len(samples),
+        'total_s': round(total, 4),
+        'ops_per_sec': round(len(samples) / total, 2) if total else 0,
+        'mean_ms': round(statistics.mean(samples) * 1000, 3),
+        'p50_ms': round(samples[len(samples) // 2] * 1000, 3),
+        'p99_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3),
+    }
+    result.update(extra or {})
+    return result
+
+
+def time_each(items: list, func: Callable, repeat: int) -> List[float]:
+    for item in items[:5]:  # 워밍업
+        func(item)
+    samples = []
+    for _ in range(repeat):
+        for item in items:
+            started = time.perf_counter()
+            func(item)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_extract(corpus: List[Dict], backend: str, repeat: int) -> Dict[str, Dict]:
+    results = {}
+    mismatches = 0
+    for doc in corpus:
+        if doc['expected'] is None:
+            continue
+        record = extract_post(doc['html'], doc['url'], backend=backend)
+        if any(record[key] != value for key, value in doc['expected'].items()):
+            mismatches += 1
+    for kind in sorted({doc['kind'] for doc in corpus}) + ['all']:
+        docs = [doc for doc in corpus if kind in ('all', doc['kind'])]
+        samples = time_each(docs, lambda doc: extract_post(doc['html'], doc['url'], backend=backend), repeat)
+        megabytes = sum(len(doc['html'].encode('utf-8')) for doc in docs) * repeat / 1024 ** 2
+        results[f'extract.{backend}.{kind}'] = summarize(samples, {'mb_per_sec': round(megabytes / sum(samples), 2)})
+    results[f'extract.{backend}.all']['mismatches'] = mismatches
+    return results
+
+
+def bench_ad_detection(corpus: List[Dict], repeat: int) -> Dict[str, Dict]:
+    """이미지 src와 추출한 본문을 입력으로 광고 분류기만 측정합니다."""
+    classifier = get_classifier()
+    inputs = [(IMG_SRC_RE.findall(doc['html']), extract_post(doc['html'], doc['url'])['content']) for doc in corpus]
+    samples = time_each(inputs, lambda item: classifier.classify(*item), repeat * 10)
+    return {'ad_detection': summarize(samples, {
+        'images_per_doc': round(statistics.mean(len(srcs) for srcs, _ in inputs), 1),
+        'ads': sum(classifier.classify(*item)[1] is not None for item in inputs),
+    })}
+
+
+def bench_save_to_db(corpus: List[Dict], batch_size: int) -> Dict[str, Dict]:
+    """로컬 DB(DB_HOST/DB_NAME 환경 변수)에 신규 저장, 변경 없는 재저장, 내용 변경 재저장을 측정합니다."""
+    from database import (bump_data_version, create_table, get_connection, recompute_restaurant_stats, save_to_db,
+                          wait_for_database)
+    from migrations import apply_migrations
+
+    wait_for_database()
+    create_table()
+    apply_migrations()
+    records = []
+    for index, doc in enumerate(corpus):
+        record = extract_post(doc['html'], f"{BENCH_URL_PREFIX}{index}")
+        record['restaurant_name'] = "벤치마크"
+        records.append(record)
+    batches = [records[start:start + batch_size] for start in range(0, len(records), batch_size)]
+
+    def run(name, batch_list):
+        samples = []
+        for batch in batch_list:
+            started = time.perf_counter()
+            save_to_db(batch)
+            samples.append(time.perf_counter() - started)
+        result = summarize(samples, {'batch_size': batch_size})
+        result['rows_per_sec'] = round(len(records) / sum(samples), 2)
+        return name, result
+
+    def cleanup():
+        with get_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("DELETE FROM cr_data30 WHERE post_url LIKE %s", (BENCH_URL_PREFIX + '%',))
+            recompute_restaurant_stats(cursor, ["벤치마크"])
+            bump_data_version(cursor)
+            conn.commit()
+
+    cleanup()
+    try:
+        results = dict([run('save_to_db.insert', batches), run('save_to_db.unchanged', batches)])
+        for record in records:
+            record['content'] += " (수정)"
+        results.update([run('save_to_db.update', batches)])
+    finally:
+        cleanup()
+    return results
+
+
+def check(results: Dict[str, Dict], thresholds: Dict[str, Dict], baseline: Optional[Dict],
+          tolerance: float) -> List[str]:
+    """임계값 또는 이전 결과(baseline) 대비 느려진 항목을 반환합니다."""
+    failures = []
+    for name, limits in thresholds.items():
+        result = results.get(name)
+        if result is None:
+            continue
+        if 'min_ops_per_sec' in limits and result['ops_per_sec'] < limits['min_ops_per_sec']:
+            failures.append(f"{name}: ops_per_sec {result['ops_per_sec']} < {limits['min_ops_per_sec']}")
+        if 'max_p99_ms' in limits and result['p99_ms'] > limits['max_p99_ms']:
+            failures.append(f"{name}: p99_ms {result['p99_ms']} > {limits['max_p99_ms']}")
+        if 'max_mismatches' in limits and result.get('mismatches', 0) > limits['max_mismatches']:
+            failures.append(f"{name}: 추출 결과 불일치 {result['mismatches']}건")
+    for name, previous in (baseline or {}).get('results', {}).items():
+        result = results.get(name)
+        if result and previous.get('ops_per_sec') and result['ops_per_sec'] < previous['ops_per_sec'] * (1 - tolerance):
+            failures.append(f"{name}: ops_per_sec {result['ops_per_sec']}가 기준값 {previous['ops_per_sec']}보다 "
+                            f"{(1 - result['ops_per_sec'] / previous['ops_per_sec']) * 100:.0f}% 느림")
+    return failures
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="네트워크 없이 추출/광고 판별/DB 저장 성능을 측정합니다.")
+    parser.add_argument('--csv', default=os.path.join(ROOT, 'cr_data30.csv'))
+    parser.add_argument('--limit', type=int, default=None, help="사용할 문서 수")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--backends', default='lxml,bs4' if HAS_LXML else 'bs4')
+    parser.add_argument('--db', action='store_true', help="save_to_db도 측정 (DB_* 환경 변수의 로컬 DB에 쓰고 지움)")
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results.json'))
+    parser.add_argument('--thresholds', default=DEFAULT_THRESHOLDS)
+    parser.add_argument('--baseline', default=None, help="비교할 이전 results.json")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="baseline 대비 허용하는 처리량 감소 비율")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.csv, args.limit) + list(load_recorded())
+    results: Dict[str, Dict] = {}
+    for backend in args.backends.split(','):
+        results.update(bench_extract(corpus, backend, args.repeat))
+    results.update(bench_ad_detection(corpus, args.repeat))
+    if args.db:
+        results.update(bench_save_to_db(corpus, args.batch_size))
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'documents': len(corpus),
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+
+    for name, result in results.items():
+        print(f"{name:32s} {result['ops_per_sec']:>10.1f} ops/s  p50 {result['p50_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms")
+
+    thresholds = {}
+    if args.thresholds and os.path.exists(args.thresholds):
+        with open(args.thresholds, encoding='utf-8') as file:
+            thresholds = json.load(file)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+    failures = check(results, thresholds, baseline, args.tolerance)
+    for failure in failures:
+        print(f"성능 저하: {failure}")
+    print(f"결과를 {args.output}에 저장했습니다.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,122 +1,185 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import pandas as pd
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+import argparse
+import os
+import re
+import sys
 import time
+import urllib.parse
+import pandas as pd
 import yaml
 import logging
 
+# backend 모듈(드라이버 풀, DB) 사용
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from driver_pool import DriverPool  # noqa: E402
+from database import fetch_enriched_places, upsert_places, wait_for_database  # noqa: E402
+from migrations import apply_migrations  # noqa: E402
+
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
 )
 
+# 검색어로 바로 이동하면 검색창 입력/클릭 없이 결과 목록 또는 장소 상세가 열림
+SEARCH_URL = "https://www.google.com/maps/search/{query}?hl=ko"
+RESULT_LINK_SELECTOR = "a.hfpxzc"  # 검색 결과 목록의 장소 링크
+PLACE_TITLE_SELECTOR = "h1.DUwDvf"  # 장소 상세 패널 제목
+NO_RESULT_SELECTOR = "div.Q2vNVc"  # "검색 결과 없음" 안내
+PANEL = "#QA0Szd > div > div > div.w6VYqd > div:nth-child(2) > div > div.e07Vkf.kA9KIf > div > div"
+RATING_SELECTOR = PANEL + " > div.TIHn2 > div > div.lMbq3e > div.LBgpqf > div > div.fontBodyMedium.dmRWX > div.F7nice > span:nth-child(1) > span:nth-child(1)"
+REVIEW_COUNT_SELECTOR = PANEL + " > div.TIHn2 > div > div.lMbq3e > div.LBgpqf > div > div.fontBodyMedium.dmRWX > div.F7nice > span:nth-child(2) > span > span"
+PRICE_SELECTOR = PANEL + " > div.TIHn2 > div > div.lMbq3e > div.LBgpqf > div > div.fontBodyMedium.dmRWX > span > span > span > span:nth-child(2) > span > span"
+CATEGORY_SELECTOR = PANEL + " > div.TIHn2 > div > div.lMbq3e > div.LBgpqf > div > div:nth-child(2) > span:nth-child(1) > span > button"
+IMAGE_SELECTOR = PANEL + " > div.ZKCDEc > div.RZ66Rb.FgCUCc > button > img"
+
+
+def load_config():
+    config_path = os.environ.get("CONFIG_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "config.yaml"))
+    with open(config_path, "r", encoding="utf-8") as file:
+        return yaml.safe_load(file)
+
 def load_queries():
-    with open("backend/config.yaml", "r", encoding="utf-8") as file:
-        config = yaml.safe_load(file)
-    return config["query"]
+    return load_config()["query"]
 
 def create_driver():
     options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--lang=ko-KR")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
+    # 장소 정보는 텍스트와 이미지 src만 필요하므로 이미지는 받지 않음
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    options.page_load_strategy = "eager"
     return webdriver.Chrome(options=options)
 
-def crawl_google_maps(queries, max_results=1):
-    driver = create_driver()
+def parse_rating(text: Optional[str]) -> Optional[float]:
+    try:
+        return float(text.replace(",", "."))
+    except (AttributeError, ValueError):
+        return None
+
+def parse_review_count(text: Optional[str]) -> Optional[int]:
+    # "(1,234)" 형식에서 숫자만 추출
+    digits = re.sub(r"[^0-9]", "", text or "")
+    return int(digits) if digits else None
+
+def text_or_none(driver, selector: str) -> Optional[str]:
+    try:
+        return driver.find_element(By.CSS_SELECTOR, selector).text or None
+    except NoSuchElementException:
+        return None
+
+def crawl_place(driver, query: str, timeout: float = 10) -> dict:
+    """검색어 하나의 첫 번째 장소 정보를 수집합니다. 결과가 없으면 status가 not_found인 dict를 반환합니다."""
+    driver.get(SEARCH_URL.format(query=urllib.parse.quote(query)))
+    wait = WebDriverWait(driver, timeout, poll_frequency=0.2)
+
+    # 결과 목록, 장소 상세, 결과 없음 중 먼저 나타나는 것을 기다림
+    wait.until(EC.any_of(
+        EC.presence_of_element_located((By.CSS_SELECTOR, PLACE_TITLE_SELECTOR)),
+        EC.element_to_be_clickable((By.CSS_SELECTOR, RESULT_LINK_SELECTOR)),
+        EC.presence_of_element_located((By.CSS_SELECTOR, NO_RESULT_SELECTOR)),
+    ))
+    if not driver.find_elements(By.CSS_SELECTOR, PLACE_TITLE_SELECTOR):
+        links = driver.find_elements(By.CSS_SELECTOR, RESULT_LINK_SELECTOR)
+        if not links:
+            return {"restaurant_name": query, "status": "not_found"}
+        links[0].click()
+    title = wait.until(lambda d: d.find_element(By.CSS_SELECTOR, PLACE_TITLE_SELECTOR).text or False)
+
+    image = None
+    try:
+        image = driver.find_element(By.CSS_SELECTOR, IMAGE_SELECTOR).get_attribute("src")
+    except NoSuchElementException:
+        pass
+    return {
+        "restaurant_name": query,
+        "googlemap_name": title,
+        "rating": parse_rating(text_or_none(driver, RATING_SELECTOR)),
+        "review_count": parse_review_count(text_or_none(driver, REVIEW_COUNT_SELECTOR)),
+        "price": text_or_none(driver, PRICE_SELECTOR),
+        "category": text_or_none(driver, CATEGORY_SELECTOR),
+        "image": image,
+        "status": "ok",
+    }
+
+def crawl_google_maps(queries: List[str], workers: int = 4, ttl_hours: Optional[float] = 168, retries: int = 2,
+                      flush_size: int = 20) -> List[dict]:
+    """
+    구글 지도 장소 정보를 드라이버 workers개로 병렬 수집해 google_maps_places 테이블에 upsert 합니다.
+    ttl_hours 안에 이미 수집한 식당은 건너뛰므로 다시 실행해도 새로 추가되거나 오래된 식당만 수집합니다.
+    """
+    queries = list(dict.fromkeys(queries))
+    done = fetch_enriched_places(queries, ttl_hours) if ttl_hours is not None else set()
+    todo = [query for query in queries if query not in done]
+    logging.info(f"전체 {len(queries)}개 중 {len(done)}개는 최근에 수집되어 건너뛰고 {len(todo)}개를 수집합니다.")
+    if not todo:
+        return []
+
+    pool = DriverPool(create_driver, size=workers, max_pages=50)
     results = []
+    pending = []
 
-    for idx, query in enumerate(queries[:max_results]):
-        logging.info(f"[{idx+1}/{max_results}] Google Maps에서 검색 중: {query}")
-        driver.get("https://www.google.com/maps/")
-        time.sleep(2)
-
-        try:
-            searchbox = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.ID, "searchboxinput"))
-            )
-            searchbox.clear()
-            searchbox.send_keys(query)
-            searchbutton = driver.find_element(By.ID, "searchbox-searchbutton")
-            searchbutton.click()
-
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div.tAiQdd"))
-            )
-            driver.find_element(By.CSS_SELECTOR, "div.tAiQdd").click()
-            time.sleep(3)
-
-            title = driver.find_element(By.CSS_SELECTOR, "h1.DUwDvf").text
+    def crawl(query):
+        for attempt in range(1, retries + 2):
             try:
-                rating = driver.find_element(By.CSS_SELECTOR, "#QA0Szd > div > div > div.w6VYqd > div:nth-child(2) > div > div.e07Vkf.kA9KIf > div > div > div.TIHn2 > div > div.lMbq3e > div.LBgpqf > div > div.fontBodyMedium.dmRWX > div.F7nice > span:nth-child(1) > span:nth-child(1)").text
-            except:
-                rating = "N/A"
-            try:
-                review_count = driver.find_element(By.CSS_SELECTOR, "#QA0Szd > div > div > div.w6VYqd > div:nth-child(2) > div > div.e07Vkf.kA9KIf > div > div > div.TIHn2 > div > div.lMbq3e > div.LBgpqf > div > div.fontBodyMedium.dmRWX > div.F7nice > span:nth-child(2) > span > span").text
-            except:
-                review_count = "N/A"
-
-            try:
-                price = driver.find_element(By.CSS_SELECTOR, "#QA0Szd > div > div > div.w6VYqd > div:nth-child(2) > div > div.e07Vkf.kA9KIf > div > div > div.TIHn2 > div > div.lMbq3e > div.LBgpqf > div > div.fontBodyMedium.dmRWX > span > span > span > span:nth-child(2) > span > span").text
-            except:
-                price = "N/A"
-            try:
-                category = driver.find_element(By.CSS_SELECTOR, "#QA0Szd > div > div > div.w6VYqd > div:nth-child(2) > div > div.e07Vkf.kA9KIf > div > div > div.TIHn2 > div > div.lMbq3e > div.LBgpqf > div > div:nth-child(2) > span:nth-child(1) > span > button").text
-            except:
-                category = "N/A"
-            # 이미지 URL 
-            try:
-                image_element = driver.find_element(By.CSS_SELECTOR, "#QA0Szd > div > div > div.w6VYqd > div:nth-child(2) > div > div.e07Vkf.kA9KIf > div > div > div.ZKCDEc > div.RZ66Rb.FgCUCc > button > img")
-                image_url = image_element.get_attribute("src")
-            except:
-                image_url = "N/A"
-
-            results.append({
-                "restaurant_name": query,
-                "googlemap_name": title,
-                "rating": rating,
-                "review_count": review_count,
-                "price": price,
-                "category": category,
-                "image": image_url
-            })
-            logging.info(f"크롤링 성공: {title}")
-
-        except Exception as e:
-            logging.error(f"검색 결과 크롤링 중 오류 발생: {e}")
-
-        time.sleep(2)
-
-    driver.quit()
+                with pool.lease() as driver:
+                    return crawl_place(driver, query)
+            except TimeoutException:
+                logging.warning(f"'{query}' 검색 결과 대기 시간 초과 ({attempt}/{retries + 1})")
+            except Exception as e:
+                logging.error(f"'{query}' 크롤링 중 오류 발생 ({attempt}/{retries + 1}): {e}")
+        return {"restaurant_name": query, "status": "error"}
+
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(crawl, query): query for query in todo}
+            for index, future in enumerate(as_completed(futures), start=1):
+                place = future.result()
+                results.append(place)
+                if place["status"] != "error":  # 실패한 식당은 저장하지 않아 다음 실행 때 다시 시도 (기존 정보도 유지)
+                    pending.append(place)
+                logging.info(f"[{index}/{len(todo)}] {place['restaurant_name']}: {place.get('googlemap_name') or place['status']}")
+                if len(pending) >= flush_size:
+                    upsert_places(pending)
+                    pending = []
+        upsert_places(pending)
+    finally:
+        pool.close()
+    logging.info(f"{len(results)}개를 {time.monotonic() - started:.1f}초 동안 수집했습니다.")
     return results
 
 def save_to_csv(data, filename):
     df = pd.DataFrame(data)
-    
-    # review_count 컬럼에서 '-', '(', ')' 제거 및 숫자로 변환
-    if 'review_count' in df.columns:
-        df['review_count'] = (
-            df['review_count']
-            .str.replace("-", "", regex=False)   # '-' 기호 제거
-            .str.replace(",", "", regex=False)  # 쉼표 제거
-            .str.replace("(", "", regex=False)  # '(' 제거
-            .str.replace(")", "", regex=False)  # ')' 제거
-            .fillna("0")                        # 결측값을 '0'으로 대체
-            .astype(int)                        # 정수형으로 변환
-        )
-    
     df.to_csv(filename, index=False, encoding="utf-8-sig")
     logging.info(f"크롤링 결과가 {filename}에 저장되었습니다.")
 
 
 if __name__ == "__main__":
-    queries = load_queries()
-    output_file = "google_maps_results.csv"
+    parser = argparse.ArgumentParser(description="config.yaml의 식당을 구글 지도에서 검색해 google_maps_places 테이블에 저장")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 사용할 Chrome 수")
+    parser.add_argument("--ttl-hours", type=float, default=168, help="이 시간 안에 수집한 식당은 건너뜀")
+    parser.add_argument("--refresh", action="store_true", help="TTL과 관계없이 모두 다시 수집")
+    parser.add_argument("--limit", type=int, default=None, help="처리할 식당 수")
+    parser.add_argument("--csv", default=None, help="이번 실행 결과를 CSV로도 저장 (예: google_maps_results.csv)")
+    args = parser.parse_args()
+
+    queries = load_queries()[:args.limit]
 
     logging.info("크롤링 시작")
-    search_results = crawl_google_maps(queries, max_results=1)
-    save_to_csv(search_results, output_file)
+    wait_for_database()
+    apply_migrations()
+    search_results = crawl_google_maps(queries, workers=args.workers, ttl_hours=None if args.refresh else args.ttl_hours)
+    if args.csv:
+        save_to_csv(search_results, args.csv)
     logging.info("크롤링 완료")
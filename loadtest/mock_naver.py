@@ -0,0 +1,132 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from corpus import render_post  # noqa: E402  벤치마크와 같은 PostView 형식 문서 사용
+
+SENTENCE = "오늘은 최근에 알게 된 맛집 후기에요 친구가 제가 딱 좋아할 스타일이라며 데리고 갔었던 집인데 먹자마자 반했어요. "
+
+
+class MockNaver:
+    """
+    네이버 검색 API, PostView 문서, 공감 API를 흉내 내는 로컬 서버입니다.
+    지연 시간, 오류 비율, 검색 API 초당 요청 제한(429)과 문서 크기를 조절할 수 있습니다.
+    """
+
+    def __init__(self, posts_per_query: int = 100, latency_ms: float = 50, jitter_ms: float = 20,
+                 error_rate: float = 0.0, search_rps: float = 0, page_kb: int = 30, ad_ratio: float = 0.1,
+                 run_id: str = "") -> None:
+        self.posts_per_query = posts_per_query
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.search_rps = search_rps
+        self.page_kb = page_kb
+        self.ad_ratio = ad_ratio
+        self.run_id = run_id or str(int(time.time()))  # 실행마다 다른 URL을 만들어 이미 수집한 URL로 건너뛰지 않게 함
+        self.counts: Counter = Counter()
+        self._search_window = (0, 0)  # (초, 해당 초의 요청 수)
+
+    async def _delay(self) -> None:
+        delay = max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+
+    def _fail(self) -> bool:
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+    def _throttled(self) -> bool:
+        if not self.search_rps:
+            return False
+        second = int(time.monotonic())
+        window, count = self._search_window
+        count = count + 1 if window == second else 1
+        self._search_window = (second, count)
+        return count > self.search_rps
+
+    def blog_id(self, query: str) -> str:
+        return "mock" + hashlib.md5(f"{self.run_id}:{query}".encode('utf-8')).hexdigest()[:10]
+
+    async def search(self, request: web.Request) -> web.Response:
+        self.counts['search'] += 1
+        if self._throttled():
+            self.counts['search_429'] += 1
+            return web.json_response({"errorCode": "012"}, status=429, headers={"Retry-After": "1"})
+        await self._delay()
+        if self._fail():
+            self.counts['search_500'] += 1
+            return web.json_response({"errorCode": "SE99"}, status=500)
+        query = request.query.get('query', '')
+        start = int(request.query.get('start', 1))
+        display = int(request.query.get('display', 10))
+        blog_id = self.blog_id(query)
+        items = [
+            {"title": f"{query} 후기 {number}", "link": f"https://blog.naver.com/{blog_id}/{number}"}
+            for number in range(start, min(start + display, self.posts_per_query + 1))
+        ]
+        return web.json_response({"total": self.posts_per_query, "start": start, "display": len(items), "items": items})
+
+    async def post_view(self, request: web.Request) -> web.Response:
+        self.counts['post_view'] += 1
+        await self._delay()
+        if self._fail():
+            self.counts['post_view_500'] += 1
+            return web.Response(status=503, text="Service Unavailable")
+        blog_id = request.query.get('blogId', '')
+        log_no = int(request.query.get('logNo', 0))
+        seed = random.Random(f"{blog_id}/{log_no}")
+        is_ad = seed.random() < self.ad_ratio
+        row = {
+            'title': f"{blog_id} 후기 {log_no}",
+            'writer': blog_id,
+            'date': f"2024. {seed.randint(1, 12)}. {seed.randint(1, 28)}. 12:{seed.randint(10, 59)}",
+            'content': SENTENCE * max(1, self.page_kb * 1024 // len(SENTENCE.encode('utf-8'))),
+            'tags': "#맛집, #후기, #내돈내산",
+            'sympathy': seed.randint(0, 300),
+            'ad_images': "https://firebasestorage.googleapis.com/v0/b/ad.png" if is_ad else None,
+        }
+        return web.Response(text=render_post(row), content_type='text/html')
+
+    async def like(self, request: web.Request) -> web.Response:
+        self.counts['like'] += 1
+        await self._delay()
+        return web.json_response({"contents": [{"reactions": [{"type": "like", "count": random.randint(0, 300)}]}]})
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response(dict(self.counts))
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/v1/search/blog', self.search)
+        app.router.add_get('/PostView.naver', self.post_view)
+        app.router.add_get('/blogserver/like/v1/search/contents', self.like)
+        app.router.add_get('/_stats', self.stats)
+        return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="부하 테스트용 네이버 mock 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--posts-per-query', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--jitter-ms', type=float, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="5xx로 응답할 비율 (0~1)")
+    parser.add_argument('--search-rps', type=float, default=0, help="검색 API 초당 허용 요청 수 (초과 시 429, 0이면 제한 없음)")
+    parser.add_argument('--page-kb', type=int, default=30, help="PostView 본문 크기 (KB)")
+    parser.add_argument('--ad-ratio', type=float, default=0.1)
+    parser.add_argument('--run-id', default="")
+    args = parser.parse_args()
+    mock = MockNaver(args.posts_per_query, args.latency_ms, args.jitter_ms, args.error_rate, args.search_rps,
+                     args.page_kb, args.ad_ratio, args.run_id)
+    print(json.dumps({'host': args.host, 'port': args.port, 'run_id': mock.run_id}), flush=True)
+    web.run_app(mock.app(), host=args.host, port=args.port, print=None, access_log=None)
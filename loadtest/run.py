@@ -0,0 +1,208 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import requests
+import yaml
+from prometheus_client.parser import text_string_to_metric_families
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+LOADTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/status") as file:
+            for line in file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def wait_until_up(url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code < 500:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"{url}이 {timeout}초 안에 응답하지 않았습니다.")
+
+
+def histogram_quantiles(metrics_text: str, name: str, quantiles: Tuple[float, ...] = (0.5, 0.99)) -> Dict[str, float]:
+    """Prometheus 히스토그램 버킷에서 분위수를 선형 보간으로 추정합니다 (초 단위)."""
+    buckets: List[Tuple[float, float]] = []
+    for family in text_string_to_metric_families(metrics_text):
+        if family.name != name:
+            continue
+        for sample in family.samples:
+            if sample.name == f"{name}_bucket":
+                buckets.append((float(sample.labels['le']), sample.value))
+    buckets.sort()
+    if not buckets or buckets[-1][1] == 0:
+        return {}
+    total = buckets[-1][1]
+    result = {}
+    for quantile in quantiles:
+        rank = quantile * total
+        lower_bound, lower_count = 0.0, 0.0
+        for upper_bound, count in buckets:
+            if count >= rank:
+                if math.isinf(upper_bound):
+                    value = lower_bound
+                else:
+                    fraction = (rank - lower_count) / (count - lower_count) if count > lower_count else 1
+                    value = lower_bound + (upper_bound - lower_bound) * fraction
+                result[f"p{int(quantile * 100)}"] = value
+                break
+            lower_bound, lower_count = upper_bound, count
+    return result
+
+
+def counter_totals(metrics_text: str, name: str) -> Dict[str, float]:
+    totals: Dict[str, float] = {}
+    for family in text_string_to_metric_families(metrics_text):
+        if family.name != name:
+            continue
+        for sample in family.samples:
+            if sample.name.endswith('_total'):
+                key = ','.join(f"{k}={v}" for k, v in sorted(sample.labels.items())) or 'total'
+                totals[key] = sample.value
+    return totals
+
+
+def write_config(args, run_id: str) -> str:
+    with open(os.path.join(BACKEND_DIR, 'config.yaml'), encoding='utf-8') as file:
+        config = yaml.safe_load(file)
+    query_count = math.ceil(args.urls / args.posts_per_query)
+    config.update({
+        'query': [f"부하테스트-{run_id}-{index}" for index in range(query_count)],
+        'max_posts': args.posts_per_query,
+        'num_crawlers': args.num_crawlers,
+        'fetch_mode': 'http',
+        'html_cache': {'enabled': False},
+        'batch_writer': {'max_batch_size': args.max_batch_size, 'max_latency': args.max_latency},
+        'search_api': {**config.get('search_api', {}), 'rate_per_sec': args.search_rate,
+                       'burst': args.search_rate, 'concurrency': args.search_concurrency},
+    })
+    config.setdefault('work_queue', {})['job_claim_batch'] = args.job_claim_batch
+    path = os.path.join(tempfile.mkdtemp(prefix='loadtest-'), 'config.yaml')
+    with open(path, 'w', encoding='utf-8') as file:
+        yaml.dump(config, file, allow_unicode=True)
+    return path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="mock 네이버 서버를 상대로 크롤러 전체 파이프라인 부하 테스트")
+    parser.add_argument('--urls', type=int, default=10000, help="수집할 전체 URL 수")
+    parser.add_argument('--posts-per-query', type=int, default=100)
+    parser.add_argument('--num-crawlers', type=int, default=8)
+    parser.add_argument('--job-claim-batch', type=int, default=32)
+    parser.add_argument('--max-batch-size', type=int, default=100)
+    parser.add_argument('--max-latency', type=float, default=2.0)
+    parser.add_argument('--search-rate', type=float, default=10)
+    parser.add_argument('--search-concurrency', type=int, default=10)
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--jitter-ms', type=float, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--search-rps', type=float, default=0, help="mock 검색 API의 초당 허용 요청 수 (초과 시 429)")
+    parser.add_argument('--page-kb', type=int, default=30)
+    parser.add_argument('--mock-port', type=int, default=8900)
+    parser.add_argument('--backend-port', type=int, default=8010)
+    parser.add_argument('--timeout', type=float, default=1800)
+    parser.add_argument('--output', default=os.path.join(LOADTEST_DIR, 'report.json'))
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:8]
+    mock_base = f"http://127.0.0.1:{args.mock_port}"
+    backend_base = f"http://127.0.0.1:{args.backend_port}"
+    config_path = write_config(args, run_id)
+    processes = []
+    try:
+        processes.append(subprocess.Popen([
+            sys.executable, os.path.join(LOADTEST_DIR, 'mock_naver.py'), '--port', str(args.mock_port),
+            '--posts-per-query', str(args.posts_per_query), '--latency-ms', str(args.latency_ms),
+            '--jitter-ms', str(args.jitter_ms), '--error-rate', str(args.error_rate),
+            '--search-rps', str(args.search_rps), '--page-kb', str(args.page_kb), '--run-id', run_id,
+        ]))
+        wait_until_up(f"{mock_base}/_stats", 30)
+
+        env = {**os.environ, 'CONFIG_PATH': config_path, 'NAVER_OPENAPI_BASE': mock_base,
+               'NAVER_BLOG_BASE': mock_base, 'NAVER_API_BASE': mock_base, 'SHARD_COUNT': '1', 'SHARD_ID': '0'}
+        backend = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(args.backend_port),
+                                    '--log-level', 'warning'], cwd=BACKEND_DIR, env=env)
+        processes.append(backend)
+        wait_until_up(f"{backend_base}/writer/stats", 120)
+
+        started = time.monotonic()
+        rss_start = read_rss_mb(backend.pid)
+        rss_peak = rss_start or 0
+        # 서버 시작 시 크롤러가 자동으로 시작되므로 이미 실행 중(400)이면 그대로 진행
+        requests.post(f"{backend_base}/start-crawler", timeout=10)
+
+        while time.monotonic() - started < args.timeout:
+            time.sleep(1)
+            rss_peak = max(rss_peak, read_rss_mb(backend.pid) or 0)
+            queue = requests.get(f"{backend_base}/queue/stats", timeout=10).json()
+            writer = requests.get(f"{backend_base}/writer/stats", timeout=10).json()
+            in_flight = sum(queue.get(name, {}).get(status, 0)
+                            for name in ('queries', 'jobs') for status in ('pending', 'leased'))
+            print(f"[{time.monotonic() - started:6.0f}s] 저장 {writer['rows_written']}건, "
+                  f"대기/진행 중 작업 {in_flight}건, 저장 대기 {writer['queue_size']}건", flush=True)
+            if in_flight == 0 and writer['queue_size'] == 0 and queue.get('jobs'):
+                break
+        elapsed = time.monotonic() - started
+        timed_out = elapsed >= args.timeout
+
+        metrics_text = requests.get(f"{backend_base}/metrics", timeout=10).text
+        writer = requests.get(f"{backend_base}/writer/stats", timeout=10).json()
+        rss_end = read_rss_mb(backend.pid)
+        url_latency = histogram_quantiles(metrics_text, 'crawler_url_seconds')
+        report = {
+            'run_id': run_id,
+            'settings': vars(args),
+            'timed_out': timed_out,
+            'elapsed_s': round(elapsed, 1),
+            'rows_written': writer['rows_written'],
+            'rows_failed': writer['rows_failed'],
+            'urls_per_sec': round(writer['rows_written'] / elapsed, 2) if elapsed else 0,
+            'url_p50_ms': round(url_latency.get('p50', 0) * 1000, 1),
+            'url_p99_ms': round(url_latency.get('p99', 0) * 1000, 1),
+            'db_flush': histogram_quantiles(metrics_text, 'crawler_db_flush_seconds'),
+            'rss_mb': {'start': rss_start, 'peak': rss_peak, 'end': rss_end,
+                       'growth': (rss_end - rss_start) if rss_start and rss_end else None},
+            'errors': counter_totals(metrics_text, 'crawler_errors'),
+            'retries': counter_totals(metrics_text, 'crawler_retries'),
+            'queue': requests.get(f"{backend_base}/queue/stats", timeout=10).json(),
+            'mock': requests.get(f"{mock_base}/_stats", timeout=10).json(),
+        }
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2, default=str)
+    print(json.dumps({key: report[key] for key in ('elapsed_s', 'rows_written', 'urls_per_sec', 'url_p50_ms',
+                                                   'url_p99_ms', 'rss_mb')}, ensure_ascii=False, indent=2))
+    print(f"결과를 {args.output}에 저장했습니다.")
+    return 1 if report['timed_out'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+import pytest
+
+import ad_classifier
+from ad_classifier import AdClassifier
+
+
+@pytest.fixture(params=[True, False], ids=['ahocorasick', 'regex'])
+def classifier(request, monkeypatch):
+    if request.param and not ad_classifier.HAS_AHOCORASICK:
+        pytest.skip("pyahocorasick가 설치되어 있지 않음")
+    monkeypatch.setattr(ad_classifier, 'HAS_AHOCORASICK', request.param)
+    return AdClassifier(['revu', 'cloudfront'], ['소정의 원고료', '#협찬'])
+
+
+def test_image_rules_group_srcs_by_rule_order(classifier):
+    srcs = ['https://a.cloudfront.net/1.jpg', 'https://x.com/2.jpg', 'https://revu.net/3.png']
+    assert classifier.classify(srcs, '소정의 원고료') == (
+        ['https://revu.net/3.png', 'https://a.cloudfront.net/1.jpg'], 'image:revu')
+
+
+def test_text_rule_matches_across_whitespace(classifier):
+    assert classifier.classify(['https://x.com/1.jpg'], '이 글은 소정의\n\n원고료를 받아') == ([], 'text:소정의 원고료')
+
+
+def test_rules_only_match_their_own_field(classifier):
+    # 본문의 도메인은 이미지 규칙이 아니고, 이미지 src의 문구는 고지 문구가 아님
+    assert classifier.classify(['https://x.com/%23협찬.jpg', '#협찬'], 'revu 후기') == ([], None)
+    # src 끝과 본문 앞이 이어져도 경계를 넘는 일치는 없음
+    assert classifier.classify(['https://x.com/re'], 'vu') == ([], None)
+
+
+def test_no_rules():
+    assert AdClassifier([], []).classify(['https://revu.net/1.jpg'], '#협찬') == ([], None)
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from typing import List
+
+import batch_writer
+from batch_writer import BatchWriter
+
+
+class SlowSave:
+    """save_to_db 대역. block이 설정된 동안 첫 호출을 붙잡아 두고, fail_first번은 예외를 냅니다."""
+
+    def __init__(self, fail_first: int = 0) -> None:
+        self.fail_first = fail_first
+        self.calls = 0
+        self.saved: List[dict] = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, batch: List[dict]) -> dict:
+        self.calls += 1
+        self.started.set()
+        self.release.wait(timeout=5)
+        if self.calls <= self.fail_first:
+            raise RuntimeError("db down")
+        self.saved.extend(batch)
+        return {'inserted': len(batch), 'updated': 0, 'unchanged': 0}
+
+
+async def _wait_for(event: threading.Event) -> None:
+    while not event.is_set():
+        await asyncio.sleep(0.01)
+
+
+async def _cancel_during_flush(save: SlowSave, records: int, wait_retry: bool = False) -> BatchWriter:
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(records):
+        queue.put_nowait({'post_url': f"https://blog.naver.com/test/{index}"})
+    writer = BatchWriter(queue, max_batch_size=4, max_latency=0.01)
+    task = asyncio.create_task(writer.run())
+    await _wait_for(save.started)
+    if wait_retry:
+        save.release.set()
+        while save.calls < 1 or writer._in_flight is None:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)  # 첫 시도가 실패하고 재시도 대기(asyncio.sleep)에 들어감
+    task.cancel()
+    save.release.set()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    else:
+        raise AssertionError("run()이 CancelledError를 다시 올리지 않았습니다.")
+    assert queue.empty()
+    return writer
+
+
+def test_cancel_while_saving_keeps_in_flight_batch(monkeypatch):
+    save = SlowSave()
+    monkeypatch.setattr(batch_writer, 'save_to_db', save)
+    writer = asyncio.run(_cancel_during_flush(save, records=10))
+    assert writer.stats()['rows_written'] == 10
+    urls = [record['post_url'] for record in save.saved]
+    assert sorted(urls) == sorted(f"https://blog.naver.com/test/{index}" for index in range(10))
+    assert len(urls) == len(set(urls))  # 저장 중이던 배치를 다시 저장하지 않음
+
+
+def test_cancel_during_retry_sleep_keeps_batch(monkeypatch):
+    save = SlowSave(fail_first=1)
+    monkeypatch.setattr(batch_writer, 'save_to_db', save)
+    writer = asyncio.run(_cancel_during_flush(save, records=6, wait_retry=True))
+    assert writer.stats()['rows_written'] == 6
+    assert sorted(record['post_url'] for record in save.saved) == \
+        sorted(f"https://blog.naver.com/test/{index}" for index in range(6))
+
+
+def test_flushes_by_batch_size(monkeypatch):
+    save = SlowSave()
+    save.release.set()
+    monkeypatch.setattr(batch_writer, 'save_to_db', save)
+
+    async def run():
+        queue: asyncio.Queue = asyncio.Queue()
+        for index in range(9):
+            queue.put_nowait({'post_url': str(index)})
+        writer = BatchWriter(queue, max_batch_size=4, max_latency=0.01)
+        task = asyncio.create_task(writer.run())
+        while len(save.saved) < 9:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return writer.stats()
+
+    stats = asyncio.run(run())
+    assert (stats['batches'], stats['rows_written'], stats['last_batch_size']) == (3, 9, 1)
@@ -0,0 +1,99 @@
+import pytest
+
+from driver_pool import DriverPool
+from metrics import DRIVER_RESTARTS
+
+
+class StubDriver:
+    """window_handles와 quit만 흉내 내는 가짜 WebDriver."""
+
+    def __init__(self) -> None:
+        self.capabilities = {}
+        self.alive = True
+        self.quit_called = False
+
+    @property
+    def window_handles(self):
+        if not self.alive:
+            raise RuntimeError("session deleted")
+        return ['main']
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+class StubFactory:
+    def __init__(self) -> None:
+        self.created = []
+
+    def __call__(self) -> StubDriver:
+        driver = StubDriver()
+        self.created.append(driver)
+        return driver
+
+
+def restarts(reason: str) -> float:
+    return DRIVER_RESTARTS.labels(reason)._value.get()
+
+
+def test_reuses_idle_driver():
+    factory = StubFactory()
+    pool = DriverPool(factory, size=1, max_pages=0)
+    for _ in range(3):
+        with pool.lease() as driver:
+            assert driver is factory.created[0]
+    assert len(factory.created) == 1
+
+
+def test_recycles_after_max_pages():
+    factory = StubFactory()
+    pool = DriverPool(factory, size=1, max_pages=2)
+    before = restarts('recycled')
+    leased = []
+    for _ in range(3):
+        with pool.lease() as driver:
+            leased.append(driver)
+    assert leased[0] is leased[1]
+    assert leased[2] is not leased[0]
+    assert leased[0].quit_called
+    assert pool.restarts == 1
+    assert restarts('recycled') == before + 1
+
+
+def test_replaces_driver_that_crashed_during_lease():
+    factory = StubFactory()
+    pool = DriverPool(factory, size=1, max_pages=0)
+    before = restarts('crashed')
+    with pytest.raises(RuntimeError):
+        with pool.lease() as driver:
+            driver.alive = False
+            raise RuntimeError("browser crashed")
+    assert driver.quit_called
+    assert pool.restarts == 1
+    assert restarts('crashed') == before + 1
+    with pool.lease() as replacement:
+        assert replacement is not driver
+
+
+def test_replaces_idle_driver_that_stopped_responding():
+    factory = StubFactory()
+    pool = DriverPool(factory, size=1, max_pages=0)
+    before = restarts('unhealthy')
+    with pool.lease() as driver:
+        pass
+    driver.alive = False
+    with pool.lease() as replacement:
+        assert replacement is not driver
+    assert driver.quit_called
+    assert restarts('unhealthy') == before + 1
+
+
+def test_failed_lease_keeps_healthy_driver():
+    factory = StubFactory()
+    pool = DriverPool(factory, size=1, max_pages=0)
+    with pytest.raises(ValueError):
+        with pool.lease():
+            raise ValueError("parse error")
+    with pool.lease() as driver:
+        assert driver is factory.created[0]
+    assert pool.restarts == 0
@@ -0,0 +1,74 @@
+import pytest
+
+pytest.importorskip('lxml')
+
+from extractor import extract_post
+
+POST_URL = "https://blog.naver.com/PostView.naver?blogId=tester&logNo=1"
+
+POSTVIEW = '''<html><head>
+<meta charset="utf-8"><title>PostView</title>
+<style>.se-main-container { color: red; }</style>
+<script>var blogInfo = {"title": "스크립트 제목"};</script>
+</head><body>
+<div class="blog_author"><span class="nick"><a class="link" href="/tester">맛집탐방러</a></span></div>
+<span class="se_publishDate pcol2">2024. 5. 31. 12:30</span>
+<div class="se-module se-module-text se-title-text"><p><span>  을지로 노포 후기  </span></p></div>
+<div class="se-main-container">
+  <div class="se-component se-text"><p><span>첫 문단입니다.</span> <b>굵게</b></p>
+    <script>document.write("본문 스크립트")</script><style>p { margin: 0 }</style></div>
+  <div class="se-module se-module-video __se-component"><span>동영상 설명</span></div>
+  <div class="se-component se-image">
+    <img src="https://postfiles.pstatic.net/a.jpg">
+    <img src="https://revu.co.kr/banner.png">
+    <img src="https://dinnerqueen.net/stamp.jpg">
+    <img src="https://img.firebasestorage.app/x.png">
+    <img alt="src 없음">
+  </div>
+  <div class="se-component se-text"><p>둘째 문단 <span class="__se-hash-tag">#해시태그</span>끝</p></div>
+</div>
+<div class="wrap_tag"><span class="ell">#을지로</span><span class="ell"> #노포 </span></div>
+<span class="ell">태그 영역 밖</span>
+<span class="u_likeit_list_btn _button btn_sympathy pcol2 off"><em class="u_cnt _count">17</em></span>
+</body></html>'''
+
+MINIMAL = '<html><body><div class="se-main-container"><div><p>본문만 있음</p></div></div></body></html>'
+
+
+@pytest.mark.parametrize('page_source', [POSTVIEW, MINIMAL], ids=['postview', 'minimal'])
+def test_lxml_matches_soup(page_source):
+    assert extract_post(page_source, POST_URL, backend='lxml') == extract_post(page_source, POST_URL, backend='bs4')
+
+
+def test_postview_fields():
+    record = extract_post(POSTVIEW, POST_URL, backend='lxml')
+    assert record['title'] == '을지로 노포 후기'
+    assert record['writer'] == '맛집탐방러'
+    assert record['date'] == '2024. 5. 31. 12:30'
+    assert record['tags'] == '#을지로, #노포'
+    assert record['sympathy'] == 17
+    assert record['post_url'] == POST_URL
+
+
+def test_content_skips_video_hash_tags_and_scripts():
+    content = extract_post(POSTVIEW, POST_URL, backend='lxml')['content']
+    assert '첫 문단입니다.' in content and '둘째 문단' in content
+    for excluded in ('동영상 설명', '#해시태그', '본문 스크립트', 'margin', '스크립트 제목'):
+        assert excluded not in content
+
+
+def test_ad_images_grouped_by_domain_order():
+    record = extract_post(POSTVIEW, POST_URL, backend='lxml')
+    assert record['ad_images'] == ', '.join([
+        'https://img.firebasestorage.app/x.png',
+        'https://dinnerqueen.net/stamp.jpg',
+        'https://revu.co.kr/banner.png',
+    ])
+    assert record['광고'] == 'O'
+
+
+def test_missing_fields_default_to_unknown():
+    record = extract_post(MINIMAL, POST_URL, backend='lxml')
+    assert (record['title'], record['writer'], record['date']) == ('unknown', 'unknown', 'unknown')
+    assert record['content'] == '본문만 있음'
+    assert (record['sympathy'], record['ad_images'], record['광고']) == (0, '', 'X')
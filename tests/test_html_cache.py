@@ -0,0 +1,57 @@
+import logging
+import os
+import threading
+
+from html_cache import HtmlCache
+
+
+def _blob_files(path):
+    return [name for _, _, files in os.walk(os.path.join(path, 'blobs')) for name in files]
+
+
+def test_put_dedupes_identical_html(tmp_path):
+    cache = HtmlCache(str(tmp_path))
+    first = cache.put("https://blog.naver.com/a/1", "<p>같은 본문</p>", fetched_at=1)
+    second = cache.put("https://blog.naver.com/b/2", "<p>같은 본문</p>", fetched_at=2)
+    assert first == second
+    assert cache.get(first) == "<p>같은 본문</p>"
+    assert cache.latest("https://blog.naver.com/b/2") == "<p>같은 본문</p>"
+    assert cache.stats()['blobs'] == 1 and cache.stats()['fetches'] == 2
+    assert len(_blob_files(str(tmp_path))) == 1
+    cache.close()
+
+
+def test_concurrent_puts_keep_index_consistent(tmp_path):
+    cache = HtmlCache(str(tmp_path))
+    pages = [f"<p>{index % 10}</p>" * 500 for index in range(200)]
+
+    def worker(offset):
+        for index in range(offset, len(pages), 8):
+            cache.put(f"https://blog.naver.com/t/{index}", pages[index], fetched_at=index)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert (stats['urls'], stats['blobs']) == (200, 10)
+    files = _blob_files(str(tmp_path))
+    assert len(files) == 10 and not [name for name in files if name.endswith('.tmp')]
+    assert all(cache.latest(f"https://blog.naver.com/t/{index}") == pages[index] for index in range(200))
+    cache.close()
+
+
+def test_evicts_oldest_only_when_over_limit(tmp_path, caplog):
+    caplog.set_level(logging.INFO)
+    body = os.urandom(4000).hex()  # 압축이 거의 되지 않는 본문
+    cache = HtmlCache(str(tmp_path))
+    cache.put("https://blog.naver.com/a/1", "1" + body, fetched_at=1)
+    cache.max_bytes = int(cache.stats()['size_mb'] * 1024 ** 2 * 2.5)  # 본문 두 개까지 보관
+    cache.put("https://blog.naver.com/a/2", "2" + body, fetched_at=2)
+    assert not [record for record in caplog.records if '삭제' in record.getMessage()]
+    cache.put("https://blog.naver.com/a/3", "3" + body, fetched_at=3)
+    assert cache.latest("https://blog.naver.com/a/1") is None
+    assert cache.latest("https://blog.naver.com/a/3") == "3" + body
+    assert len([record for record in caplog.records if '삭제' in record.getMessage()]) == 1
+    cache.close()
@@ -0,0 +1,50 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from ingest import iter_json_array, iter_ndjson
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def collect(parser, data: bytes, size: int = 4) -> List:
+    async def run():
+        return [record async for record in parser(_chunks(data, size))]
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('size', [1, 3, 1024])
+def test_json_array_yields_elements(size):
+    data = '[{"a": 1}, {"b": "가나다"}, 12345, true]\n'.encode('utf-8')
+    records = collect(iter_json_array, data, size)
+    assert records == [(0, {'a': 1}, None), (1, {'b': '가나다'}, None), (2, 12345, None), (3, True, None)]
+
+
+def test_json_array_empty():
+    assert collect(iter_json_array, b' [ ] ') == []
+
+
+@pytest.mark.parametrize('data', [
+    b'[{"a":1} {"b":2}]',  # 원소 사이 ',' 누락
+    b'[1]garbage',  # ']' 뒤의 잘못된 내용
+    b'[1] [2]',
+    b'[1,]',
+    b'[,1]',
+    b'[1, 2',
+    b'{"a": 1}',
+    b'',
+])
+@pytest.mark.parametrize('size', [1, 1024])
+def test_json_array_rejects_malformed_body(data, size):
+    with pytest.raises(ValueError):
+        collect(iter_json_array, data, size)
+
+
+def test_ndjson_reports_bad_lines_and_continues():
+    records = collect(iter_ndjson, b'{"a": 1}\n\nnot json\n{"b": 2}')
+    assert [(index, value) for index, value, _ in records] == [(0, {'a': 1}), (1, None), (2, {'b': 2})]
+    assert records[1][2] is not None
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from response_cache import ENTRY_OVERHEAD, ResponseCache, etag_matches
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, False),
+    ('', False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"other", W/"abc"', True),
+    ('"other",W/"abc" ', True),
+    ('"other"', False),
+    ('abc', False),  # 따옴표 없는 값은 다른 태그
+    ('*', True),
+    ('"x", *', True),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+class Version:
+    def __init__(self) -> None:
+        self.value = 1
+        self.fetches = 0
+
+    async def __call__(self) -> int:
+        self.fetches += 1
+        return self.value
+
+
+def _builder(body: bytes, calls: list):
+    async def build() -> bytes:
+        calls.append(body)
+        return body
+    return build
+
+
+def test_hit_after_miss_returns_same_etag():
+    async def run():
+        cache = ResponseCache(Version(), version_check_interval=60)
+        calls = []
+        first = await cache.get('/data?limit=1', _builder(b'[1]', calls))
+        second = await cache.get('/data?limit=1', _builder(b'[1]', calls))
+        return cache, calls, first, second
+
+    cache, calls, first, second = asyncio.run(run())
+    assert first == second and calls == [b'[1]']
+    assert first[0].startswith('"') and first[0].endswith('"')
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_evicts_least_recently_used_by_bytes():
+    entry_size = 100 + len('/a') + ENTRY_OVERHEAD
+
+    async def run():
+        cache = ResponseCache(Version(), max_bytes=entry_size * 2, version_check_interval=60, max_entry_ratio=1)
+        calls = []
+        await cache.get('/a', _builder(b'a' * 100, calls))
+        await cache.get('/b', _builder(b'b' * 100, calls))
+        await cache.get('/a', _builder(b'a' * 100, calls))  # /a를 최근 사용으로 올림
+        await cache.get('/c', _builder(b'c' * 100, calls))  # 가장 오래 안 쓴 /b가 밀려남
+        await cache.get('/a', _builder(b'a' * 100, calls))
+        await cache.get('/b', _builder(b'b' * 100, calls))
+        return cache, calls
+
+    cache, calls = asyncio.run(run())
+    assert calls == [b'a' * 100, b'b' * 100, b'c' * 100, b'b' * 100]
+    stats = cache.stats()
+    assert stats['bytes'] <= stats['max_bytes']
+    assert stats['evictions'] == 2 and stats['entries'] == 2
+
+
+def test_oversized_response_is_not_cached():
+    async def run():
+        cache = ResponseCache(Version(), max_bytes=4000, version_check_interval=60)  # 항목 한도 1000 bytes
+        calls = []
+        await cache.get('/big', _builder(b'x' * 2000, calls))
+        await cache.get('/big', _builder(b'x' * 2000, calls))
+        return cache, calls
+
+    cache, calls = asyncio.run(run())
+    assert len(calls) == 2 and cache.stats()['entries'] == 0
+
+
+def test_version_bump_clears_cache():
+    async def run():
+        version = Version()
+        cache = ResponseCache(version, version_check_interval=60)
+        calls = []
+        await cache.get('/data', _builder(b'old', calls))
+        version.value = 2
+        stale = await cache.get('/data', _builder(b'new', calls))  # 확인 주기 전이라 아직 예전 버전
+        cache.invalidate()
+        fresh = await cache.get('/data', _builder(b'new', calls))
+        return cache, version, calls, stale, fresh
+
+    cache, version, calls, stale, fresh = asyncio.run(run())
+    assert stale[1] == b'old' and fresh[1] == b'new'
+    assert calls == [b'old', b'new']
+    assert cache.stats()['version'] == 2 and version.fetches == 2
+
@@ -0,0 +1,27 @@
+from database import highlight, search_terms
+
+
+def test_search_terms_strip_boolean_operators_and_short_terms():
+    assert search_terms('+을지로 -노포 "맛집" 가 을지로') == ['을지로', '노포', '맛집']
+
+
+def test_highlight_wraps_terms_case_insensitively():
+    assert highlight('Pasta와 파스타 PASTA', ['pasta', '파스타']) == '<b>Pasta</b>와 <b>파스타</b> <b>PASTA</b>'
+
+
+def test_highlight_prefers_longer_terms():
+    assert highlight('을지로3가 을지로', ['을지로', '을지로3가']) == '<b>을지로3가</b> <b>을지로</b>'
+
+
+def test_highlight_escapes_crawled_markup():
+    text = '<img src=x onerror="alert(1)"> 맛집 & <script>맛집</script>'
+    assert highlight(text, ['맛집']) == (
+        '&lt;img src=x onerror=&quot;alert(1)&quot;&gt; <b>맛집</b> &amp; '
+        '&lt;script&gt;<b>맛집</b>&lt;/script&gt;'
+    )
+
+
+def test_highlight_escapes_matched_term_and_text_without_matches():
+    assert highlight('a<b>c', ['<b>']) == 'a<b>&lt;b&gt;</b>c'
+    assert highlight('<i>없음</i>', ['맛집']) == '&lt;i&gt;없음&lt;/i&gt;'
+    assert highlight(None, ['맛집']) is None
@@ -0,0 +1,62 @@
+import pytest
+
+from shard_runner import parse_shard_ids
+from sharding import HashRing, shard_settings
+
+KEYS = [f"서울 맛집 {index}" for index in range(5000)]
+
+
+def test_assignment_is_deterministic():
+    first, second = HashRing(8), HashRing(8)
+    assert [first.shard_for(key) for key in KEYS] == [second.shard_for(key) for key in KEYS]
+
+
+@pytest.mark.parametrize('shard_count', [1, 2, 5, 16])
+def test_every_shard_gets_keys(shard_count):
+    ring = HashRing(shard_count)
+    counts = [0] * shard_count
+    for key in KEYS:
+        counts[ring.shard_for(key)] += 1
+    assert all(counts)
+    # 가상 노드 100개면 shard마다 평균의 절반~두 배 사이로 고르게 나뉨
+    average = len(KEYS) / shard_count
+    assert all(average / 2 <= count <= average * 2 for count in counts)
+
+
+@pytest.mark.parametrize('before, after', [(4, 5), (8, 9), (8, 7)])
+def test_resizing_moves_bounded_share(before, after):
+    old, new = HashRing(before), HashRing(after)
+    moved = [key for key in KEYS if old.shard_for(key) != new.shard_for(key)]
+    # 이상적으로는 1/max(before, after)만 옮겨짐. 여유를 두고 두 배까지 허용
+    assert len(moved) / len(KEYS) <= 2 / max(before, after)
+    # 옮겨지는 key는 추가된 shard로 가거나 없어진 shard에서 나온 것뿐
+    changed = max(before, after) - 1
+    assert all(changed in (old.shard_for(key), new.shard_for(key)) for key in moved)
+
+
+def test_invalid_shard_count():
+    with pytest.raises(ValueError):
+        HashRing(0)
+
+
+def test_shard_settings(monkeypatch):
+    monkeypatch.setenv('SHARD_COUNT', '4')
+    monkeypatch.setenv('SHARD_ID', '3')
+    assert shard_settings() == (3, 4)
+    monkeypatch.setenv('SHARD_ID', '4')
+    with pytest.raises(ValueError):
+        shard_settings()
+
+
+def test_parse_shard_ids():
+    assert parse_shard_ids('1-3', 4) == [1, 2, 3]
+    assert parse_shard_ids('0,2,5-6', 8) == [0, 2, 5, 6]
+    with pytest.raises(ValueError):
+        parse_shard_ids('1-4', 4)
+
+
+@pytest.mark.parametrize('value', ['1-0', '3-1', ','])
+def test_parse_shard_ids_rejects_empty_selection(value):
+    # SHARD_COUNT=1일 때 docker-compose가 만들던 '1-0'처럼 아무 shard도 가리키지 않는 값
+    with pytest.raises(ValueError):
+        parse_shard_ids(value, 4)
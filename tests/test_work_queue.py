@@ -0,0 +1,167 @@
+from contextlib import contextmanager
+from typing import List
+
+import pytest
+
+import work_queue
+from work_queue import JOB_TABLE, QUERY_TABLE, WorkQueue
+
+
+class FakeCursor:
+    """실행한 SQL과 인자를 기록하고, fetchall/rowcount는 미리 정한 값을 차례로 돌려주는 커서."""
+
+    def __init__(self, results: List[list], rowcounts: List[int]) -> None:
+        self.results = results
+        self.rowcounts = rowcounts
+        self.executed: List[tuple] = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((' '.join(sql.split()), params))
+        return self.rowcounts.pop(0) if self.rowcounts else 0
+
+    def fetchall(self):
+        return self.results.pop(0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    def __init__(self, cursor: FakeCursor) -> None:
+        self._cursor = cursor
+        self.commits = 0
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def db(monkeypatch):
+    cursor = FakeCursor(results=[], rowcounts=[])
+    conn = FakeConnection(cursor)
+
+    @contextmanager
+    def get_connection():
+        yield conn
+
+    monkeypatch.setattr(work_queue, 'get_connection', get_connection)
+    return cursor
+
+
+def test_claim_leases_for_lease_seconds_with_fresh_token(db):
+    queue = WorkQueue(owner='node-1:42', lease_seconds=90, max_attempts=4)
+    db.results = [[{'id': 3}, {'id': 7}], [{'id': 3, 'query': 'a'}, {'id': 7, 'query': 'b'}]]
+    claimed = queue.claim_queries(limit=2)
+    assert [row['id'] for row in claimed] == [3, 7]
+
+    expire_sql, expire_params = db.executed[0]
+    assert f"UPDATE {QUERY_TABLE} SET status = 'dead'" in expire_sql
+    assert "lease_expires_at < NOW() AND attempts >= %s" in expire_sql
+    assert expire_params == (4,)
+
+    select_sql, select_params = db.executed[1]
+    assert "status = 'leased' AND lease_expires_at < NOW()" in select_sql  # 만료된 임대는 다시 가져감
+    assert select_sql.endswith("FOR UPDATE SKIP LOCKED")
+    assert select_params[-1] == 2
+
+    lease_sql, lease_params = db.executed[2]
+    assert "lease_expires_at = NOW() + INTERVAL %s SECOND" in lease_sql
+    assert "attempts = attempts + 1" in lease_sql
+    owner, token, seconds, *ids = lease_params
+    assert (owner, seconds, ids) == ('node-1:42', 90, [3, 7])
+    assert len(token) == 32
+
+
+def test_each_claim_gets_a_new_token(db):
+    queue = WorkQueue(owner='w')
+    db.results = [[{'id': 1}], [{'id': 1}], [{'id': 2}], [{'id': 2}]]
+    queue.claim_jobs(1)
+    queue.claim_jobs(1)
+    tokens = [params[1] for sql, params in db.executed if "SET status = 'leased'" in sql]
+    assert len(tokens) == 2 and tokens[0] != tokens[1]
+
+
+def test_claim_with_nothing_pending_does_not_lease(db):
+    db.results = [[]]
+    assert WorkQueue().claim_jobs(10) == []
+    assert not any("SET status = 'leased'" in sql for sql, _ in db.executed)
+
+
+def test_complete_only_matches_current_lease_token(db):
+    db.rowcounts = [1]
+    jobs = [{'id': 1, 'lease_token': 'aaa'}, {'id': 2, 'lease_token': 'bbb'}]
+    assert WorkQueue().complete_jobs(jobs) == 1  # 2번은 임대가 만료돼 다른 작업자가 가져감
+    sql, params = db.executed[0]
+    assert f"UPDATE {JOB_TABLE} SET status = 'done'" in sql
+    assert "(id, lease_token) IN ((%s, %s), (%s, %s))" in sql
+    assert params == [1, 'aaa', 2, 'bbb']
+
+
+def test_complete_records_skips_records_without_job(db):
+    db.rowcounts = [1]
+    records = [{'post_url': 'a', '_job': {'id': 5, 'lease_token': 't'}}, {'post_url': 'b'}]
+    assert WorkQueue().complete_records(records) == 1
+    assert db.executed[0][1] == [5, 't']
+    assert WorkQueue().complete_records([{'post_url': 'c'}]) == 0
+    assert len(db.executed) == 1
+
+
+def test_fail_requeues_until_max_attempts(db):
+    long_error = 'x' * 5000
+    WorkQueue(max_attempts=3).fail_query({'id': 9, 'lease_token': 'tok'}, long_error)
+    sql, params = db.executed[0]
+    assert "status = IF(attempts >= %s, 'dead', 'pending')" in sql
+    assert "WHERE id = %s AND lease_token = %s AND status = 'leased'" in sql
+    assert params == (3, 'x' * 1000, 9, 'tok')
+
+
+def test_requeue_queries_reopens_done_and_dead(db):
+    db.rowcounts = [4]
+    assert WorkQueue().requeue_queries() == 4
+    sql, _ = db.executed[0]
+    assert "SET status = 'pending', attempts = 0" in sql
+    assert "WHERE status IN ('done', 'dead')" in sql
+
+
+@pytest.fixture
+def api(monkeypatch):
+    pytest.importorskip('fastapi')
+    pytest.importorskip('httpx')
+    from fastapi.testclient import TestClient
+
+    import main
+
+    calls = []
+
+    async def crawl_worker(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(main, 'crawl_worker', crawl_worker)
+    monkeypatch.setattr(main, 'crawl_task', None)
+    monkeypatch.setattr(main.work_queue, 'requeue_queries', lambda: calls.append('requeue') or 0)
+    return TestClient(main.app), calls  # lifespan(백그라운드 작업)은 실행하지 않음
+
+
+@pytest.mark.parametrize('query, requeued', [
+    ('', []),
+    ('?requeue=false', []),
+    ('?requeue=true', ['requeue']),
+    ('?requeue=1', ['requeue']),
+])
+def test_start_crawler_requeue_argument(api, query, requeued):
+    client, calls = api
+    response = client.post(f"/start-crawler{query}")
+    assert response.status_code == 200
+    assert calls == requeued
+
+
+def test_start_crawler_rejects_invalid_requeue(api):
+    client, calls = api
+    assert client.post("/start-crawler?requeue=maybe").status_code == 422
+    assert calls == []